@@ -0,0 +1,220 @@
+import argparse
+import logging
+import os
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+
+from data_generator import generate_legacy_records
+from metrics import get_rss_bytes, get_peak_rss_bytes
+from pipeline import ingest_csv, cleanse_data, deduplicate_records, validate_business_rules, transform_fields, quarantine_records
+from reference_value import LIST_SOURCE_COLUMN, LIST_SCHEMA_MAPPING
+
+def generate_cleansed_records(row_count, duplicate_ratio, conflict_ratio, seed):
+    """Generate cleansed records for benchmark, some of them are duplicate in EntityName and EntityType.
+
+    Args:
+        row_count (int): Number of records.
+        duplicate_ratio (float): Ratio of records which are duplicate of another record.
+        conflict_ratio (float): Ratio of duplicate records which have different information from the original record.
+        seed (int): Seed of the random generator.
+
+    Returns:
+        df_output (dataframe): The pandas dataframe of cleansed records.
+    """
+    rng = np.random.default_rng(seed)
+    unique_count = max([1, int(row_count * (1 - duplicate_ratio))])
+    # Every record points to a unique entity, records beyond the unique ones are duplicates of a random entity
+    entity = np.concatenate([np.arange(unique_count), rng.integers(0, unique_count, row_count - unique_count)])
+    conflict = np.concatenate([np.zeros(unique_count, dtype=bool), rng.random(row_count - unique_count) < conflict_ratio])
+    dict_output = {}
+    for column in [item[0] for item in LIST_SCHEMA_MAPPING]:
+        dict_output[column] = pd.array(np.char.add(f"{column}_", entity.astype(str)), dtype="string")
+    dict_output["EntityID"] = pd.array(np.arange(row_count).astype(str), dtype="string")
+    dict_output["EntityType"] = pd.array(np.where(entity % 2 == 0, "Company", "Trust"), dtype="string")
+    dict_output["Status"] = pd.array(np.where(conflict, "Inactive", "Active"), dtype="string")
+    return pd.DataFrame(dict_output)
+
+def benchmark_deduplicate_records(row_count, duplicate_ratio, conflict_ratio, seed):
+    """Measure the time of deduplicate_records.
+
+    Args:
+        row_count (int): Number of records.
+        duplicate_ratio (float): Ratio of records which are duplicate of another record.
+        conflict_ratio (float): Ratio of duplicate records which have different information from the original record.
+        seed (int): Seed of the random generator.
+
+    Returns:
+        (dict): Benchmark result.
+    """
+    df_input = generate_cleansed_records(row_count, duplicate_ratio, conflict_ratio, seed)
+    start = time.perf_counter()
+    df_deduplicate, df_duplicate_reject = deduplicate_records(df_input)
+    elapsed = time.perf_counter() - start
+    return {
+        "stage": "deduplicate_records",
+        "rows": row_count,
+        "seconds": round(elapsed, 3),
+        "rows_per_second": int(row_count / elapsed) if elapsed > 0 else None,
+        "deduplicate_rows": len(df_deduplicate),
+        "duplicate_reject_rows": len(df_duplicate_reject)
+    }
+
+def generate_source_records(row_count, seed):
+    """Generate source records for benchmark, every column is a string with some missing values.
+
+    Args:
+        row_count (int): Number of records.
+        seed (int): Seed of the random generator.
+
+    Returns:
+        df_output (dataframe): The pandas dataframe of source records.
+    """
+    rng = np.random.default_rng(seed)
+    dict_output = {}
+    for column in LIST_SOURCE_COLUMN:
+        array_value = np.char.add(f"{column}_", rng.integers(0, row_count, row_count).astype(str)).astype(object)
+        array_value[rng.random(row_count) < 0.05] = None
+        dict_output[column] = array_value
+    dict_output["EntityID"] = np.arange(row_count).astype(str)
+    return pd.DataFrame(dict_output)
+
+def benchmark_ingest_csv(row_count, seed, engine):
+    """Measure the parse time of ingest_csv and the memory of the dataframe.
+
+    Args:
+        row_count (int): Number of records.
+        seed (int): Seed of the random generator.
+        engine (str): "c" or "pyarrow".
+
+    Returns:
+        (dict): Benchmark result.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = os.path.join(directory, "source.csv")
+        generate_source_records(row_count, seed).to_csv(file_path, index=False)
+        start = time.perf_counter()
+        df_source = ingest_csv(file_path, ",", engine)
+        elapsed = time.perf_counter() - start
+    return {
+        "stage": f"ingest_csv[{engine}]",
+        "rows": row_count,
+        "seconds": round(elapsed, 3),
+        "rows_per_second": int(row_count / elapsed) if elapsed > 0 else None,
+        "memory_bytes": int(df_source.memory_usage(deep=True).sum())
+    }
+
+def measure_stage(stage, row_count, function, *args, trace_memory=False):
+    """Measure the time and memory of a stage.
+
+    Args:
+        stage (str): Name of the stage.
+        row_count (int): Number of records into the stage.
+        function (function): The stage.
+        *args: The arguments of the stage.
+        trace_memory (bool): Also trace the peak memory allocated by the stage with tracemalloc, which slows the stage down.
+
+    Returns:
+        output: The output of the stage.
+        (dict): Benchmark result, with the RSS at the end of the stage, its change across the stage,
+            and process_peak_rss_bytes, the peak RSS of the whole process up to the end of the stage rather than of the stage.
+    """
+    if trace_memory:
+        tracemalloc.start()
+    start_rss_bytes = get_rss_bytes()
+    start = time.perf_counter()
+    output = function(*args)
+    elapsed = time.perf_counter() - start
+    rss_bytes = get_rss_bytes()
+    dict_result = {
+        "stage": stage,
+        "rows": row_count,
+        "seconds": round(elapsed, 3),
+        "rows_per_second": int(row_count / elapsed) if elapsed > 0 else None,
+        "rss_bytes": rss_bytes,
+        "rss_delta_bytes": rss_bytes - start_rss_bytes,
+        "process_peak_rss_bytes": max([rss_bytes, get_peak_rss_bytes()])
+    }
+    if trace_memory:
+        dict_result["peak_traced_bytes"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return output, dict_result
+
+def benchmark_pipeline_stages(row_count, seed, duplicate_ratio, conflict_ratio, trace_memory=False):
+    """Measure each stage of the pipeline from ingest to quarantine on generated legacy records.
+
+    Args:
+        row_count (int): Number of records.
+        seed (int): Seed of the random generator.
+        duplicate_ratio (float): Ratio of records which are duplicate of another record.
+        conflict_ratio (float): Ratio of duplicate records which have different information from the original record.
+        trace_memory (bool): Also trace the peak memory allocated by each stage.
+
+    Returns:
+        list_result (list): Benchmark result of each stage.
+    """
+    list_result = []
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = os.path.join(directory, "source.csv")
+        generate_legacy_records(row_count, seed, duplicate_ratio, conflict_ratio).to_csv(file_path, index=False)
+        df_source, dict_result = measure_stage("ingest_csv", row_count, ingest_csv, file_path, ",", trace_memory=trace_memory)
+        list_result.append(dict_result)
+        df_cleanse, dict_result = measure_stage("cleanse_data", len(df_source), cleanse_data, df_source, trace_memory=trace_memory)
+        list_result.append(dict_result)
+        df_cleanse_accept = df_cleanse[df_cleanse["cleanse_reject"] == False]
+        df_cleanse_reject = df_cleanse[df_cleanse["cleanse_reject"] == True]
+        (df_deduplicate, df_duplicate_reject), dict_result = measure_stage("deduplicate_records", len(df_cleanse_accept), deduplicate_records, df_cleanse_accept, trace_memory=trace_memory)
+        list_result.append(dict_result)
+        df_business_rules, dict_result = measure_stage("validate_business_rules", len(df_deduplicate), validate_business_rules, df_deduplicate, trace_memory=trace_memory)
+        list_result.append(dict_result)
+        df_business_rules_accept = df_business_rules[df_business_rules["business_rules_reject"] == False]
+        df_business_rules_reject = df_business_rules[df_business_rules["business_rules_reject"] == True]
+        _, dict_result = measure_stage("transform_fields", len(df_business_rules_accept), transform_fields, df_business_rules_accept, trace_memory=trace_memory)
+        list_result.append(dict_result)
+        list_df_problematic_case = [df_cleanse_reject, df_duplicate_reject, df_business_rules_reject]
+        _, dict_result = measure_stage("quarantine_records", len(df_source), quarantine_records, os.path.join(directory, "quarantine.csv"), ",", df_source, list_df_problematic_case, trace_memory=trace_memory)
+        list_result.append(dict_result)
+    return list_result
+
+def benchmark_copy_on_write(row_count, seed, duplicate_ratio, conflict_ratio):
+    """Compare each stage of the pipeline with deep copies and with pandas Copy-on-Write, by time and the peak memory allocated by the stage.
+
+    Args:
+        row_count (int): Number of records.
+        seed (int): Seed of the random generator.
+        duplicate_ratio (float): Ratio of records which are duplicate of another record.
+        conflict_ratio (float): Ratio of duplicate records which have different information from the original record.
+
+    Returns:
+        list_result (list): Benchmark result of each stage in each mode, e.g. "transform_fields[deep_copy]" and "transform_fields[copy_on_write]".
+    """
+    list_result = []
+    for copy_on_write in [False, True]:
+        with pd.option_context("mode.copy_on_write", copy_on_write):
+            for dict_result in benchmark_pipeline_stages(row_count, seed, duplicate_ratio, conflict_ratio, trace_memory=True):
+                dict_result["stage"] = f'{dict_result["stage"]}[{"copy_on_write" if copy_on_write else "deep_copy"}]'
+                list_result.append(dict_result)
+    return list_result
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the stages of the pipeline on generated data.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100000, 1000000, 10000000], help="Number of records of each run.")
+    parser.add_argument("--duplicate-ratio", type=float, default=0.1, help="Ratio of records which are duplicate of another record.")
+    parser.add_argument("--conflict-ratio", type=float, default=0.3, help="Ratio of duplicate records which have different information.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the random generator.")
+    parser.add_argument("--trace-memory", action="store_true", help="Also trace the peak memory allocated by each stage of the pipeline, which slows the stages down.")
+    parser.add_argument("--compare-copy-on-write", action="store_true", help="Run the stages of the pipeline with deep copies and with Copy-on-Write, and trace the peak memory of each stage.")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+    for row_count in args.rows:
+        for engine in ["c", "pyarrow"]:
+            print(benchmark_ingest_csv(row_count, args.seed, engine))
+        print(benchmark_deduplicate_records(row_count, args.duplicate_ratio, args.conflict_ratio, args.seed))
+        if args.compare_copy_on_write:
+            list_result = benchmark_copy_on_write(row_count, args.seed, args.duplicate_ratio, args.conflict_ratio)
+        else:
+            list_result = benchmark_pipeline_stages(row_count, args.seed, args.duplicate_ratio, args.conflict_ratio, args.trace_memory)
+        for dict_result in list_result:
+            print(dict_result)
@@ -0,0 +1,125 @@
+import argparse
+import numpy as np
+import pandas as pd
+
+from reference_value import LIST_SOURCE_COLUMN
+
+SAMPLE_CSV_PATH = "sample_data/sample-legacy-data.csv"
+
+# Input date formats of the legacy source and their shares, MM/DD/YY dominates as in the sample data.
+# DD/MM/YY dates are only told apart from MM/DD/YY when the day is above 12, the others are read as MM/DD/YY as in the sample data
+LIST_DATE_FORMAT_WEIGHT = [
+    ("%-m/%-d/%y", 0.9),
+    ("%m-%d-%y", 0.04),
+    ("%-d/%-m/%y", 0.03),
+    ("%-d-%b-%y", 0.02),
+    ("%Y-%m-%d", 0.01)
+]
+
+def generate_legacy_records(row_count, seed=0, duplicate_ratio=0.1, conflict_ratio=0.3, missing_ratio=0.05, sample_path=SAMPLE_CSV_PATH):
+    """Generate records with the quirks of the legacy source at any scale, the same seed gives the same records.
+
+    EntityType, Status, Industry and the combination of Country, CountryCode, State and StateCode are drawn from the sample data,
+    so that e.g. "XX-YY" country codes, "NULL" industries, "Y"/"N" statuses and country and state names in various forms keep their shares.
+    Entity names, registration numbers, dates and emails are new values in the same shapes as the sample data, with mixed date formats.
+
+    Args:
+        row_count (int): Number of records.
+        seed (int): Seed of the random generator.
+        duplicate_ratio (float): Ratio of records which are duplicate of another record in EntityName and EntityType.
+        conflict_ratio (float): Ratio of duplicate records which have different Status and LastUpdate from the original record.
+        missing_ratio (float): Ratio of missing values in RegistrationNumber, IncorporationDate, ContactEmail and LastUpdate, beside the missing values drawn from the sample data.
+        sample_path (str): The path of the sample CSV file.
+
+    Returns:
+        df_output (dataframe): The pandas dataframe of raw CSV text, missing values are empty strings, in the order of the source columns.
+    """
+    rng = np.random.default_rng(seed)
+    df_sample = pd.read_csv(sample_path, dtype=str, keep_default_na=False, encoding="utf-8-sig")
+    unique_count = max([1, int(row_count * (1 - duplicate_ratio))])
+    # Every record points to a unique entity, records beyond the unique ones are duplicates of a random entity, then the records are shuffled
+    entity = np.concatenate([np.arange(unique_count), rng.integers(0, unique_count, row_count - unique_count)])
+    conflict = np.concatenate([np.zeros(unique_count, dtype=bool), rng.random(row_count - unique_count) < conflict_ratio])
+    order = rng.permutation(row_count)
+    entity, conflict = entity[order], conflict[order]
+
+    dict_output = {"EntityID": np.arange(1001, 1001 + row_count).astype(str).astype(object)}
+    # Values of an entity are drawn once per entity, so that duplicate records are identical unless they conflict
+    array_sample_name = df_sample["EntityName"].to_numpy()[rng.integers(0, len(df_sample), unique_count)]
+    array_entity_number = np.arange(unique_count).astype(str)
+    dict_output["EntityName"] = (pd.Series(array_sample_name, dtype=object) + " " + pd.Series(array_entity_number, dtype=object)).to_numpy()[entity]
+    for column in ["EntityType", "Industry"]:
+        dict_output[column] = df_sample[column].to_numpy()[rng.integers(0, len(df_sample), unique_count)][entity]
+    array_registration_number = np.char.add("REG", np.char.zfill(rng.integers(0, 100000, unique_count).astype(str), 5)).astype(object)
+    array_registration_number[rng.random(unique_count) < 0.25] = ""
+    dict_output["RegistrationNumber"] = array_registration_number[entity]
+    dict_output["IncorporationDate"] = generate_mixed_dates(rng, unique_count, "2000-01-01", "2022-12-31", missing_ratio)[entity]
+    array_location = rng.integers(0, len(df_sample), unique_count)[entity]
+    for column in ["Country", "CountryCode", "State", "StateCode"]:
+        dict_output[column] = df_sample[column].to_numpy()[array_location]
+    array_status = df_sample["Status"].to_numpy()[rng.integers(0, len(df_sample), unique_count)][entity]
+    array_status[conflict] = df_sample["Status"].to_numpy()[rng.integers(0, len(df_sample), int(conflict.sum()))]
+    dict_output["Status"] = array_status
+    dict_output["ContactEmail"] = generate_emails(rng, array_sample_name, array_entity_number, missing_ratio)[entity]
+    array_last_update = generate_mixed_dates(rng, unique_count, "2021-06-01", "2022-06-30", missing_ratio)[entity]
+    array_last_update[conflict] = generate_mixed_dates(rng, int(conflict.sum()), "2021-06-01", "2022-06-30", missing_ratio)
+    dict_output["LastUpdate"] = array_last_update
+    df_output = pd.DataFrame(dict_output)[LIST_SOURCE_COLUMN]
+    # A few records have nothing but the name, as record 1043 of the sample data
+    df_output.loc[rng.random(row_count) < 0.005, LIST_SOURCE_COLUMN[2:]] = ""
+    return df_output
+
+def generate_mixed_dates(rng, count, start, end, missing_ratio):
+    """Generate random dates between start and end, each written in one of the input date formats of the legacy source.
+
+    Args:
+        rng (Generator): The numpy random generator.
+        count (int): Number of dates.
+        start (str): The first date, e.g. "2000-01-01".
+        end (str): The last date.
+        missing_ratio (float): Ratio of missing dates.
+
+    Returns:
+        array_output (array): The numpy array of date strings, missing dates are empty strings.
+    """
+    index_date = pd.date_range(start, end, freq="D")
+    # Every date is formatted once per format, the records take the strings by position
+    array_date_string = np.array([index_date.strftime(x[0]).to_numpy(dtype=object) for x in LIST_DATE_FORMAT_WEIGHT])
+    array_weight = np.array([x[1] for x in LIST_DATE_FORMAT_WEIGHT])
+    array_format = rng.choice(len(LIST_DATE_FORMAT_WEIGHT), count, p=array_weight / array_weight.sum())
+    array_output = array_date_string[array_format, rng.integers(0, len(index_date), count)]
+    array_output[rng.random(count) < missing_ratio] = ""
+    return array_output
+
+def generate_emails(rng, array_name, array_number, missing_ratio):
+    """Generate contact emails from the entity names, a few of them are malformed as in the sample data.
+
+    Args:
+        rng (Generator): The numpy random generator.
+        array_name (array): The numpy array of entity names without number.
+        array_number (array): The numpy array of entity numbers, which make the emails unique.
+        missing_ratio (float): Ratio of missing emails.
+
+    Returns:
+        array_output (array): The numpy array of emails, missing emails are empty strings.
+    """
+    count = len(array_name)
+    series_domain = pd.Series(array_name, dtype=object).str.lower().str.replace(r'[^a-z0-9]', '', regex=True) + pd.Series(array_number, dtype=object)
+    series_prefix = pd.Series(np.array(["info", "contact", "support"], dtype=object)[rng.integers(0, 3, count)])
+    series_suffix = pd.Series(np.array([".com", ".org", ".co.uk", ".com.au", ".sg", ".in", ".ca", ".de"], dtype=object)[rng.integers(0, 8, count)])
+    array_output = (series_prefix + "@" + series_domain + series_suffix).to_numpy(copy=True)
+    # Malformed emails without "@", e.g. "goldenGate.me"
+    array_malformed = rng.random(count) < 0.01
+    array_output[array_malformed] = (series_domain + ".me").to_numpy()[array_malformed]
+    array_output[rng.random(count) < missing_ratio] = ""
+    return array_output
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a CSV file with the quirks of the legacy source data.")
+    parser.add_argument("--rows", type=int, required=True, help="Number of records.")
+    parser.add_argument("--output", required=True, help="The path of the CSV file.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the random generator.")
+    parser.add_argument("--duplicate-ratio", type=float, default=0.1, help="Ratio of records which are duplicate of another record.")
+    parser.add_argument("--conflict-ratio", type=float, default=0.3, help="Ratio of duplicate records which have different information.")
+    args = parser.parse_args()
+    generate_legacy_records(args.rows, args.seed, args.duplicate_ratio, args.conflict_ratio).to_csv(args.output, index=False)
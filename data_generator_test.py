@@ -0,0 +1,32 @@
+import unittest
+
+from data_generator import generate_legacy_records
+from reference_value import LIST_SOURCE_COLUMN
+
+class TestDataGenerator(unittest.TestCase):
+    def test_generate_legacy_records(self):
+        """Test that it can generate the same records for the same seed, with the source columns and the quirks of the sample data.
+        """
+        df_output = generate_legacy_records(5000, seed=1)
+        self.assertTrue(df_output.equals(generate_legacy_records(5000, seed=1)))
+        self.assertFalse(df_output.equals(generate_legacy_records(5000, seed=2)))
+        self.assertEqual(list(df_output.columns), LIST_SOURCE_COLUMN)
+        self.assertEqual(len(df_output), 5000)
+        self.assertTrue(df_output["EntityID"].is_unique)
+        self.assertTrue(df_output["Status"].isin(["Y", "N"]).any())
+        self.assertTrue((df_output["Industry"] == "NULL").any())
+        self.assertTrue(df_output["CountryCode"].str.fullmatch(r'[A-Z]{2}-\w+').any())
+        self.assertTrue(df_output["IncorporationDate"].str.fullmatch(r'\d{1,2}-[A-Z][a-z]{2}-\d{2}').any())
+
+    def test_generate_legacy_records_duplicate(self):
+        """Test that it can generate records duplicate in EntityName and EntityType by the duplicate ratio.
+        """
+        df_output = generate_legacy_records(2000, seed=0, duplicate_ratio=0.2, conflict_ratio=0.0)
+        series_duplicate = df_output.duplicated(["EntityName"], keep="first")
+        self.assertEqual(series_duplicate.sum(), 400)
+        df_duplicate = df_output[df_output["EntityName"].duplicated(keep=False) & (df_output["EntityType"] != "")]
+        # Without conflicts, duplicate records are the same except EntityID
+        self.assertEqual(df_duplicate.drop(columns="EntityID").drop_duplicates().groupby("EntityName").size().max(), 1)
+
+if __name__ == "__main__":
+    unittest.main()
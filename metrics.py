@@ -0,0 +1,311 @@
+import contextlib
+import json
+import logging
+import os
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+import pandas as pd
+
+class RunMetrics:
+    """Collect wall time, CPU time, rows in and out and reject counts of every stage and cleanse step of a run.
+
+    Metrics of the same stage are added up, e.g. over the chunks of streaming mode.
+    With memory profiling, the RSS, its change across the stage and the peak memory traced by tracemalloc are also recorded at the end of every stage (the largest over the calls of the stage),
+    together with the size of the live dataframes passed to record_dataframes.
+    """
+    def __init__(self, runner, profile_memory=False):
+        """Start the run.
+
+        Args:
+            runner (str): Name of the runner, e.g. "full", "streaming" or "pipelined".
+            profile_memory (bool): Record memory at the end of every stage, tracemalloc is started and slows the run down.
+        """
+        self.runner = runner
+        self.profile_memory = profile_memory
+        self.started_at = datetime.now()
+        self.start_wall = time.perf_counter()
+        self.start_cpu = time.process_time()
+        self.dict_stage = {}
+        self.dict_step = {}
+        self.dict_dataframe = {}
+        if profile_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        # Stages of pipelined mode record their metrics from different threads
+        self.lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def measure(self, stage, rows_in):
+        """Measure a stage, the caller sets rows_out and reject_rows of the yielded record, and rows_in if it is only known after the stage, e.g. reading.
+
+        CPU time is the CPU time of this process during the stage, which includes the threads of the stage
+        (and the concurrent stages in pipelined mode) but not worker processes.
+
+        Args:
+            stage (str): Name of the stage.
+            rows_in (int): Number of records into the stage.
+
+        Yields:
+            record (dict): With keys rows_in, rows_out (the same as rows_in if it is not set) and reject_rows (0 if it is not set).
+        """
+        record = {"rows_in": rows_in, "rows_out": None, "reject_rows": 0}
+        start_rss_bytes = self.start_memory()
+        start_wall = time.perf_counter()
+        start_cpu = time.process_time()
+        yield record
+        self.add_stage(stage, time.perf_counter() - start_wall, time.process_time() - start_cpu, record["rows_in"], record["rows_in"] if record["rows_out"] is None else record["rows_out"], record["reject_rows"], self.measure_memory(stage, start_rss_bytes))
+
+    def measure_iterator(self, stage, iterable):
+        """Measure a stage producing items, e.g. reading chunks, each item is recorded as one call with its number of records.
+
+        Args:
+            stage (str): Name of the stage.
+            iterable (iterable): The items, each of them has a length.
+
+        Yields:
+            The items of the iterable.
+        """
+        iterator = iter(iterable)
+        while True:
+            start_rss_bytes = self.start_memory()
+            start_wall = time.perf_counter()
+            start_cpu = time.process_time()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            self.add_stage(stage, time.perf_counter() - start_wall, time.process_time() - start_cpu, len(item), len(item), 0, self.measure_memory(stage, start_rss_bytes))
+            yield item
+
+    def start_memory(self):
+        """Reset the peak memory traced by tracemalloc and get the RSS at the start of a stage, if memory profiling is enabled.
+
+        The peak and the RSS are shared by the whole process, so they overlap between stages running at the same time in pipelined mode.
+
+        Returns:
+            (int): The RSS in bytes, or None if memory profiling is disabled.
+        """
+        if not self.profile_memory:
+            return None
+        tracemalloc.reset_peak()
+        return get_rss_bytes()
+
+    def measure_memory(self, stage, start_rss_bytes):
+        """Measure memory at the end of a stage and log it right away, so that it is kept in the log even if the run is killed for lack of memory.
+
+        Args:
+            stage (str): Name of the stage.
+            start_rss_bytes (int): The RSS at the start of the stage from start_memory.
+
+        Returns:
+            dict_memory (dict): RSS, change of RSS across the stage, peak RSS of the process so far and peak traced memory of the stage in bytes,
+                or None if memory profiling is disabled.
+        """
+        if not self.profile_memory:
+            return None
+        rss_bytes = get_rss_bytes()
+        # ru_maxrss is the high-water mark of the whole process, not of the stage
+        dict_memory = {"rss_bytes": rss_bytes, "rss_delta_bytes": rss_bytes - start_rss_bytes, "process_peak_rss_bytes": max([rss_bytes, get_peak_rss_bytes()]), "peak_traced_bytes": tracemalloc.get_traced_memory()[1]}
+        logging.info(f'-- Memory after {stage}: RSS {format_bytes(dict_memory["rss_bytes"])} ({format_bytes(dict_memory["rss_delta_bytes"])} change), peak traced {format_bytes(dict_memory["peak_traced_bytes"])}, process peak RSS {format_bytes(dict_memory["process_peak_rss_bytes"])}.')
+        return dict_memory
+
+    def record_dataframes(self, stage, dict_object):
+        """Record the size of the live dataframes at the end of a stage, if memory profiling is enabled.
+
+        Sizes are measured by memory_usage(deep=True), so objects shared by several dataframes are counted in each of them.
+
+        Args:
+            stage (str): Name of the stage.
+            dict_object (dict): Objects by name, e.g. locals() of the runner, only the dataframes are measured.
+        """
+        if not self.profile_memory:
+            return
+        dict_size = {x: int(y.memory_usage(deep=True).sum()) for x, y in dict_object.items() if isinstance(y, pd.DataFrame)}
+        logging.info(f'-- Live dataframes after {stage}: {format_bytes(sum(dict_size.values()))} in total, ' + ", ".join([f'{x} {format_bytes(y)}' for x, y in dict_size.items()]) + '.')
+        with self.lock:
+            dict_stage_size = self.dict_dataframe.setdefault(stage, {})
+            for name, size in dict_size.items():
+                dict_stage_size[name] = max([dict_stage_size.get(name, 0), size])
+
+    def add_stage(self, stage, wall_seconds, cpu_seconds, rows_in, rows_out, reject_rows, dict_memory=None):
+        """Add the metrics of a stage.
+
+        Args:
+            stage (str): Name of the stage.
+            wall_seconds (float): Wall time of the stage.
+            cpu_seconds (float): CPU time of the stage.
+            rows_in (int): Number of records into the stage.
+            rows_out (int): Number of records out of the stage.
+            reject_rows (int): Number of records rejected by the stage.
+            dict_memory (dict): Memory at the end of the stage from measure_memory, or None.
+        """
+        with self.lock:
+            add_metric(self.dict_stage, stage, wall_seconds, cpu_seconds, rows_in, rows_out, reject_rows, dict_memory)
+
+    def add_steps(self, list_step_metric):
+        """Add the metrics of cleanse steps.
+
+        Args:
+            list_step_metric (list): Metrics of cleanse steps, dictionaries with keys step, wall_seconds, cpu_seconds, rows_in, rows_out and reject_rows.
+        """
+        with self.lock:
+            for metric in list_step_metric:
+                add_metric(self.dict_step, metric["step"], metric["wall_seconds"], metric["cpu_seconds"], metric["rows_in"], metric["rows_out"], metric["reject_rows"])
+
+    def summarize(self):
+        """Summarize the run.
+
+        Returns:
+            (dict): The run report, with the metrics of every stage and cleanse step in the order they were first recorded.
+        """
+        dict_report = {
+            "runner": self.runner,
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "finished_at": datetime.now().isoformat(timespec="seconds"),
+            "wall_seconds": round(time.perf_counter() - self.start_wall, 3),
+            "cpu_seconds": round(time.process_time() - self.start_cpu, 3),
+            "stages": [summarize_metric(x, y) for x, y in self.dict_stage.items()],
+            "cleanse_steps": [summarize_metric(x, y) for x, y in self.dict_step.items()]
+        }
+        if self.profile_memory:
+            dict_report["process_peak_rss_bytes"] = get_peak_rss_bytes()
+            dict_report["live_dataframe_bytes"] = self.dict_dataframe
+        return dict_report
+
+    def write_report(self, file_path, dict_extra=None):
+        """Write the run report as JSON and log the summary table.
+
+        Args:
+            file_path (str): The path of the JSON file.
+            dict_extra (dict): Other information of the run added to the report, e.g. the source path.
+
+        Returns:
+            dict_report (dict): The run report.
+        """
+        dict_report = self.summarize()
+        dict_report.update(dict_extra or {})
+        with open(file_path, "w", encoding="utf-8") as f:
+            json.dump(dict_report, f, indent=2, default=str)
+        log_metric_table("Stage", dict_report["stages"])
+        log_metric_table("Cleanse step", dict_report["cleanse_steps"])
+        if self.profile_memory:
+            log_memory_table(dict_report["stages"])
+        logging.info(f'- Run report is written to {file_path}.')
+        return dict_report
+
+def add_metric(dict_metric, name, wall_seconds, cpu_seconds, rows_in, rows_out, reject_rows, dict_memory=None):
+    """Add up the metrics of a stage or step, memory is the largest over the calls.
+
+    Args:
+        dict_metric (dict): Metrics keyed by name, updated in place.
+        name (str): Name of the stage or step.
+        wall_seconds (float): Wall time.
+        cpu_seconds (float): CPU time.
+        rows_in (int): Number of records in.
+        rows_out (int): Number of records out.
+        reject_rows (int): Number of records rejected.
+        dict_memory (dict): Memory in bytes at the end of the stage, or None.
+    """
+    metric = dict_metric.setdefault(name, {"calls": 0, "wall_seconds": 0.0, "cpu_seconds": 0.0, "rows_in": 0, "rows_out": 0, "reject_rows": 0})
+    metric["calls"] += 1
+    metric["wall_seconds"] += wall_seconds
+    metric["cpu_seconds"] += cpu_seconds
+    metric["rows_in"] += int(rows_in)
+    metric["rows_out"] += int(rows_out)
+    metric["reject_rows"] += int(reject_rows)
+    if dict_memory is not None:
+        metric_memory = metric.setdefault("memory", {})
+        for key, value in dict_memory.items():
+            metric_memory[key] = max([metric_memory.get(key, value), value])
+
+def summarize_metric(name, metric):
+    """Round the metrics of a stage or step and add rows per second.
+
+    Args:
+        name (str): Name of the stage or step.
+        metric (dict): Metrics from add_metric.
+
+    Returns:
+        dict_summary (dict): The metrics with name and rows_per_second (records in per second of wall time), and memory if it is recorded.
+    """
+    dict_summary = {
+        "name": name,
+        "calls": metric["calls"],
+        "wall_seconds": round(metric["wall_seconds"], 3),
+        "cpu_seconds": round(metric["cpu_seconds"], 3),
+        "rows_in": metric["rows_in"],
+        "rows_out": metric["rows_out"],
+        "rows_per_second": int(metric["rows_in"] / metric["wall_seconds"]) if metric["wall_seconds"] > 0 else None,
+        "reject_rows": metric["reject_rows"]
+    }
+    dict_summary.update(metric.get("memory", {}))
+    return dict_summary
+
+def log_metric_table(title, list_metric):
+    """Log metrics as a table.
+
+    Args:
+        title (str): Title of the first column.
+        list_metric (list): Metrics from summarize_metric.
+    """
+    logging.info(f'-- {title:<30} {"wall s":>9} {"cpu s":>9} {"rows in":>10} {"rows out":>10} {"rows/s":>10} {"rejects":>9}')
+    for metric in list_metric:
+        rows_per_second = metric["rows_per_second"] if metric["rows_per_second"] is not None else "-"
+        logging.info(f'-- {metric["name"]:<30} {metric["wall_seconds"]:>9.3f} {metric["cpu_seconds"]:>9.3f} {metric["rows_in"]:>10} {metric["rows_out"]:>10} {rows_per_second:>10} {metric["reject_rows"]:>9}')
+
+def log_memory_table(list_metric):
+    """Log the memory of stages as a table.
+
+    Args:
+        list_metric (list): Metrics from summarize_metric with memory.
+    """
+    logging.info(f'-- {"Stage memory":<30} {"RSS":>12} {"RSS change":>12} {"peak traced":>12}')
+    for metric in list_metric:
+        if "rss_bytes" in metric:
+            logging.info(f'-- {metric["name"]:<30} {format_bytes(metric["rss_bytes"]):>12} {format_bytes(metric["rss_delta_bytes"]):>12} {format_bytes(metric["peak_traced_bytes"]):>12}')
+
+def get_rss_bytes():
+    """Get the current resident set size of this process.
+
+    Returns:
+        (int): The RSS in bytes, or the peak RSS where the current RSS is not available, i.e. outside Linux.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return get_peak_rss_bytes()
+
+def get_peak_rss_bytes():
+    """Get the peak resident set size of this process so far.
+
+    Returns:
+        (int): The peak RSS in bytes.
+    """
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+
+def format_bytes(size):
+    """Format a size in bytes as megabytes for the log.
+
+    Args:
+        size (int): Size in bytes.
+
+    Returns:
+        (str): e.g. "12.3 MB".
+    """
+    return f'{size / 1048576:.1f} MB'
+
+def generate_report_file_path(output_path):
+    """Generate the path of the run report next to the quarantine output.
+
+    Args:
+        output_path (str): The path of the quarantine output with datetime suffix.
+
+    Returns:
+        (str): The path of the JSON run report, e.g. "quarantine_20240101120000_report.json" for "quarantine_20240101120000.csv".
+    """
+    return os.path.splitext(output_path)[0] + "_report.json"
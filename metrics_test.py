@@ -0,0 +1,70 @@
+import unittest
+import json
+import os
+import tempfile
+import tracemalloc
+import pandas as pd
+
+from metrics import RunMetrics, generate_report_file_path
+
+class TestRunMetrics(unittest.TestCase):
+    def test_measure(self):
+        """Test that it can add up the metrics of a stage over several calls.
+        """
+        metrics = RunMetrics("streaming")
+        for rows_in, rows_out in [(10, 8), (5, 5)]:
+            with metrics.measure("cleanse_data", rows_in) as record:
+                record.update(rows_out=rows_out, reject_rows=rows_in - rows_out)
+        with metrics.measure("transform_fields", 13):
+            pass
+        list_chunk = list(metrics.measure_iterator("ingest_source", [[1, 2], [3]]))
+        self.assertEqual(list_chunk, [[1, 2], [3]])
+        dict_report = metrics.summarize()
+        dict_stage = {x["name"]: x for x in dict_report["stages"]}
+        self.assertEqual(list(dict_stage), ["cleanse_data", "transform_fields", "ingest_source"])
+        self.assertEqual([dict_stage["cleanse_data"][x] for x in ["calls", "rows_in", "rows_out", "reject_rows"]], [2, 15, 13, 2])
+        self.assertEqual([dict_stage["transform_fields"][x] for x in ["calls", "rows_in", "rows_out", "reject_rows"]], [1, 13, 13, 0])
+        self.assertEqual([dict_stage["ingest_source"][x] for x in ["calls", "rows_in", "rows_out"]], [2, 3, 3])
+
+    def test_write_report(self):
+        """Test that it can write the metrics of stages and cleanse steps to a JSON report next to the quarantine output.
+        """
+        metrics = RunMetrics("full")
+        metrics.add_stage("deduplicate_records", 2.0, 1.5, 100, 90, 10)
+        metrics.add_steps([
+            {"step": "process_status", "wall_seconds": 0.5, "cpu_seconds": 0.5, "rows_in": 100, "rows_out": 100, "reject_rows": 3},
+            {"step": "process_status", "wall_seconds": 0.5, "cpu_seconds": 0.5, "rows_in": 50, "rows_out": 50, "reject_rows": 1}
+        ])
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = generate_report_file_path(os.path.join(directory, "quarantine_20240101120000.csv"))
+            self.assertEqual(os.path.basename(file_path), "quarantine_20240101120000_report.json")
+            _ = metrics.write_report(file_path, {"source_path": "asdf.csv"})
+            with open(file_path, encoding="utf-8") as f:
+                dict_report = json.load(f)
+        self.assertEqual(dict_report["runner"], "full")
+        self.assertEqual(dict_report["source_path"], "asdf.csv")
+        self.assertEqual(dict_report["stages"], [{"name": "deduplicate_records", "calls": 1, "wall_seconds": 2.0, "cpu_seconds": 1.5, "rows_in": 100, "rows_out": 90, "rows_per_second": 50, "reject_rows": 10}])
+        self.assertEqual(dict_report["cleanse_steps"], [{"name": "process_status", "calls": 2, "wall_seconds": 1.0, "cpu_seconds": 1.0, "rows_in": 150, "rows_out": 150, "rows_per_second": 150, "reject_rows": 4}])
+
+    def test_profile_memory(self):
+        """Test that it can record the memory at the end of a stage and the size of live dataframes when memory profiling is enabled.
+        """
+        metrics = RunMetrics("full", profile_memory=True)
+        try:
+            with metrics.measure("ingest_source", 0) as record:
+                df_source = pd.DataFrame({"EntityName": [f"asdf{i}" for i in range(100000)]})
+                record["rows_in"] = len(df_source)
+            metrics.record_dataframes("ingest_source", {"df_source": df_source, "list_step_metric": []})
+            dict_report = metrics.summarize()
+        finally:
+            tracemalloc.stop()
+        self.assertGreater(dict_report["stages"][0]["peak_traced_bytes"], 1000000)
+        self.assertGreaterEqual(dict_report["stages"][0]["process_peak_rss_bytes"], dict_report["stages"][0]["rss_bytes"])
+        self.assertLessEqual(dict_report["stages"][0]["rss_delta_bytes"], dict_report["stages"][0]["rss_bytes"])
+        self.assertNotIn("peak_rss_bytes", dict_report["stages"][0], "The peak RSS of the process should not be reported as the peak of a stage.")
+        self.assertEqual(list(dict_report["live_dataframe_bytes"]["ingest_source"]), ["df_source"])
+        self.assertGreater(dict_report["live_dataframe_bytes"]["ingest_source"]["df_source"], 1000000)
+        self.assertNotIn("rss_bytes", RunMetrics("full").summarize())
+
+if __name__ == "__main__":
+    unittest.main()
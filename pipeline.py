@@ -1,15 +1,31 @@
 from dotenv import load_dotenv
 import os
 import logging
+import tempfile
+import time
+import contextlib
+import functools
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+import numpy as np
 import pandas as pd
+from pandas.api.types import union_categoricals
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
 import re
 from datetime import date, datetime
-import pycountry
-from translate import Translator
 import mysql.connector
+from mysql.connector import pooling
 from mysql.connector import errorcode
 
-from reference_value import LIST_ENTITY_TYPE, REGEX_PATTERN_REGISTRATION_NUMBER, REGEX_PATTERN_DATE_FORMAT, DATE_FORMAT_CODE_OUTPUT, REGEX_PATTERN_COUNTRY_CODE_OUTPUT, LIST_STATUS, DICT_STATUS_MAPPING, LIST_SCHEMA_MAPPING, QUERY_CREATE_TABLE_ENTITIES, QUERY_INSERT_UPDATE_ENTITY
+from metrics import RunMetrics, generate_report_file_path
+from reference_index import CountryResolver, SubdivisionIndex
+from stage_pipeline import run_stage_pipeline
+from state_store import StateStore
+from translation import SET_LANGUAGE_ALPHA_2, TranslationCache, StateNameTranslator, create_translation_backend
+from reference_value import LIST_SOURCE_COLUMN, LIST_CATEGORICAL_COLUMN, LIST_CSV_NA_VALUE, DICT_SOURCE_FORMAT_EXTENSION, REGEX_PATTERN_DATE_FORMAT, DATE_FORMAT_CODE_OUTPUT, LIST_DATE_FORMAT, REGEX_PATTERN_COUNTRY_CODE_OUTPUT, DICT_COLUMN_RULE, LIST_SCHEMA_MAPPING, QUERY_CREATE_TABLE_ENTITIES, QUERY_INSERT_UPDATE_ENTITY, QUERY_CREATE_TABLE_ENTITIES_STAGING, QUERY_DROP_TABLE_ENTITIES_STAGING, QUERY_LOAD_DATA_ENTITY_STAGING, QUERY_INSERT_UPDATE_ENTITY_FROM_STAGING
 
 load_dotenv()
 DICT_LOG_LEVEL_REFERENCE = {
@@ -24,6 +40,18 @@ SOURCE_CSV_PATH = os.environ.get("SOURCE_CSV_PATH")
 if not SOURCE_CSV_PATH:
     raise Exception("Source CSV path in .env is needed to continue!")
 SOURCE_CSV_DATA_SEPARATOR = os.environ.get("SOURCE_CSV_DATA_SEPARATOR", ",")
+# 0 means the whole CSV is processed at once, otherwise the CSV is streamed chunk by chunk
+SOURCE_CSV_CHUNK_ROWS = int(os.environ.get("SOURCE_CSV_CHUNK_ROWS", "0"))
+# "c" parses CSV by the C parser into Python-backed strings, "pyarrow" parses CSV by the multithreaded pyarrow reader into Arrow-backed strings (also for Parquet and Arrow IPC sources)
+SOURCE_CSV_ENGINE = os.environ.get("SOURCE_CSV_ENGINE", "c")
+if SOURCE_CSV_ENGINE not in ["c", "pyarrow"]:
+    raise Exception("Source CSV engine in .env should be either c or pyarrow!")
+# Keep the low-cardinality columns as pandas categoricals from ingest to load, the cleanse steps of these columns process the categories only
+SOURCE_CATEGORICAL = os.environ.get("SOURCE_CATEGORICAL", "false").lower() == "true"
+# "csv", "parquet" or "arrow" (Arrow IPC/Feather), empty means the format is detected by the extension of SOURCE_CSV_PATH
+SOURCE_FORMAT = os.environ.get("SOURCE_FORMAT", "")
+# 0 means the stages of streaming mode run one after another, otherwise they run concurrently with at most this number of chunks waiting between two stages
+PIPELINE_QUEUE_DEPTH = int(os.environ.get("PIPELINE_QUEUE_DEPTH", "0"))
 MYSQL_CONNECTION_CREDENTIAL = {
     "HOST": os.environ.get("MYSQL_HOST"),
     "PORT": os.environ.get("MYSQL_PORT"),
@@ -34,10 +62,64 @@ MYSQL_CONNECTION_CREDENTIAL = {
 }
 if not all(MYSQL_CONNECTION_CREDENTIAL.values()):
     raise Exception("MySQL connection credentials in .env are needed to continue!")
+# Rows are uploaded in batches of at most MYSQL_LOAD_BATCH_ROWS rows and about MYSQL_LOAD_BATCH_BYTES bytes, committed every MYSQL_LOAD_COMMIT_BATCHES batches
+MYSQL_LOAD_BATCH_ROWS = int(os.environ.get("MYSQL_LOAD_BATCH_ROWS", "5000"))
+MYSQL_LOAD_BATCH_BYTES = int(os.environ.get("MYSQL_LOAD_BATCH_BYTES", "4194304"))
+MYSQL_LOAD_COMMIT_BATCHES = int(os.environ.get("MYSQL_LOAD_COMMIT_BATCHES", "10"))
+# Number of threads loading disjoint entity_id ranges concurrently, each with its own connection from a pool of MYSQL_POOL_SIZE connections
+MYSQL_LOAD_WORKERS = int(os.environ.get("MYSQL_LOAD_WORKERS", "1"))
+MYSQL_POOL_SIZE = int(os.environ.get("MYSQL_POOL_SIZE", "5"))
+if MYSQL_POOL_SIZE < MYSQL_LOAD_WORKERS:
+    raise Exception("MySQL pool size in .env should not be less than the number of load workers!")
+# "insert" uploads rows by batched INSERT ... ON DUPLICATE KEY UPDATE, "load_data" bulk loads a TSV file into a staging table by LOAD DATA LOCAL INFILE
+MYSQL_LOAD_MODE = os.environ.get("MYSQL_LOAD_MODE", "insert")
+if MYSQL_LOAD_MODE not in ["insert", "load_data"]:
+    raise Exception("MySQL load mode in .env should be either insert or load_data!")
 QUARANTINE_CSV_PATH = os.environ.get("QUARANTINE_CSV_PATH")
 if not QUARANTINE_CSV_PATH:
     raise Exception("Quarantine CSV path in .env is needed to continue!")
 QUARANTINE_CSV_DATA_SEPARATOR = os.environ.get("QUARANTINE_CSV_DATA_SEPARATOR", ",")
+# "csv" writes the quarantine CSV, "parquet" writes a Parquet file instead (a directory of Parquet files in streaming mode)
+QUARANTINE_FORMAT = os.environ.get("QUARANTINE_FORMAT", "csv")
+if QUARANTINE_FORMAT not in ["csv", "parquet"]:
+    raise Exception("Quarantine format in .env should be either csv or parquet!")
+# A copy of the clean data ready to be loaded is written to this Parquet path for downstream analytics, empty means no copy
+CLEAN_OUTPUT_PARQUET_PATH = os.environ.get("CLEAN_OUTPUT_PARQUET_PATH", "")
+# "apply" processes columns row by row, "vectorized" processes columns with pandas string methods and boolean masks
+CLEANSE_ENGINE = os.environ.get("CLEANSE_ENGINE", "apply")
+if CLEANSE_ENGINE not in ["apply", "vectorized"]:
+    raise Exception("Cleanse engine in .env should be either apply or vectorized!")
+# Number of values sampled to infer the dominant date formats of a column in the vectorized engine
+DATE_FORMAT_SAMPLE_SIZE = int(os.environ.get("DATE_FORMAT_SAMPLE_SIZE", "10000"))
+# Process low-cardinality columns on their unique values only and map the result back
+CLEANSE_DICTIONARY_ENCODING = os.environ.get("CLEANSE_DICTIONARY_ENCODING", "false").lower() == "true"
+# Number of worker processes cleansing row shards in parallel, 1 means no worker process, 0 means one worker per CPU
+CLEANSE_WORKERS = int(os.environ.get("CLEANSE_WORKERS", "1"))
+if CLEANSE_WORKERS == 0:
+    CLEANSE_WORKERS = os.cpu_count()
+CLEANSE_SHARD_ROWS = int(os.environ.get("CLEANSE_SHARD_ROWS", "50000"))
+# Number of threads running independent cleanse steps concurrently, 1 means the steps run one by one
+CLEANSE_THREADS = int(os.environ.get("CLEANSE_THREADS", "1"))
+# Resolve the names of historic countries (ISO 3166-3) if a country name is not found by fuzzy search
+COUNTRY_INCLUDE_HISTORIC = os.environ.get("COUNTRY_INCLUDE_HISTORIC", "false").lower() == "true"
+# Load only new or changed entities, compared by content hash with the previous runs kept in the state store
+LOAD_DELTA = os.environ.get("LOAD_DELTA", "false").lower() == "true"
+STATE_STORE_PATH = os.environ.get("STATE_STORE_PATH", "pipeline-state.sqlite")
+# Skip records with LastUpdate at or below the watermark of the source, the latest LastUpdate of the loaded records saved in the state store after a successful load
+INCREMENTAL_INGESTION = os.environ.get("INCREMENTAL_INGESTION", "false").lower() == "true"
+# The watermark is kept per source name, use the same name for daily exports with different file names
+INCREMENTAL_SOURCE_NAME = os.environ.get("INCREMENTAL_SOURCE_NAME", "") or SOURCE_CSV_PATH
+# Record RSS, tracemalloc peaks and the size of live dataframes at the end of every stage, tracemalloc slows the run down
+PROFILE_MEMORY = os.environ.get("PROFILE_MEMORY", "false").lower() == "true"
+# Enable pandas Copy-on-Write, so that stages share the unchanged columns with their input instead of deep copying it
+COPY_ON_WRITE = os.environ.get("COPY_ON_WRITE", "false").lower() == "true"
+# "online" translates state names by translate.Translator, "dictionary" by a local dictionary file, "none" does not translate
+TRANSLATION_BACKEND = os.environ.get("TRANSLATION_BACKEND", "online")
+# SQLite file caching translations across runs, translations are cached in memory only if it is empty
+TRANSLATION_CACHE_PATH = os.environ.get("TRANSLATION_CACHE_PATH", "")
+TRANSLATION_DICTIONARY_PATH = os.environ.get("TRANSLATION_DICTIONARY_PATH", "")
+if TRANSLATION_BACKEND == "dictionary" and not TRANSLATION_DICTIONARY_PATH:
+    raise Exception("Translation dictionary path in .env is needed for the dictionary translation backend!")
 
 logging.basicConfig(
     format="[%(asctime)s][%(name)-5s][%(levelname)-5s] %(message)s (%(filename)s:%(lineno)d)",
@@ -45,120 +127,742 @@ logging.basicConfig(
     level=LOG_LEVEL
 )
 
-def ingest_csv(file_path, separator):
+# Set at import, so that cleanse worker processes run in the same mode
+if COPY_ON_WRITE:
+    pd.set_option("mode.copy_on_write", True)
+
+# Country indexes are built once at startup
+COUNTRY_RESOLVER = CountryResolver(include_historic=COUNTRY_INCLUDE_HISTORIC)
+SUBDIVISION_INDEX = SubdivisionIndex()
+STATE_STORE = StateStore(STATE_STORE_PATH)
+STATE_NAME_TRANSLATOR = StateNameTranslator(create_translation_backend(TRANSLATION_BACKEND, TRANSLATION_DICTIONARY_PATH), TranslationCache(TRANSLATION_CACHE_PATH))
+
+def get_source_string_dtype(engine):
+    """Get the string dtype of source data.
+
+    Args:
+        engine (str): "c" or "pyarrow".
+
+    Returns:
+        (dtype): "string[python]" for the C parser, "string[pyarrow]" for the pyarrow reader.
+    """
+    return pd.StringDtype("pyarrow" if engine == "pyarrow" else "python")
+
+def ingest_csv(file_path, separator, engine=SOURCE_CSV_ENGINE):
     """Ingest CSV data.
 
     Args:
         file_path (str): The path of the CSV file.
         separator (str): The separator in the CSV file.
+        engine (str): "c" or "pyarrow".
 
     Returns:
         df (dataframe): The pandas dataframe of imported data.
     """
-    df = pd.read_csv(file_path, sep=separator, dtype="string", encoding="utf-8")
+    df = pd.read_csv(file_path, sep=separator, dtype=get_source_string_dtype(engine), encoding="utf-8", engine=engine)
     logging.info(f'- {len(df)} records are read from the CSV.')
     return df
 
-def cleanse_data(df_original):
+def ingest_csv_chunks(file_path, separator, chunk_rows, engine=SOURCE_CSV_ENGINE):
+    """Ingest CSV data chunk by chunk, so that memory usage is bounded by the chunk size instead of the file size.
+
+    Args:
+        file_path (str): The path of the CSV file.
+        separator (str): The separator in the CSV file.
+        chunk_rows (int): The maximum number of records in each chunk.
+        engine (str): "c" or "pyarrow".
+
+    Yields:
+        df (dataframe): The pandas dataframe of imported data in one chunk. The index continues across chunks, so it is the record number in the whole CSV.
+    """
+    if engine == "pyarrow":
+        yield from convert_arrow_chunks(open_csv_batches(file_path, separator), chunk_rows, get_source_string_dtype(engine), "CSV")
+        return
+    with pd.read_csv(file_path, sep=separator, dtype="string", encoding="utf-8", chunksize=chunk_rows) as reader:
+        for df in reader:
+            logging.info(f'- {len(df)} records are read from the CSV (record {df.index[0]} to {df.index[-1]}).')
+            yield df
+
+def open_csv_batches(file_path, separator):
+    """Open CSV data by the pyarrow streaming reader, every column is read as string.
+
+    Args:
+        file_path (str): The path of the CSV file.
+        separator (str): The separator in the CSV file.
+
+    Returns:
+        (iterator): The Arrow record batches, of about 1 MB of CSV each.
+    """
+    parse_options = pa_csv.ParseOptions(delimiter=separator)
+    # The first block is read only for the column names, so that no column is inferred as another type than string
+    list_column = pa_csv.open_csv(file_path, parse_options=parse_options).schema.names
+    convert_options = pa_csv.ConvertOptions(column_types={x: pa.string() for x in list_column}, null_values=LIST_CSV_NA_VALUE, strings_can_be_null=True)
+    return pa_csv.open_csv(file_path, parse_options=parse_options, convert_options=convert_options)
+
+def convert_arrow_chunks(iterator_batch, chunk_rows, string_dtype, source_name):
+    """Regroup Arrow record batches into chunks of chunk_rows records and convert them to pandas dataframes of strings.
+
+    Args:
+        iterator_batch (iterator): The Arrow record batches of any size.
+        chunk_rows (int): The maximum number of records in each chunk.
+        string_dtype (dtype): The string dtype of the dataframes.
+        source_name (str): Name of the source in the log, e.g. "CSV".
+
+    Yields:
+        df (dataframe): The pandas dataframe of imported data in one chunk. The index continues across chunks, so it is the record number in the whole file.
+    """
+    start = 0
+    list_batch = []
+    buffered_rows = 0
+    for batch in itertools.chain(iterator_batch, [None]):
+        if batch is not None:
+            list_batch.append(batch)
+            buffered_rows += batch.num_rows
+        while buffered_rows >= chunk_rows or (batch is None and buffered_rows > 0):
+            table = pa.Table.from_batches(list_batch)
+            table_rest = table.slice(chunk_rows)
+            list_batch = table_rest.to_batches()
+            buffered_rows = table_rest.num_rows
+            df = convert_arrow_to_string(table.slice(0, chunk_rows), string_dtype)
+            df.index = pd.RangeIndex(start, start + len(df))
+            start += len(df)
+            logging.info(f'- {len(df)} records are read from the {source_name} (record {df.index[0]} to {df.index[-1]}).')
+            yield df
+
+def detect_source_format(file_path, source_format=SOURCE_FORMAT):
+    """Detect the format of the source file by the extension, unless the format is set.
+
+    Args:
+        file_path (str): The path of the source file.
+        source_format (str): "csv", "parquet" or "arrow", empty to detect by the extension.
+
+    Returns:
+        (str): "csv", "parquet" or "arrow".
+    """
+    if source_format == "":
+        source_format = DICT_SOURCE_FORMAT_EXTENSION.get(os.path.splitext(file_path)[1].lower(), "csv")
+    if source_format not in set(DICT_SOURCE_FORMAT_EXTENSION.values()):
+        logging.error(f'- Source format "{source_format}" is not supported.')
+        raise Exception("Source format is not supported")
+    return source_format
+
+def project_source_column(list_column):
+    """Project the columns of a columnar source file to the source columns used by the pipeline.
+
+    Args:
+        list_column (list): The columns in the source file.
+
+    Returns:
+        (list): The source columns used by the pipeline which are in the file, in the order of LIST_SOURCE_COLUMN.
+    """
+    return [x for x in LIST_SOURCE_COLUMN if x in list_column]
+
+def convert_arrow_to_string(table, string_dtype):
+    """Convert an Arrow table to a pandas dataframe of strings, same as the dataframe read from CSV.
+
+    Args:
+        table (table): The Arrow table, the columns can be of any type, e.g. integer or date.
+        string_dtype (dtype): The string dtype of the dataframe.
+
+    Returns:
+        df (dataframe): The pandas dataframe of strings.
+    """
+    table = table.cast(pa.schema([pa.field(x, pa.string()) for x in table.column_names]))
+    return table.to_pandas(types_mapper={pa.string(): string_dtype}.get)
+
+def read_source(file_path, separator, source_format=SOURCE_FORMAT):
+    """Read source data from CSV, Parquet or Arrow IPC/Feather. Columnar files are read with only the source columns used by the pipeline.
+
+    Args:
+        file_path (str): The path of the source file.
+        separator (str): The separator in the CSV file, not used for other formats.
+        source_format (str): "csv", "parquet" or "arrow", empty to detect by the extension.
+
+    Returns:
+        df (dataframe): The pandas dataframe of imported data.
+    """
+    source_format = detect_source_format(file_path, source_format)
+    if source_format == "csv":
+        return ingest_csv(file_path, separator)
+    if source_format == "parquet":
+        table = pq.read_table(file_path, columns=project_source_column(pq.read_schema(file_path).names))
+    else:
+        # Arrow IPC files are memory-mapped, so only the selected columns are read from disk
+        table = pa.ipc.open_file(pa.memory_map(file_path, "r")).read_all()
+        table = table.select(project_source_column(table.column_names))
+    df = convert_arrow_to_string(table, get_source_string_dtype(SOURCE_CSV_ENGINE))
+    logging.info(f'- {len(df)} records are read from the {source_format} file.')
+    return df
+
+def ingest_source(file_path, separator, source_format=SOURCE_FORMAT, categorical=SOURCE_CATEGORICAL):
+    """Ingest source data from CSV, Parquet or Arrow IPC/Feather.
+
+    Args:
+        file_path (str): The path of the source file.
+        separator (str): The separator in the CSV file, not used for other formats.
+        source_format (str): "csv", "parquet" or "arrow", empty to detect by the extension.
+        categorical (bool): Convert the low-cardinality columns to pandas categoricals.
+
+    Returns:
+        df (dataframe): The pandas dataframe of imported data.
+    """
+    df = read_source(file_path, separator, source_format)
+    return convert_to_categorical(df) if categorical else df
+
+def ingest_source_chunks(file_path, separator, chunk_rows, source_format=SOURCE_FORMAT, categorical=SOURCE_CATEGORICAL):
+    """Ingest source data from CSV, Parquet or Arrow IPC/Feather chunk by chunk.
+
+    Args:
+        file_path (str): The path of the source file.
+        separator (str): The separator in the CSV file, not used for other formats.
+        chunk_rows (int): The maximum number of records in each chunk.
+        source_format (str): "csv", "parquet" or "arrow", empty to detect by the extension.
+        categorical (bool): Convert the low-cardinality columns to pandas categoricals.
+
+    Yields:
+        df (dataframe): The pandas dataframe of imported data in one chunk. The index continues across chunks, so it is the record number in the whole file.
+    """
+    for df in read_source_chunks(file_path, separator, chunk_rows, source_format):
+        yield convert_to_categorical(df) if categorical else df
+
+def read_source_chunks(file_path, separator, chunk_rows, source_format=SOURCE_FORMAT):
+    """Read source data from CSV, Parquet or Arrow IPC/Feather chunk by chunk.
+
+    Args:
+        file_path (str): The path of the source file.
+        separator (str): The separator in the CSV file, not used for other formats.
+        chunk_rows (int): The maximum number of records in each chunk.
+        source_format (str): "csv", "parquet" or "arrow", empty to detect by the extension.
+
+    Yields:
+        df (dataframe): The pandas dataframe of imported data in one chunk. The index continues across chunks, so it is the record number in the whole file.
+    """
+    source_format = detect_source_format(file_path, source_format)
+    if source_format == "csv":
+        yield from ingest_csv_chunks(file_path, separator, chunk_rows)
+        return
+    if source_format == "parquet":
+        parquet_file = pq.ParquetFile(file_path)
+        iterator_batch = parquet_file.iter_batches(batch_size=chunk_rows, columns=project_source_column(parquet_file.schema_arrow.names))
+    else:
+        table = pa.ipc.open_file(pa.memory_map(file_path, "r")).read_all()
+        iterator_batch = table.select(project_source_column(table.column_names)).to_batches(max_chunksize=chunk_rows)
+    yield from convert_arrow_chunks(iterator_batch, chunk_rows, get_source_string_dtype(SOURCE_CSV_ENGINE), f"{source_format} file")
+
+def copy_dataframe(df):
+    """Copy a dataframe before a stage changes it, so that the input of the stage stays unchanged.
+
+    With pandas Copy-on-Write enabled, the copy is lazy: a column is only copied when the stage changes it, the other columns are shared with the input.
+    Otherwise the whole dataframe is deep copied.
+
+    Args:
+        df (dataframe): The pandas dataframe.
+
+    Returns:
+        (dataframe): The copy of the pandas dataframe.
+    """
+    return df.copy(deep=pd.get_option("mode.copy_on_write") is not True)
+
+def convert_to_categorical(df, list_column=LIST_CATEGORICAL_COLUMN):
+    """Convert low-cardinality string columns to pandas categoricals, the categories keep the string dtype and are sorted, so that sorting and grouping give the same order as strings.
+
+    Args:
+        df (dataframe): The pandas dataframe of strings.
+        list_column (list): The columns to be converted, columns not in the dataframe are skipped.
+
+    Returns:
+        df (dataframe): The pandas dataframe with categorical columns.
+    """
+    for column in [x for x in list_column if x in df.columns]:
+        codes, categories = pd.factorize(df[column], sort=True)
+        df[column] = pd.Categorical.from_codes(codes, dtype=pd.CategoricalDtype(categories))
+    return df
+
+def materialize_categorical(df):
+    """Convert pandas categoricals back to the string dtype of their categories.
+
+    Args:
+        df (dataframe): The pandas dataframe.
+
+    Returns:
+        df (dataframe): The pandas dataframe without categorical columns.
+    """
+    for column in [x for x in df.columns if isinstance(df[x].dtype, pd.CategoricalDtype)]:
+        df[column] = df[column].astype(df[column].cat.categories.dtype)
+    return df
+
+def concat_categorical(list_df):
+    """Concatenate dataframes whose categorical columns may have different categories, such columns stay categorical with the union of the categories.
+
+    Args:
+        list_df (list): List of pandas dataframes with the same columns.
+
+    Returns:
+        df (dataframe): The concatenated pandas dataframe.
+    """
+    df = pd.concat(list_df)
+    for column in list_df[0].columns:
+        if isinstance(list_df[0][column].dtype, pd.CategoricalDtype) and not isinstance(df[column].dtype, pd.CategoricalDtype):
+            df[column] = pd.Series(union_categoricals([x[column] for x in list_df], sort_categories=True), index=df.index)
+    return df
+
+def filter_by_watermark(df_source, watermark, engine=CLEANSE_ENGINE):
+    """Normalize LastUpdate and remove the records at or below the watermark, before the other columns are cleansed.
+
+    Records whose LastUpdate is missing or invalid are kept, so that they are cleansed and rejected as usual.
+
+    Args:
+        df_source (dataframe): The pandas dataframe of original data.
+        watermark (timestamp): The latest LastUpdate loaded from the source, or None to keep every record.
+        engine (str): "apply" or "vectorized".
+
+    Returns:
+        df_source (dataframe): The pandas dataframe of original data newer than the watermark.
+    """
+    step = [x for x in LIST_CLEANSE_STEP if x["column"] == "LastUpdate"][0]
+    # The column selection is already a new dataframe, the shallow copy only lets the step add columns to it without copying any data
+    df_last_update = step[engine](df_source[step["read"]].copy(deep=False))
+    series_last_update = pd.to_datetime(df_last_update["LastUpdate"].mask(df_last_update["LastUpdate_reject"]), format=DATE_FORMAT_CODE_OUTPUT, errors="coerce")
+    if watermark is not None:
+        keep = (series_last_update.isna() | (series_last_update > watermark)).to_numpy()
+        logging.info(f'- {int((~keep).sum())} records with LastUpdate at or below the watermark {watermark:%Y-%m-%d} are skipped.')
+        df_source = df_source[keep]
+    return df_source
+
+def get_last_update_max(df_fit_schema):
+    """Get the latest LastUpdate of the records ready to be loaded, rejected records are not counted.
+
+    Args:
+        df_fit_schema (dataframe): The pandas dataframe fit MySQL schema.
+
+    Returns:
+        (timestamp): The latest LastUpdate, NaT if there is none.
+    """
+    return pd.to_datetime(df_fit_schema["last_update"]).max()
+
+def update_watermark(state_store, source, last_update_max):
+    """Move the watermark of the source forward after a successful load.
+
+    Args:
+        state_store (StateStore): The state store keeping the watermarks.
+        source (str): Name of the source.
+        last_update_max (timestamp): The latest valid LastUpdate of the loaded records, NaT if there is none.
+    """
+    watermark = state_store.get_watermark(source)
+    if pd.notna(last_update_max) and (watermark is None or last_update_max > watermark):
+        state_store.put_watermark(source, last_update_max)
+        logging.info(f'- Watermark of source "{source}" is moved to {last_update_max:%Y-%m-%d}.')
+
+def cleanse_data(df_original, engine=CLEANSE_ENGINE, dictionary_encoding=CLEANSE_DICTIONARY_ENCODING, threads=CLEANSE_THREADS, list_step_metric=None):
     """Cleanse data step by step.
 
+    Every step declares the columns it reads and writes in LIST_CLEANSE_STEP, a step waits only for the earlier steps it depends on,
+    so that independent steps can run concurrently in a thread pool. The result is the same as running the steps one by one.
+
     Args:
         df_original (dataframe): The pandas dataframe of original data.
+        engine (str): "apply" or "vectorized", both engines give the same result.
+        dictionary_encoding (bool): Process the low-cardinality columns on their unique values only.
+        threads (int): Number of threads running independent steps concurrently.
+        list_step_metric (list): If it is given, the metrics of each step (step, wall_seconds, cpu_seconds, rows_in, rows_out and reject_rows) are appended to it.
 
     Returns:
         df_processing (dataframe): The pandas dataframe of clean data.
     """
-    df_processing = df_original.copy(deep=True)
-    logging.info('- Process column entityName.')
-    df_processing = process_entityName(df_processing)
-    logging.info('- Process column entityType.')
-    df_processing = process_entityType(df_processing)
-    logging.info('- Process column registrationNumber.')
-    df_processing = process_registrationNumber(df_processing)
-    logging.info('- Process column IncorporationDate.')
-    df_processing = process_incorporationDate(df_processing)
-    logging.info('- Process column CountryCode.')
-    df_processing = process_countryCode(df_processing)
-    logging.info('- Process column StateCode.')
-    df_processing = process_stateCode(df_processing)
-    logging.info('- Process column Status.')
-    df_processing = process_status(df_processing)
-    logging.info('- Process column Industry.')
-    df_processing = process_industry(df_processing)
-    logging.info('- Process column ContactEmail.')
-    df_processing = process_contactEmail(df_processing)
-    logging.info('- Process column LastUpdate.')
-    df_processing = process_lastUpdate(df_processing)
-    df_processing["cleanse_reject"] = df_processing[[
-        "EntityName_reject",
-        "EntityType_reject",
-        "RegistrationNumber_reject",
-        "IncorporationDate_reject",
-        "CountryCode_reject",
-        "StateCode_reject",
-        "Status_reject",
-        "Industry_reject",
-        "ContactEmail_reject",
-        "LastUpdate_reject"
-        ]].any(axis=1)
+    df_processing = copy_dataframe(df_original)
+    list_dependency = build_cleanse_step_dependency(LIST_CLEANSE_STEP)
+    # Columns are ordered as if the steps ran one by one, whatever order they finish in
+    list_column_order = list(df_processing.columns)
+    for step in LIST_CLEANSE_STEP:
+        list_column_order += [x for x in step["write"] if x not in list_column_order]
+    list_seconds = [None] * len(LIST_CLEANSE_STEP)
+    with ThreadPoolExecutor(max_workers=max([1, threads])) as executor:
+        dict_running = {}
+        while None in list_seconds:
+            # Submit the steps whose dependencies are done, the input is taken before any later step writes to the dataframe
+            for i, step in enumerate(LIST_CLEANSE_STEP):
+                if list_seconds[i] is None and i not in dict_running.values() and all(list_seconds[x] is not None for x in list_dependency[i]):
+                    logging.info(f'- Process column {step["column"]}.')
+                    # The column selection is already a new dataframe, the shallow copy only lets the step add columns to it without copying any data
+                    df_step = df_processing[[x for x in step["read"] if x in df_processing.columns]].copy(deep=False)
+                    dict_running[executor.submit(run_cleanse_step, df_step, step, engine, dictionary_encoding)] = i
+            set_done, _ = wait(dict_running.keys(), return_when=FIRST_COMPLETED)
+            for future in set_done:
+                i = dict_running.pop(future)
+                df_step, list_seconds[i], cpu_seconds = future.result()
+                for column in LIST_CLEANSE_STEP[i]["write"]:
+                    df_processing[column] = df_step[column]
+                if list_step_metric is not None:
+                    list_step_metric.append({
+                        "step": LIST_CLEANSE_STEP[i]["name"],
+                        "wall_seconds": list_seconds[i],
+                        "cpu_seconds": cpu_seconds,
+                        "rows_in": len(df_step),
+                        "rows_out": len(df_step),
+                        "reject_rows": int(df_step[f'{LIST_CLEANSE_STEP[i]["column"]}_reject'].sum())
+                    })
+    df_processing = df_processing[[x for x in list_column_order if x in df_processing.columns]]
+    df_processing["cleanse_reject"] = df_processing[[f'{step["column"]}_reject' for step in LIST_CLEANSE_STEP]].any(axis=1)
+    log_cleanse_step_timing(summarize_critical_path(LIST_CLEANSE_STEP, list_dependency, list_seconds))
     return df_processing
 
-def process_entityName(df_processing):
-    """Process column EntityName.
+def build_cleanse_step_dependency(list_step):
+    """Find the earlier steps each step has to wait for, i.e. a step reads or writes a column written by an earlier step, or writes a column read by an earlier step.
+
+    Args:
+        list_step (list): The cleanse steps with keys read and write.
+
+    Returns:
+        list_dependency (list): For each step, the list of the positions of the earlier steps it depends on.
+    """
+    list_dependency = []
+    for i, step in enumerate(list_step):
+        set_read = set(step["read"])
+        set_write = set(step["write"])
+        list_dependency.append([j for j in range(i) if set(list_step[j]["write"]) & (set_read | set_write) or set(list_step[j]["read"]) & set_write])
+    return list_dependency
+
+def run_cleanse_step(df_step, step, engine, dictionary_encoding):
+    """Run one cleanse step on a dataframe holding the columns it reads.
+
+    Args:
+        df_step (dataframe): The pandas dataframe of the columns read by the step.
+        step (dict): The cleanse step from LIST_CLEANSE_STEP.
+        engine (str): "apply" or "vectorized".
+        dictionary_encoding (bool): Process the low-cardinality columns on their unique values only.
+
+    Returns:
+        df_step (dataframe): The pandas dataframe of the columns written by the step.
+        seconds (float): Time spent by the step.
+        cpu_seconds (float): CPU time spent by the thread of the step.
+    """
+    start = time.perf_counter()
+    start_cpu = time.thread_time()
+    categorical = any(isinstance(x, pd.CategoricalDtype) for x in df_step.dtypes)
+    if categorical and step["dictionary_encoding"] and len(df_step) > 0:
+        df_step = process_categorical_values(df_step, step, engine)
+    elif dictionary_encoding and step["dictionary_encoding"] and len(df_step) > 0:
+        df_step = process_unique_values(df_step, step, engine)
+    else:
+        df_step = step[engine](materialize_categorical(df_step) if categorical else df_step)
+    return df_step[step["write"]], time.perf_counter() - start, time.thread_time() - start_cpu
+
+def summarize_critical_path(list_step, list_dependency, list_seconds):
+    """Find the critical path of the cleanse steps, i.e. the chain of dependent steps which takes the longest time.
+
+    Args:
+        list_step (list): The cleanse steps.
+        list_dependency (list): From build_cleanse_step_dependency.
+        list_seconds (list): Time spent by each step.
+
+    Returns:
+        list_timing (list): For each step, a dictionary with keys column, seconds, finish (the earliest finish time if every step started as soon as its dependencies were done) and critical.
+    """
+    list_finish = []
+    list_previous = []
+    for i in range(len(list_step)):
+        previous = max(list_dependency[i], key=lambda x: list_finish[x], default=None)
+        list_previous.append(previous)
+        list_finish.append(list_seconds[i] + (list_finish[previous] if previous is not None else 0))
+    set_critical = set()
+    i = max(range(len(list_step)), key=lambda x: list_finish[x], default=None)
+    while i is not None:
+        set_critical.add(i)
+        i = list_previous[i]
+    return [{
+        "column": step["column"],
+        "seconds": list_seconds[i],
+        "finish": list_finish[i],
+        "critical": i in set_critical
+    } for i, step in enumerate(list_step)]
+
+def log_cleanse_step_timing(list_timing):
+    """Log the time of each cleanse step and the critical path.
+
+    Args:
+        list_timing (list): From summarize_critical_path.
+    """
+    logging.info(f'- Cleanse step timing, critical path {max([0] + [x["finish"] for x in list_timing]):.3f}s of {sum([x["seconds"] for x in list_timing]):.3f}s in total:')
+    for timing in list_timing:
+        logging.info(f'-- {timing["column"]:<20} {timing["seconds"]:>8.3f}s finish {timing["finish"]:>8.3f}s{" (critical)" if timing["critical"] else ""}')
+
+def create_cleanse_executor(workers):
+    """Create the process pool for parallel cleansing, or a null context if only one worker is needed.
+
+    Workers are spawned rather than forked, so every worker imports this module once and builds its own reference indexes and connections, once per worker rather than once per shard.
+
+    Args:
+        workers (int): Number of worker processes.
+
+    Returns:
+        (context manager): The process pool executor, or a null context giving None.
+    """
+    if workers <= 1:
+        return contextlib.nullcontext()
+    logging.info(f'- Start {workers} worker processes for cleansing.')
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"), initializer=initialize_cleanse_worker)
+
+def initialize_cleanse_worker():
+    """Initialize a worker process for cleansing.
+    """
+    logging.info(f'-- Worker process {os.getpid()} is ready with {len(COUNTRY_RESOLVER.dict_alpha_2)} countries and {len(SUBDIVISION_INDEX.dict_code)} subdivisions indexed.')
+
+def cleanse_shard(df_shard, engine, dictionary_encoding, threads):
+    """Cleanse a shard in a worker process.
+
+    Args:
+        df_shard (dataframe): The pandas dataframe of original data in the shard.
+        engine (str): "apply" or "vectorized".
+        dictionary_encoding (bool): Process the low-cardinality columns on their unique values only.
+        threads (int): Number of threads running independent steps concurrently.
+
+    Returns:
+        df_processing (dataframe): The pandas dataframe of clean data of the shard.
+        list_step_metric (list): The metrics of each cleanse step of the shard.
+    """
+    list_step_metric = []
+    df_processing = cleanse_data(df_shard, engine, dictionary_encoding, threads, list_step_metric)
+    return df_processing, list_step_metric
+
+def cleanse_data_parallel(df_original, executor=None, shard_rows=CLEANSE_SHARD_ROWS, engine=CLEANSE_ENGINE, dictionary_encoding=CLEANSE_DICTIONARY_ENCODING, threads=CLEANSE_THREADS, list_step_metric=None):
+    """Cleanse data in row shards by worker processes, the result is the same as cleanse_data.
+
+    Args:
+        df_original (dataframe): The pandas dataframe of original data.
+        executor (executor): The process pool executor from create_cleanse_executor, cleanse_data is called directly if it is None.
+        shard_rows (int): Number of records per shard.
+        engine (str): "apply" or "vectorized", both engines give the same result.
+        dictionary_encoding (bool): Process the low-cardinality columns on their unique values only.
+        threads (int): Number of threads running independent steps concurrently in each shard.
+        list_step_metric (list): If it is given, the metrics of each step of each shard are appended to it.
+
+    Returns:
+        df_processing (dataframe): The pandas dataframe of clean data, in the original order.
+    """
+    if executor is None or len(df_original) <= shard_rows:
+        return cleanse_data(df_original, engine, dictionary_encoding, threads, list_step_metric)
+    list_df_shard = [df_original.iloc[i:i + shard_rows] for i in range(0, len(df_original), shard_rows)]
+    logging.info(f'- Cleanse {len(df_original)} records in {len(list_df_shard)} shards.')
+    # map returns the results in the order of the shards
+    list_result = list(executor.map(functools.partial(cleanse_shard, engine=engine, dictionary_encoding=dictionary_encoding, threads=threads), list_df_shard))
+    if list_step_metric is not None:
+        list_step_metric.extend([x for _, list_shard_metric in list_result for x in list_shard_metric])
+    return concat_categorical([x for x, _ in list_result])
+
+def process_unique_values(df_processing, step, engine):
+    """Process a column on the unique values (or unique value tuples if several columns are read) only, then map the result back to every record.
+
+    Every column processor works record by record without looking at other records, thus the result is the same as processing every record.
 
     Args:
         df_processing (dataframe): The pandas dataframe of processing data.
+        step (dict): The cleanse step from LIST_CLEANSE_STEP.
+        engine (str): "apply" or "vectorized".
 
     Returns:
         df_processing (dataframe): The pandas dataframe of processing data.
     """
-    if "EntityName" not in df_processing.columns:
-        logging.error('-- Column "EntityName" is missed in CSV data.')
-        raise Exception("CSV data has missed some columns")
-    # Remove whitespace
-    df_processing["EntityName"] = df_processing["EntityName"].apply(lambda x: x.strip() if x is not pd.NA else x).astype("string")
-    # Validate EntityName contains value or not, reject when it is fail
-    df_processing["EntityName_reject"] = df_processing["EntityName"].apply(lambda x: True if x is pd.NA or x == "" else False)
+    list_column_read = [x for x in step["read"] if x in df_processing.columns]
+    codes = df_processing.groupby(list_column_read, dropna=False, sort=False).ngroup().to_numpy()
+    _, first_position = np.unique(codes, return_index=True)
+    df_unique = df_processing.iloc[first_position][list_column_read].reset_index(drop=True)
+    logging.info(f'-- {len(df_unique)} unique values out of {len(df_processing)} records.')
+    df_unique = step[engine](df_unique)
+    for column in step["write"]:
+        df_processing[column] = df_unique[column].iloc[codes].set_axis(df_processing.index)
     return df_processing
 
-def process_entityType(df_processing):
-    """Process column EntityType.
+def process_categorical_values(df_processing, step, engine):
+    """Process categorical columns on the categories (or category tuples if several columns are read) present in the data only, then map the result back to every record.
+
+    Distinct values are found on the integer codes of the categoricals, without hashing the strings. The columns written as strings are categoricals as well.
 
     Args:
         df_processing (dataframe): The pandas dataframe of processing data.
+        step (dict): The cleanse step from LIST_CLEANSE_STEP.
+        engine (str): "apply" or "vectorized".
 
     Returns:
         df_processing (dataframe): The pandas dataframe of processing data.
     """
-    if "EntityType" not in df_processing.columns:
-        logging.error('-- Column "EntityType" is missed in CSV data.')
-        raise Exception("CSV data has missed some columns")
-    # Remove whitespace
-    df_processing["EntityType"] = df_processing["EntityType"].apply(lambda x: x.strip() if x is not pd.NA else x).astype("string")
-    # Uppercase the first letter and lowercase the remaining letters
-    df_processing["EntityType"] = df_processing["EntityType"].apply(lambda x: x[0].upper() + x[1:].lower() if x is not pd.NA else x).astype("string")
-    # Validate EntityType as expected value or not, reject when it is fail
-    df_processing["EntityType_reject"] = df_processing["EntityType"].apply(lambda x: True if x is pd.NA or x not in LIST_ENTITY_TYPE else False)
+    list_column_read = [x for x in step["read"] if x in df_processing.columns]
+    codes = np.zeros(len(df_processing), dtype="int64")
+    for column in list_column_read:
+        if isinstance(df_processing[column].dtype, pd.CategoricalDtype):
+            column_codes, column_cardinality = df_processing[column].cat.codes.to_numpy(), len(df_processing[column].cat.categories)
+        else:
+            column_codes, column_uniques = pd.factorize(df_processing[column])
+            column_cardinality = len(column_uniques)
+        # Codes stay below the number of records after each factorize, so that the combined code never overflows
+        codes, _ = pd.factorize(codes * (column_cardinality + 1) + column_codes + 1)
+    _, first_position = np.unique(codes, return_index=True)
+    df_unique = materialize_categorical(df_processing.iloc[first_position][list_column_read].reset_index(drop=True))
+    logging.info(f'-- {len(df_unique)} unique values out of {len(df_processing)} records.')
+    df_unique = step[engine](df_unique)
+    for column in step["write"]:
+        if isinstance(df_unique[column].dtype, pd.StringDtype):
+            unique_codes, categories = pd.factorize(df_unique[column], sort=True)
+            df_processing[column] = pd.Categorical.from_codes(unique_codes[codes], dtype=pd.CategoricalDtype(categories))
+        else:
+            df_processing[column] = df_unique[column].iloc[codes].set_axis(df_processing.index)
     return df_processing
 
-def process_registrationNumber(df_processing):
-    """Process column RegistrationNumber.
+def capitalize_words_column(series):
+    """Uppercase the first letter and lowercase the remaining letters of each word separated by space, one column per word position.
+
+    Args:
+        series (series): The pandas series of strings.
+
+    Returns:
+        series (series): The pandas series of capitalized strings, in the same dtype.
+    """
+    df_word = series.str.split(" ", expand=True)
+    output = None
+    for position in df_word.columns:
+        word = df_word[position].str.slice(0, 1).str.upper() + df_word[position].str.slice(1).str.lower()
+        output = word if output is None else output.mask(word.notna(), output + " " + word)
+    return series if output is None else output.astype(series.dtype)
+
+# Case normalizations of the column rules, as a function of one value for the "apply" engine and a function of a series for the "vectorized" engine
+DICT_CASE_NORMALIZATION = {
+    "upper": (
+        lambda x: x.upper(),
+        lambda x: x.str.upper()
+    ),
+    "capitalize": (
+        lambda x: x[:1].upper() + x[1:].lower(),
+        lambda x: x.str.slice(0, 1).str.upper() + x.str.slice(1).str.lower()
+    ),
+    "capitalize_words": (
+        lambda x: " ".join([y[:1].upper() + y[1:].lower() for y in x.split(" ")]),
+        capitalize_words_column
+    )
+}
+
+def compile_column_rule(column, dict_rule):
+    """Compile the cleanse rule of a column from DICT_COLUMN_RULE once, so that the patterns and the sets of values are not built again for every record.
+
+    The "apply" engine runs only the operations the rule uses, chained in a function of one value,
+    the "vectorized" engine runs the same operations with the compiled patterns on the whole column.
+
+    Args:
+        column (str): The column.
+        dict_rule (dict): The rule with keys trim, mapping, case, standardize, format, allowed and required, all of them are optional.
+
+    Returns:
+        rule (dict): The compiled rule, with the regex patterns compiled, the allowed values as a frozenset, None as pd.NA in the mapping,
+            revise (the function trimming, mapping, normalizing the case and standardizing a value) and check_reject (the function telling whether a revised value is rejected).
+    """
+    set_unknown_key = set(dict_rule.keys()) - {"trim", "mapping", "case", "standardize", "format", "allowed", "required"}
+    if set_unknown_key or dict_rule.get("case") not in [None] + list(DICT_CASE_NORMALIZATION.keys()):
+        logging.error(f'- Cleanse rule of column "{column}" is invalid: {dict_rule}')
+        raise Exception("Cleanse rule is invalid")
+    mapping = {key: pd.NA if value is None else value for key, value in dict_rule.get("mapping", {}).items()}
+    case = DICT_CASE_NORMALIZATION[dict_rule["case"]] if "case" in dict_rule else None
+    regex_standardize = re.compile("(" + "|".join([re.escape(x) for x in dict_rule["standardize"]]) + ").*") if "standardize" in dict_rule else None
+    regex_format = re.compile(dict_rule["format"]) if "format" in dict_rule else None
+    set_allowed = frozenset(dict_rule["allowed"]) if "allowed" in dict_rule else None
+    required = dict_rule.get("required", False)
+    list_revision = []
+    if dict_rule.get("trim", False):
+        list_revision.append(str.strip)
+    if mapping:
+        list_revision.append(lambda x: mapping.get(x, x))
+    if case is not None:
+        list_revision.append(case[0])
+    if regex_standardize is not None:
+        list_revision.append(lambda x: match.group(1) if (match := regex_standardize.fullmatch(x)) is not None else x)
+    list_check = []
+    # An empty value is already rejected by the allowed values unless it is one of them
+    if required and (set_allowed is None or "" in set_allowed):
+        list_check.append(lambda x: x == "")
+    if regex_format is not None:
+        list_check.append(lambda x: regex_format.fullmatch(x) is None)
+    if set_allowed is not None:
+        list_check.append(lambda x: x not in set_allowed)
+
+    def revise(value):
+        for function in list_revision:
+            # A value can be mapped to missing
+            if value is pd.NA:
+                return value
+            value = function(value)
+        return value
+
+    def check_reject(value):
+        if value is pd.NA:
+            return required
+        for function in list_check:
+            if function(value):
+                return True
+        return False
+
+    return {
+        "column": column,
+        "trim": dict_rule.get("trim", False),
+        "mapping": mapping,
+        "case": case,
+        "regex_standardize": regex_standardize,
+        "regex_format": regex_format,
+        "set_allowed": set_allowed,
+        "required": required,
+        "revise": revise,
+        "check_reject": check_reject
+    }
+
+def process_column_rule(df_processing, rule):
+    """Process a column by its compiled rule record by record.
 
     Args:
         df_processing (dataframe): The pandas dataframe of processing data.
+        rule (dict): The compiled rule from compile_column_rule.
 
     Returns:
+        df_processing (dataframe): The pandas dataframe of processing data, with the revised column and the reject column.
+    """
+    column = rule["column"]
+    if column not in df_processing.columns:
+        logging.error(f'-- Column "{column}" is missed in CSV data.')
+        raise Exception("CSV data has missed some columns")
+    df_processing[column] = df_processing[column].apply(rule["revise"]).astype("string")
+    df_processing[f"{column}_reject"] = df_processing[column].apply(rule["check_reject"]).astype("bool")
+    return df_processing
+
+def process_column_rule_vectorized(df_processing, rule):
+    """Process a column by its compiled rule with pandas string methods, same result as process_column_rule.
+
+    Args:
         df_processing (dataframe): The pandas dataframe of processing data.
+        rule (dict): The compiled rule from compile_column_rule.
+
+    Returns:
+        df_processing (dataframe): The pandas dataframe of processing data, with the revised column and the reject column.
     """
-    if "RegistrationNumber" not in df_processing.columns:
-        logging.error('-- Column "RegistrationNumber" is missed in CSV data.')
+    column = rule["column"]
+    if column not in df_processing.columns:
+        logging.error(f'-- Column "{column}" is missed in CSV data.')
         raise Exception("CSV data has missed some columns")
-    # Remove whitespace
-    df_processing["RegistrationNumber"] = df_processing["RegistrationNumber"].apply(lambda x: x.strip() if x is not pd.NA else x).astype("string")
-    # Uppercase all letters
-    df_processing["RegistrationNumber"] = df_processing["RegistrationNumber"].apply(lambda x: x.upper() if x is not pd.NA else x).astype("string")
-    # Validate RegistrationNumber as expected format or not, reject when it is fail
-    df_processing["RegistrationNumber_reject"] = df_processing["RegistrationNumber"].apply(lambda x: True if x is not pd.NA and re.fullmatch(REGEX_PATTERN_REGISTRATION_NUMBER, x) is None else False)
+    series = df_processing[column]
+    if rule["trim"]:
+        series = series.str.strip()
+    if rule["mapping"]:
+        series = series.replace(rule["mapping"])
+    if rule["case"] is not None:
+        series = rule["case"][1](series)
+    if rule["regex_standardize"] is not None:
+        mask = series.str.fullmatch(rule["regex_standardize"]).fillna(False).astype("bool")
+        series = series.mask(mask, series.str.extract(rule["regex_standardize"], expand=False))
+    df_processing[column] = series
+    # Missing values pass the format and the allowed values, they are only rejected when the value is required
+    present = series.notna().to_numpy(dtype=bool)
+    reject = ~present if rule["required"] else np.zeros(len(series), dtype=bool)
+    if rule["required"]:
+        reject |= (series == "").fillna(False).to_numpy(dtype=bool)
+    if rule["regex_format"] is not None:
+        reject |= present & ~series.str.fullmatch(rule["regex_format"]).fillna(True).to_numpy(dtype=bool)
+    if rule["set_allowed"] is not None:
+        reject |= present & ~series.isin(rule["set_allowed"]).to_numpy(dtype=bool)
+    df_processing[f"{column}_reject"] = pd.Series(reject, index=df_processing.index)
     return df_processing
 
 def process_incorporationDate(df_processing):
@@ -181,6 +885,27 @@ def process_incorporationDate(df_processing):
     df_processing["IncorporationDate_reject"] = df_processing["IncorporationDate"].apply(lambda x: True if x is not pd.NA and re.fullmatch(REGEX_PATTERN_DATE_FORMAT, x) is None else False)
     return df_processing
 
+def process_incorporationDate_vectorized(df_processing):
+    """Process column IncorporationDate with pandas string methods, same result as process_incorporationDate.
+
+    Args:
+        df_processing (dataframe): The pandas dataframe of processing data.
+
+    Returns:
+        df_processing (dataframe): The pandas dataframe of processing data.
+    """
+    if "IncorporationDate" not in df_processing.columns:
+        logging.error('-- Column "IncorporationDate" is missed in CSV data.')
+        raise Exception("CSV data has missed some columns")
+    # Remove whitespace
+    df_processing["IncorporationDate"] = df_processing["IncorporationDate"].str.strip()
+    # Revise date format if necessary
+    df_processing["IncorporationDate"], dict_format_hit = revise_date_format_column(df_processing["IncorporationDate"])
+    logging.info(f'-- Date formats found in IncorporationDate: {dict_format_hit}')
+    # Validate IncorporationDate as expected format or not, reject when it is fail
+    df_processing["IncorporationDate_reject"] = ~df_processing["IncorporationDate"].str.fullmatch(REGEX_PATTERN_DATE_FORMAT).fillna(True).astype("bool")
+    return df_processing
+
 def revise_date_format(input_str):
     """Revise the date format of the input string. Put MM/DD/YY as the highest priority due to largest usage in sample data.
 
@@ -190,41 +915,7 @@ def revise_date_format(input_str):
     Returns:
         (string): Output string with align date format
     """
-    list_date_format = [
-        {
-            "code": "%m/%d/%y",
-            "debug_message": "MM/DD/YY"
-        },
-        {
-            "code": "%m/%d/%Y",
-            "debug_message": "MM/DD/YYYY"
-        },
-        {
-            "code": "%d/%m/%y",
-            "debug_message": "DD/MM/YY"
-        },
-        {
-            "code": "%d/%m/%Y",
-            "debug_message": "DD/MM/YYYY"
-        },
-        {
-            "code": "%m-%d-%y",
-            "debug_message": "MM-DD-YY"
-        },
-        {
-            "code": "%m-%d-%Y",
-            "debug_message": "MM-DD-YYYY"
-        },
-        {
-            "code": "%Y-%m-%d",
-            "debug_message": "YYYY-MM-DD"
-        },
-        {
-            "code": "%d-%b-%y",
-            "debug_message": "DD-MMM-YY"
-        },
-    ]
-    for item in list_date_format:
+    for item in LIST_DATE_FORMAT:
         try:
             temp = date.strptime(input_str, item["code"])
             return temp.strftime(DATE_FORMAT_CODE_OUTPUT)
@@ -232,6 +923,57 @@ def revise_date_format(input_str):
             logging.debug(f'-- string {input_str} is not in the date format {item["debug_message"]}.')
     return input_str
 
+def revise_date_format_column(series_input, sample_size=DATE_FORMAT_SAMPLE_SIZE):
+    """Revise the date format of a whole column, same result as revise_date_format on every value.
+
+    1. Infer the dominant formats by parsing a sample of values with every format.
+    2. Parse the whole column with pd.to_datetime one format at a time, only the values left unparsed go to the next format.
+       Formats are tried by their hits in the sample, but formats of the same shape (e.g. MM/DD/YY and DD/MM/YY) keep their priority order in LIST_DATE_FORMAT,
+       so an ambiguous value like 3/10/15 is still read as MM/DD/YY. Formats of different shapes can never match the same value.
+    3. The values left unparsed by pd.to_datetime (e.g. years out of the pd.Timestamp range) are revised by revise_date_format.
+
+    Args:
+        series_input (series): The pandas series of date strings, already stripped.
+        sample_size (int): The number of values sampled to infer the dominant formats.
+
+    Returns:
+        series_output (series): The pandas series of revised date strings.
+        dict_format_hit (dict): Number of records parsed by each format, and the number of records left unchanged under "unparsed".
+    """
+    series_output = series_input.copy(deep=True)
+    series_sample = series_input.dropna()
+    series_sample = series_sample.sample(n=min(sample_size, len(series_sample)), random_state=0)
+    dict_sample_hit = {item["code"]: int(pd.to_datetime(series_sample, format=item["code"], errors="coerce").notna().sum()) for item in LIST_DATE_FORMAT}
+    logging.debug(f'-- Date format hits in sample: {dict_sample_hit}')
+
+    # Group formats by shape, order groups by sample hits while keeping the priority order within each group
+    dict_format_group = {}
+    for item in LIST_DATE_FORMAT:
+        dict_format_group.setdefault(re.sub(r"%[dmyY]", "%n", item["code"]), []).append(item)
+    list_format_group = sorted(dict_format_group.values(), key=lambda x: -sum(dict_sample_hit[item["code"]] for item in x))
+
+    dict_format_hit = {item["debug_message"]: 0 for item in LIST_DATE_FORMAT}
+    position_remaining = np.flatnonzero(series_input.notna().to_numpy())
+    for item in [item for group in list_format_group for item in group]:
+        parsed = pd.to_datetime(series_input.iloc[position_remaining], format=item["code"], errors="coerce")
+        # Years at the edge of the pd.Timestamp range are left to the fallback, as the same value may be out of range in a format of higher priority
+        mask_hit = parsed.dt.year.between(1678, 2261).fillna(False).to_numpy(dtype=bool)
+        if DATE_FORMAT_CODE_OUTPUT == "%Y-%m-%d":
+            # Same as strftime within the year range above, but without formatting value by value
+            series_output.iloc[position_remaining[mask_hit]] = np.datetime_as_string(parsed[mask_hit].to_numpy(), unit="D")
+        else:
+            series_output.iloc[position_remaining[mask_hit]] = parsed[mask_hit].dt.strftime(DATE_FORMAT_CODE_OUTPUT).to_numpy()
+        position_remaining = position_remaining[~mask_hit]
+        dict_format_hit[item["debug_message"]] = int(mask_hit.sum())
+
+    # Fall back to strptime for the leftovers, each distinct value once
+    series_leftover = series_input.iloc[position_remaining]
+    dict_fallback = {x: revise_date_format(x) for x in series_leftover.unique()}
+    series_output.iloc[position_remaining] = series_leftover.map(dict_fallback).to_numpy()
+    dict_format_hit["fallback"] = int((series_output.iloc[position_remaining] != series_leftover).sum())
+    dict_format_hit["unparsed"] = len(position_remaining) - dict_format_hit["fallback"]
+    return series_output, dict_format_hit
+
 def process_countryCode(df_processing):
     """Process column CountryCode.
 
@@ -251,11 +993,43 @@ def process_countryCode(df_processing):
     # Extract the first two letters if correct format is found
     df_processing["CountryCode_revised"] = df_processing["CountryCode_revised"].apply(lambda x: x[0:1] if x is not pd.NA and re.fullmatch(REGEX_PATTERN_COUNTRY_CODE_OUTPUT + r"(?:-.+)?", x) is not None else x).astype("string")
     # Check the CountryCode is valid or not, remove if it not valid
-    df_processing["CountryCode_revised"] = df_processing["CountryCode_revised"].apply(lambda x: pycountry.countries.get(alpha_2=x).alpha_2 if x is not pd.NA and pycountry.countries.get(alpha_2=x) is not None else pd.NA).astype("string")
+    df_processing["CountryCode_revised"] = df_processing["CountryCode_revised"].apply(lambda x: COUNTRY_RESOLVER.get_alpha_2(x, pd.NA) if x is not pd.NA else pd.NA).astype("string")
     # Use Country to provide CountryCode if CountryCode is missing
     df_processing["CountryCode_revised"] = df_processing.apply(lambda x: convert_country_name_to_country_code(x["Country"]) if x["CountryCode_revised"] is pd.NA and "Country" in x.keys() and x["Country"] is not pd.NA else x["CountryCode_revised"], axis=1).astype("string")
     # Validate CountryCode as expected format or not, reject when it is fail
     df_processing["CountryCode_reject"] = df_processing["CountryCode_revised"].apply(lambda x: True if x is pd.NA or (x is not pd.NA and re.fullmatch(REGEX_PATTERN_COUNTRY_CODE_OUTPUT, x) is None) else False)
+    logging.info(f'-- Country resolver counters: {COUNTRY_RESOLVER.counter}')
+    return df_processing
+
+def process_countryCode_vectorized(df_processing):
+    """Process column CountryCode with pandas string methods, same result as process_countryCode.
+
+    Args:
+        df_processing (dataframe): The pandas dataframe of processing data.
+
+    Returns:
+        df_processing (dataframe): The pandas dataframe of processing data.
+    """
+    if "Country" not in df_processing.columns:
+        logging.error('-- Column "Country" is missed in CSV data.')
+    if "CountryCode" not in df_processing.columns:
+        logging.error('-- Column "CountryCode" is missed in CSV data.')
+        raise Exception("CSV data has missed some columns")
+    # Remove whitespace and uppercase the whole string
+    country_code = df_processing["CountryCode"].str.strip().str.upper()
+    # Extract the first two letters if correct format is found
+    mask = country_code.str.fullmatch(REGEX_PATTERN_COUNTRY_CODE_OUTPUT + r"(?:-.+)?").fillna(False).astype("bool")
+    country_code = country_code.mask(mask, country_code.str.slice(0, 1))
+    # Check the CountryCode is valid or not, remove if it not valid
+    country_code = COUNTRY_RESOLVER.map_alpha_2(country_code)
+    # Use Country to provide CountryCode if CountryCode is missing
+    if "Country" in df_processing.columns:
+        mask = (country_code.isna() & df_processing["Country"].notna()).to_numpy()
+        country_code[mask] = df_processing.loc[mask, "Country"].map(convert_country_name_to_country_code).to_numpy()
+    df_processing["CountryCode_revised"] = country_code
+    # Validate CountryCode as expected format or not, reject when it is fail
+    df_processing["CountryCode_reject"] = ~df_processing["CountryCode_revised"].str.fullmatch(REGEX_PATTERN_COUNTRY_CODE_OUTPUT).fillna(False).astype("bool")
+    logging.info(f'-- Country resolver counters: {COUNTRY_RESOLVER.counter}')
     return df_processing
 
 def convert_country_name_to_country_code(input_str):
@@ -267,12 +1041,11 @@ def convert_country_name_to_country_code(input_str):
     Returns:
         (string): Output string as country code
     """
-    try:
-        results = pycountry.countries.search_fuzzy(input_str)
-        return results[0].alpha_2
-    except LookupError:
+    country_code = COUNTRY_RESOLVER.search_fuzzy_alpha_2(input_str)
+    if country_code is None:
         logging.debug(f'-- string {input_str} is not a valid country name.')
         return input_str
+    return country_code
 
 def process_stateCode(df_processing):
     """Process column StateCode.
@@ -297,13 +1070,78 @@ def process_stateCode(df_processing):
     # Extract the subdivison code from CountryCode if CountryCode is in specific format
     df_processing["StateCode_revised"] = df_processing.apply(lambda x: re.fullmatch(REGEX_PATTERN_COUNTRY_CODE_OUTPUT + r"-(.+)", x["CountryCode"]).group(0) if x["StateCode_revised"] is pd.NA and "CountryCode" in x.keys() and x["CountryCode"] is not pd.NA and re.fullmatch(REGEX_PATTERN_COUNTRY_CODE_OUTPUT + r"-(.+)", x["CountryCode"]) is not None else x["StateCode_revised"], axis=1).astype("string")
     # Check the StateCode is valid or not, remove if it not valid
-    df_processing["StateCode_revised"] = df_processing.apply(lambda x: pycountry.subdivisions.get(code=x["CountryCode_revised"] + "-" + x["StateCode_revised"]).code.split("-")[1] if x["StateCode_revised"] is not pd.NA and "CountryCode_revised" in x.keys() and x["CountryCode_revised"] is not pd.NA and x["StateCode_revised"] != x["CountryCode_revised"] and pycountry.subdivisions.get(code=x["CountryCode_revised"] + "-" + x["StateCode_revised"]) is not None else pd.NA, axis=1).astype("string")
+    df_processing["StateCode_revised"] = df_processing.apply(lambda x: SUBDIVISION_INDEX.get_code(x["CountryCode_revised"], x["StateCode_revised"], pd.NA) if x["StateCode_revised"] is not pd.NA and "CountryCode_revised" in x.keys() and x["CountryCode_revised"] is not pd.NA and x["StateCode_revised"] != x["CountryCode_revised"] else pd.NA, axis=1).astype("string")
     # Use State to provide StateCode if StateCode is missing
+    if "State" in df_processing.columns:
+        mask = df_processing["StateCode_revised"].isna() & df_processing["State"].notna()
+        translate_state_names(df_processing.loc[mask, "State"], df_processing.loc[mask, "CountryCode_revised"] if "CountryCode_revised" in df_processing.columns else pd.Series(pd.NA, index=df_processing.index[mask], dtype="string"))
     df_processing["StateCode_revised"] = df_processing.apply(lambda x: convert_state_name_to_state_code(x["State"], x["CountryCode_revised"] if "CountryCode_revised" in x.keys() else pd.NA) if x["StateCode_revised"] is pd.NA and "State" in x.keys() and x["State"] is not pd.NA else x["StateCode_revised"], axis=1).astype("string")
+    logging.info(f'-- Subdivision index counters: {SUBDIVISION_INDEX.counter}')
     # Invalid value is removed and missing value is allowed, thus none of the records will be rejected due to StateCode
     df_processing["StateCode_reject"] = False
     return df_processing
 
+def process_stateCode_vectorized(df_processing):
+    """Process column StateCode with pandas string methods, same result as process_stateCode.
+
+    Args:
+        df_processing (dataframe): The pandas dataframe of processing data.
+
+    Returns:
+        df_processing (dataframe): The pandas dataframe of processing data.
+    """
+    if "CountryCode" not in df_processing.columns:
+        logging.error('-- Column "CountryCode" is missed in CSV data.')
+    if "State" not in df_processing.columns:
+        logging.error('-- Column "State" is missed in CSV data.')
+    if "StateCode" not in df_processing.columns:
+        logging.error('-- Column "StateCode" is missed in CSV data.')
+        raise Exception("CSV data has missed some columns")
+    if "CountryCode_revised" in df_processing.columns:
+        country_code = df_processing["CountryCode_revised"]
+    else:
+        country_code = pd.Series(pd.NA, index=df_processing.index, dtype=df_processing["StateCode"].dtype)
+    # Remove whitespace and uppercase the whole string
+    state_code = df_processing["StateCode"].str.strip().str.upper()
+    # Remove if StateCode is same as CountryCode
+    state_code = state_code.mask((state_code == country_code).fillna(False).astype("bool"))
+    # Extract the subdivison code from CountryCode if CountryCode is in specific format
+    if "CountryCode" in df_processing.columns:
+        mask = state_code.isna() & df_processing["CountryCode"].str.fullmatch(REGEX_PATTERN_COUNTRY_CODE_OUTPUT + r"-(.+)").fillna(False).astype("bool")
+        state_code = state_code.mask(mask, df_processing["CountryCode"])
+    # Check the StateCode is valid or not, remove if it not valid
+    state_code = SUBDIVISION_INDEX.map_code(country_code, state_code).mask((state_code == country_code).fillna(False).astype("bool"))
+    # Use State to provide StateCode if StateCode is missing, by the subdivision index first and then by translation once per distinct State and CountryCode
+    if "State" in df_processing.columns:
+        mask = (state_code.isna() & df_processing["State"].notna()).to_numpy()
+        state_code[mask] = SUBDIVISION_INDEX.map_name(df_processing.loc[mask, "State"], country_code[mask])
+        mask = mask & state_code.isna().to_numpy()
+        df_pair = pd.DataFrame({"State": df_processing.loc[mask, "State"], "CountryCode": country_code[mask]})
+        df_unique = df_pair.drop_duplicates().copy()
+        translate_state_names(df_unique["State"], df_unique["CountryCode"])
+        df_unique["StateCode"] = [convert_state_name_to_state_code(x, y) for x, y in zip(df_unique["State"], df_unique["CountryCode"])]
+        state_code[mask] = df_pair.merge(df_unique, how="left", on=["State", "CountryCode"])["StateCode"].to_numpy()
+    logging.info(f'-- Subdivision index counters: {SUBDIVISION_INDEX.counter}')
+    df_processing["StateCode_revised"] = state_code
+    # Invalid value is removed and missing value is allowed, thus none of the records will be rejected due to StateCode
+    df_processing["StateCode_reject"] = False
+    return df_processing
+
+def translate_state_names(series_state, series_country_code):
+    """Translate the state names which are not found by the subdivision index, in one batch per language, so that convert_state_name_to_state_code finds the translations cached.
+
+    Args:
+        series_state (series): The pandas series of state names.
+        series_country_code (series): The pandas series of country codes to be used as the language codes for translation.
+    """
+    df_pair = pd.DataFrame({"State": series_state, "CountryCode": series_country_code}).dropna().drop_duplicates()
+    df_pair = df_pair[df_pair["CountryCode"].str.lower().isin(SET_LANGUAGE_ALPHA_2)]
+    df_pair = df_pair[np.array([SUBDIVISION_INDEX.resolve_name(x, y) is None for x, y in zip(df_pair["State"], df_pair["CountryCode"])], dtype="bool")]
+    for country_code, df_language in df_pair.groupby("CountryCode"):
+        STATE_NAME_TRANSLATOR.translate_batch(country_code, df_language["State"].tolist())
+    if len(df_pair) > 0:
+        logging.info(f'-- State name translation counters: {STATE_NAME_TRANSLATOR.counter}')
+
 def convert_state_name_to_state_code(input_str, country_code):
     """Convert the input_str, which is expected as state name, to state code.
 
@@ -314,28 +1152,27 @@ def convert_state_name_to_state_code(input_str, country_code):
     Returns:
         (string): Output string as state code
     """
-    try:
-        results = pycountry.subdivisions.search_fuzzy(input_str)
-        return results[0].code.split("-")[1]
-    except LookupError:
-        logging.debug(f'-- string {input_str} is not a valid state name.')
+    # Exact name within the country first, then the same first result as pycountry.subdivisions.search_fuzzy
+    state_code = SUBDIVISION_INDEX.resolve_name(input_str, country_code if country_code is not pd.NA else None)
+    if state_code is not None:
+        return state_code
+    logging.debug(f'-- string {input_str} is not a valid state name.')
 
     # try to search the state name in the language used by the country
-    try:
-        lang_list = list(pycountry.languages)
-        lang_list = [x.alpha_2 for x in lang_list if hasattr(x, "alpha_2")]
-        if country_code.lower() in lang_list:
-            translator = Translator(to_lang=country_code)
-            translation = translator.translate(input_str)
-            results = pycountry.subdivisions.search_fuzzy(translation)
-            return results[0].code.split("-")[1]
-    except LookupError:
-        logging.debug(f'-- string {translation} is not a valid state name.')
+    if country_code.lower() in SET_LANGUAGE_ALPHA_2:
+        translation = STATE_NAME_TRANSLATOR.translate(country_code, input_str)
+        if translation is None:
+            logging.debug(f'-- string {input_str} is not translated.')
+        else:
+            state_code = SUBDIVISION_INDEX.search_fuzzy_code(translation)
+            if state_code is not None:
+                return state_code
+            logging.debug(f'-- string {translation} is not a valid state name.')
 
     return input_str
 
-def process_status(df_processing):
-    """Process column Status.
+def process_lastUpdate(df_processing):
+    """Process column LastUpdate.
 
     Args:
         df_processing (dataframe): The pandas dataframe of processing data.
@@ -343,21 +1180,19 @@ def process_status(df_processing):
     Returns:
         df_processing (dataframe): The pandas dataframe of processing data.
     """
-    if "Status" not in df_processing.columns:
-        logging.error('-- Column "Status" is missed in CSV data.')
+    if "LastUpdate" not in df_processing.columns:
+        logging.error('-- Column "LastUpdate" is missed in CSV data.')
         raise Exception("CSV data has missed some columns")
     # Remove whitespace
-    df_processing["Status"] = df_processing["Status"].apply(lambda x: x.strip() if x is not pd.NA else x).astype("string")
-    # Convert "Y" to "Active", "N" to "Inactive"
-    df_processing["Status"] = df_processing["Status"].apply(lambda x: DICT_STATUS_MAPPING.get(x, x) if x is not pd.NA else x).astype("string")
-    # Standardize the wordings
-    df_processing["Status"] = df_processing["Status"].apply(lambda x: re.fullmatch(rf"({"|".join(LIST_STATUS)}).*", x).group(1) if x is not pd.NA and re.fullmatch(rf"({"|".join(LIST_STATUS)}).*", x) is not None else x).astype("string")
-    # Validate Status as expected value or not, reject when it is fail
-    df_processing["Status_reject"] = df_processing["Status"].apply(lambda x: True if x is pd.NA or (x is not pd.NA and x not in LIST_STATUS) else False)
+    df_processing["LastUpdate"] = df_processing["LastUpdate"].apply(lambda x: x.strip() if x is not pd.NA else x).astype("string")
+    # Revise date format if necessary
+    df_processing["LastUpdate"] = df_processing["LastUpdate"].apply(lambda x: revise_date_format(x) if x is not pd.NA else x).astype("string")
+    # Validate LastUpdate as expected format or not, reject when it is fail
+    df_processing["LastUpdate_reject"] = df_processing["LastUpdate"].apply(lambda x: True if x is not pd.NA and re.fullmatch(REGEX_PATTERN_DATE_FORMAT, x) is None else False)
     return df_processing
 
-def process_industry(df_processing):
-    """Process column Industry.
+def process_lastUpdate_vectorized(df_processing):
+    """Process column LastUpdate with pandas string methods, same result as process_lastUpdate.
 
     Args:
         df_processing (dataframe): The pandas dataframe of processing data.
@@ -365,81 +1200,209 @@ def process_industry(df_processing):
     Returns:
         df_processing (dataframe): The pandas dataframe of processing data.
     """
-    if "Industry" not in df_processing.columns:
-        logging.error('-- Column "Industry" is missed in CSV data.')
+    if "LastUpdate" not in df_processing.columns:
+        logging.error('-- Column "LastUpdate" is missed in CSV data.')
         raise Exception("CSV data has missed some columns")
     # Remove whitespace
-    df_processing["Industry"] = df_processing["Industry"].apply(lambda x: x.strip() if x is not pd.NA else x).astype("string")
-    # Remove "NULL"
-    df_processing["Industry"] = df_processing["Industry"].apply(lambda x: pd.NA if x is not pd.NA and x == "NULL" else x).astype("string")
-    # Standardize capitalization
-    df_processing["Industry"] = df_processing["Industry"].apply(lambda x: " ".join([y[0].upper() + y[1:].lower() for y in x.split(" ")]) if x is not pd.NA else x).astype("string")
-    # None of the records will be rejected due to Industry
-    df_processing["Industry_reject"] = False
+    df_processing["LastUpdate"] = df_processing["LastUpdate"].str.strip()
+    # Revise date format if necessary
+    df_processing["LastUpdate"], dict_format_hit = revise_date_format_column(df_processing["LastUpdate"])
+    logging.info(f'-- Date formats found in LastUpdate: {dict_format_hit}')
+    # Validate LastUpdate as expected format or not, reject when it is fail
+    df_processing["LastUpdate_reject"] = ~df_processing["LastUpdate"].str.fullmatch(REGEX_PATTERN_DATE_FORMAT).fillna(True).astype("bool")
     return df_processing
 
-def process_contactEmail(df_processing):
-    """Process column ContactEmail.
+def create_rule_cleanse_step(column, dictionary_encoding):
+    """Create the cleanse step of a column processed by its compiled rule, see DICT_COLUMN_RULE.
 
     Args:
-        df_processing (dataframe): The pandas dataframe of processing data.
+        column (str): The column, a key of DICT_COLUMN_RULE.
+        dictionary_encoding (bool): The column is low-cardinality, so that it can be processed on its unique values only.
 
     Returns:
-        df_processing (dataframe): The pandas dataframe of processing data.
+        step (dict): The cleanse step for LIST_CLEANSE_STEP.
     """
-    if "ContactEmail" not in df_processing.columns:
-        logging.error('-- Column "ContactEmail" is missed in CSV data.')
-        raise Exception("CSV data has missed some columns")
-    # Remove whitespace
-    df_processing["ContactEmail"] = df_processing["ContactEmail"].apply(lambda x: x.strip() if x is not pd.NA else x).astype("string")
-    # Validate ContactEmail as expected format or not, reject when it is fail
-    df_processing["ContactEmail_reject"] = df_processing["ContactEmail"].apply(lambda x: True if x is not pd.NA and re.fullmatch(r".+@.+", x) is None else False)
-    return df_processing
+    return {
+        "column": column,
+        "name": f"process_column_rule[{column}]",
+        "read": [column],
+        "write": [column, f"{column}_reject"],
+        "dictionary_encoding": dictionary_encoding,
+        "apply": functools.partial(process_column_rule, rule=DICT_COMPILED_COLUMN_RULE[column]),
+        "vectorized": functools.partial(process_column_rule_vectorized, rule=DICT_COMPILED_COLUMN_RULE[column])
+    }
+
+# Cleanse rules compiled once when the pipeline starts
+DICT_COMPILED_COLUMN_RULE = {column: compile_column_rule(column, dict_rule) for column, dict_rule in DICT_COLUMN_RULE.items()}
+
+# Cleanse steps in order, each column can be processed row by row ("apply") or vectorized ("vectorized").
+# "name" is reported in the step metrics, "read" and "write" are the columns used and produced by the step, "dictionary_encoding" marks the low-cardinality columns.
+# The columns in DICT_COLUMN_RULE need no process function of their own, their steps are created from the compiled rules.
+LIST_CLEANSE_STEP = [
+    create_rule_cleanse_step("EntityName", dictionary_encoding=False),
+    create_rule_cleanse_step("EntityType", dictionary_encoding=True),
+    create_rule_cleanse_step("RegistrationNumber", dictionary_encoding=False),
+    {
+        "column": "IncorporationDate",
+        "name": "process_incorporationDate",
+        "read": ["IncorporationDate"],
+        "write": ["IncorporationDate", "IncorporationDate_reject"],
+        "dictionary_encoding": False,
+        "apply": process_incorporationDate,
+        "vectorized": process_incorporationDate_vectorized
+    },
+    {
+        "column": "CountryCode",
+        "name": "process_countryCode",
+        "read": ["CountryCode", "Country"],
+        "write": ["CountryCode_revised", "CountryCode_reject"],
+        "dictionary_encoding": True,
+        "apply": process_countryCode,
+        "vectorized": process_countryCode_vectorized
+    },
+    {
+        "column": "StateCode",
+        "name": "process_stateCode",
+        "read": ["StateCode", "State", "CountryCode", "CountryCode_revised"],
+        "write": ["StateCode_revised", "StateCode_reject"],
+        "dictionary_encoding": True,
+        "apply": process_stateCode,
+        "vectorized": process_stateCode_vectorized
+    },
+    create_rule_cleanse_step("Status", dictionary_encoding=True),
+    create_rule_cleanse_step("Industry", dictionary_encoding=True),
+    create_rule_cleanse_step("ContactEmail", dictionary_encoding=False),
+    {
+        "column": "LastUpdate",
+        "name": "process_lastUpdate",
+        "read": ["LastUpdate"],
+        "write": ["LastUpdate", "LastUpdate_reject"],
+        "dictionary_encoding": False,
+        "apply": process_lastUpdate,
+        "vectorized": process_lastUpdate_vectorized
+    }
+]
 
+def deduplicate_records(df_in):
+    """Deduplicate records for the input dataframe. Output as two dataframes, deduplicated entities and rejected entities due to duplication with other different information
 
-def process_lastUpdate(df_processing):
-    """Process column LastUpdate.
+    The useful columns of the duplicate candidates are hashed once and each group of EntityName and EntityType is decided by the number of records of each distinct hash,
+    so the cost is O(n) for hashing and grouping plus O(c log c) for keeping the output in group order, where c is the number of duplicate candidates.
 
     Args:
-        df_processing (dataframe): The pandas dataframe of processing data.
+        df_in (dataframe): The pandas dataframe needed to be deduplicated.
 
     Returns:
-        df_processing (dataframe): The pandas dataframe of processing data.
+        df_deduplicate (dataframe): The pandas dataframe which is deduplicated.
+        df_duplicate_reject (dataframe): The pandas dataframe which is duplicate in EntityName and EntityType but other information is different.
     """
-    if "LastUpdate" not in df_processing.columns:
-        logging.error('-- Column "LastUpdate" is missed in CSV data.')
-        raise Exception("CSV data has missed some columns")
-    # Remove whitespace
-    df_processing["LastUpdate"] = df_processing["LastUpdate"].apply(lambda x: x.strip() if x is not pd.NA else x).astype("string")
-    # Revise date format if necessary
-    df_processing["LastUpdate"] = df_processing["LastUpdate"].apply(lambda x: revise_date_format(x) if x is not pd.NA else x).astype("string")
-    # Validate LastUpdate as expected format or not, reject when it is fail
-    df_processing["LastUpdate_reject"] = df_processing["LastUpdate"].apply(lambda x: True if x is not pd.NA and re.fullmatch(REGEX_PATTERN_DATE_FORMAT, x) is None else False)
-    return df_processing
+    df_processing = copy_dataframe(df_in.drop([x for x in df_in.columns if re.fullmatch(r".*(reject)$", x) is not None], axis=1))
+    df_processing["duplicate_candidate"] = df_processing[["EntityName", "EntityType"]].duplicated(keep=False)
+    logging.info('- Decouple unique records and duplicate candidates.')
+    candidate = df_processing["duplicate_candidate"].to_numpy(dtype=bool)
+    df_duplicate_candidate = df_processing[candidate]
+    logging.info('- Checking all useful columns to decide whether it is duplicate reject case or not for each duplicate candidate group.')
+    # Group number in the sorted order of EntityName and EntityType, -1 if the group key is missing
+    group = df_duplicate_candidate.groupby(["EntityName", "EntityType"], sort=True, observed=True).ngroup().to_numpy()
+    content_hash = fingerprint_duplicate_records(df_duplicate_candidate)["content_hash"].to_numpy()
+    df_group_content = pd.DataFrame({"key_hash": group, "content_hash": content_hash})
+    df_group_content["row_count"] = df_group_content.groupby(["key_hash", "content_hash"], sort=False)["content_hash"].transform("size")
+    conflict = decide_duplicate_conflict(df_group_content)
+    # The first record of each distinct content is kept
+    first = ~df_group_content[["key_hash", "content_hash"]].duplicated().to_numpy()
+    order = np.argsort(group, kind="stable")
+    keep = (group >= 0)[order]
+    df_deduplicate = pd.concat([df_processing[~candidate], df_duplicate_candidate.iloc[order[keep & ~conflict[order] & first[order]]]], ignore_index=True)
+    df_duplicate_reject = df_duplicate_candidate.iloc[order[keep & conflict[order]]].reset_index(drop=True)
+    df_deduplicate["duplicate_reject"] = False
+    df_duplicate_reject["duplicate_reject"] = True
+    return df_deduplicate, df_duplicate_reject
 
-def deduplicate_records(df_in):
-    """Deduplicate records for the input dataframe. Output as two dataframes, deduplicated entities and rejected entities due to duplication with other different information
+def decide_duplicate_conflict(df_group_content):
+    """Decide whether each duplicate group is rejected from the number of records of each distinct content in the group.
+
+    A group is kept if every distinct content appears in more than one record, then the first record of each distinct content is kept.
+    A group is rejected as a whole if any content appears in one record only. A group of one record is never rejected.
+
+    Args:
+        df_group_content (dataframe): The pandas dataframe with columns key_hash (the group), content_hash and row_count (the number of records of the content in the group),
+            with one row per record or one row per distinct content of each group.
+
+    Returns:
+        conflict (array): The numpy array of bool, True if the group of the row is rejected.
+    """
+    group_row_count = df_group_content.groupby("key_hash", sort=False)["row_count"]
+    return (group_row_count.transform("min").to_numpy() == 1) & (group_row_count.transform("sum").to_numpy() > 1)
+
+def fingerprint_duplicate_records(df_in):
+    """Hash the duplicate group key (EntityName and EntityType) and the useful columns of each record, so that duplicate groups can be tracked without keeping the records.
 
     Args:
         df_in (dataframe): The pandas dataframe needed to be deduplicated.
 
+    Returns:
+        df_fingerprint (dataframe): The pandas dataframe with columns key_hash and content_hash, sharing the index of df_in.
+    """
+    df_fingerprint = pd.DataFrame({
+        "key_hash": pd.util.hash_pandas_object(df_in[["EntityName", "EntityType"]], index=False),
+        "content_hash": pd.util.hash_pandas_object(df_in[[item[0] for item in LIST_SCHEMA_MAPPING if item[0] != "EntityID"]], index=False)
+    }, index=df_in.index)
+    return df_fingerprint
+
+def summarize_duplicate_fingerprint(df_fingerprint):
+    """Summarize the fingerprints of one chunk by distinct group key and content.
+
+    Args:
+        df_fingerprint (dataframe): The pandas dataframe from fingerprint_duplicate_records.
+
+    Returns:
+        df_summary (dataframe): The pandas dataframe with columns key_hash, content_hash, first_row (the smallest record index) and row_count.
+    """
+    df_summary = df_fingerprint.assign(row=df_fingerprint.index).groupby(["key_hash", "content_hash"], sort=False).agg(
+        first_row=("row", "min"),
+        row_count=("row", "size")
+    ).reset_index()
+    return df_summary
+
+def merge_duplicate_summary(list_df_summary):
+    """Merge the summaries of all chunks into one verdict per distinct content of each duplicate group, decided by decide_duplicate_conflict as in deduplicate_records.
+
+    Memory usage is in proportion to the number of distinct (group key, content) pairs rather than the number of records.
+
+    Args:
+        list_df_summary (list): List of pandas dataframe from summarize_duplicate_fingerprint.
+
+    Returns:
+        df_duplicate_verdict (dataframe): The pandas dataframe indexed by key_hash and content_hash with columns first_row (of the content),
+            group_row_count (the number of records of the group) and duplicate_conflict.
+    """
+    df_duplicate_verdict = pd.concat(list_df_summary, ignore_index=True).groupby(["key_hash", "content_hash"], sort=False).agg(
+        first_row=("first_row", "min"),
+        row_count=("row_count", "sum")
+    ).reset_index()
+    df_duplicate_verdict["group_row_count"] = df_duplicate_verdict.groupby("key_hash", sort=False)["row_count"].transform("sum")
+    df_duplicate_verdict["duplicate_conflict"] = decide_duplicate_conflict(df_duplicate_verdict)
+    return df_duplicate_verdict.drop(["row_count"], axis=1).set_index(["key_hash", "content_hash"])
+
+def deduplicate_records_by_verdict(df_in, df_duplicate_verdict):
+    """Deduplicate records for one chunk of the input dataframe with the verdict of the whole data, so that the result is the same as deduplicate_records on the whole data.
+
+    Args:
+        df_in (dataframe): The pandas dataframe needed to be deduplicated, its index is the record number in the whole data.
+        df_duplicate_verdict (dataframe): The pandas dataframe from merge_duplicate_summary.
+
     Returns:
         df_deduplicate (dataframe): The pandas dataframe which is deduplicated.
         df_duplicate_reject (dataframe): The pandas dataframe which is duplicate in EntityName and EntityType but other information is different.
     """
-    df_processing = df_in.drop([x for x in df_in.columns if re.fullmatch(r".*(reject)$", x) is not None], axis=1).copy(deep=True)
-    df_processing["duplicate_candidate"] = df_processing[["EntityName", "EntityType"]].duplicated(keep=False)
-    df_duplicate_reject = pd.DataFrame(columns=df_processing.columns).astype(df_processing.dtypes)
-    logging.info('- Decouple unique records and duplicate candidates.')
-    df_deduplicate = df_processing[df_processing["duplicate_candidate"] == False].copy(deep=True)
-    df_duplicate_candidate = df_processing[df_processing["duplicate_candidate"] == True].copy(deep=True)
-    logging.info('- Checking all useful columns to decide whether it is duplicate reject case or not for each duplicate candidate group.')
-    list_of_df_duplicate_candidate_group = [group for name, group in df_duplicate_candidate.groupby(["EntityName", "EntityType"])]
-    for x in list_of_df_duplicate_candidate_group:
-        if x[[item[0] for item in LIST_SCHEMA_MAPPING if item[0] != "EntityID"]].duplicated(keep=False).all(axis=0):
-            df_deduplicate = pd.concat([df_deduplicate, x.drop_duplicates(subset=[item[0] for item in LIST_SCHEMA_MAPPING if item[0] != "EntityID"])], ignore_index=True)
-        else:
-            df_duplicate_reject = pd.concat([df_duplicate_reject, x], ignore_index=True)
+    df_processing = copy_dataframe(df_in.drop([x for x in df_in.columns if re.fullmatch(r".*(reject)$", x) is not None], axis=1))
+    df_verdict = df_duplicate_verdict.reindex(pd.MultiIndex.from_frame(fingerprint_duplicate_records(df_processing)))
+    df_processing["duplicate_candidate"] = df_verdict["group_row_count"].to_numpy() > 1
+    # Keep the first record of each content of a group whose contents are all repeated, reject the whole group otherwise
+    conflict = df_verdict["duplicate_conflict"].to_numpy(dtype=bool)
+    first = df_verdict["first_row"].to_numpy() == df_processing.index.to_numpy()
+    df_deduplicate = df_processing[~conflict & first].reset_index(drop=True)
+    df_duplicate_reject = df_processing[conflict].reset_index(drop=True)
     df_deduplicate["duplicate_reject"] = False
     df_duplicate_reject["duplicate_reject"] = True
     return df_deduplicate, df_duplicate_reject
@@ -453,7 +1416,7 @@ def validate_business_rules(df_in):
     Returns:
         df_processing (dataframe): The pandas dataframe which is validated against business rules.
     """
-    df_processing = df_in.drop([x for x in df_in.columns if re.fullmatch(r".*(reject)$", x) is not None], axis=1).copy(deep=True)
+    df_processing = copy_dataframe(df_in.drop([x for x in df_in.columns if re.fullmatch(r".*(reject)$", x) is not None], axis=1))
     df_processing["business_rules_reject"] = False
     # Validate IncorporationDate has value or not, reject when it is fail
     logging.info('- Validate IncorporationDate.')
@@ -469,7 +1432,8 @@ def transform_fields(df_in):
     Returns:
         df_out (dataframe): The pandas dataframe with transformation.
     """
-    df_processing = df_in.copy(deep=True)
+    # Categorical columns are materialized as strings here, at the boundary of loading
+    df_processing = materialize_categorical(copy_dataframe(df_in))
     for item in LIST_SCHEMA_MAPPING:
         logging.info(f'- Rename {item[0]} as {item[1]} and convert as {item[2]} type.')
         df_processing.rename(columns={item[0]: item[1]}, inplace=True)
@@ -481,12 +1445,156 @@ def transform_fields(df_in):
     df_out = df_processing[[x[1] for x in LIST_SCHEMA_MAPPING]]
     return df_out
 
-def load_to_MySQL(dict_connection_credential, df_upload):
+def generate_upload_batches(df_upload, batch_rows=MYSQL_LOAD_BATCH_ROWS, batch_bytes=MYSQL_LOAD_BATCH_BYTES):
+    """Generate batches of rows to be uploaded, rows are taken from the dataframe lazily.
+
+    A batch is closed when it reaches batch_rows rows or about batch_bytes bytes, so that a batch fits in max_allowed_packet of MySQL.
+
+    Args:
+        df_upload (dataframe): The pandas dataframe to be uploaded to MySQL database.
+        batch_rows (int): Maximum number of rows per batch.
+        batch_bytes (int): Maximum estimated size of the values per batch in bytes, a batch has at least one row.
+
+    Yields:
+        list_row (list): List of tuples of row values.
+        size (int): Estimated size of the values in bytes.
+    """
+    list_row = []
+    size = 0
+    for row in df_upload.itertuples(index=False, name=None):
+        # Every value is sent as text in the query, plus quotes and separator
+        row_size = sum([len(str(x)) + 3 for x in row])
+        if list_row and (len(list_row) >= batch_rows or size + row_size > batch_bytes):
+            yield list_row, size
+            list_row = []
+            size = 0
+        list_row.append(row)
+        size += row_size
+    if list_row:
+        yield list_row, size
+
+def write_upload_tsv(df_upload, file_path):
+    """Write the dataframe to a TSV file for LOAD DATA LOCAL INFILE, without header, \\N for NULL and backslash escapes.
+
+    Args:
+        df_upload (dataframe): The pandas dataframe to be uploaded to MySQL database.
+        file_path (str): The path of the TSV file.
+
+    Returns:
+        row_count (int): Number of rows written.
+    """
+    dict_escape = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r", "\0": "\\0"})
+    row_count = 0
+    with open(file_path, "w", encoding="utf-8", newline="\n") as f:
+        for row in df_upload.itertuples(index=False, name=None):
+            list_value = []
+            for value in row:
+                if value is None or value is pd.NA or value is pd.NaT:
+                    list_value.append("\\N")
+                elif isinstance(value, (datetime, date)):
+                    list_value.append(value.strftime("%Y-%m-%d"))
+                else:
+                    list_value.append(str(value).translate(dict_escape))
+            f.write("\t".join(list_value) + "\n")
+            row_count += 1
+    return row_count
+
+def load_data_infile(cnx, cur, table_name, df_upload):
+    """Bulk load data by LOAD DATA LOCAL INFILE into a staging table, then upsert the staging table into the target table with one INSERT ... SELECT.
+
+    Records are upserted in the order of df_upload, so that a repeated entity_id ends with its last record, the same as "insert" mode.
+
+    Args:
+        cnx (connection): MySQL connection opened with allow_local_infile.
+        cur (cursor): Cursor of the connection.
+        table_name (str): Name of the target table.
+        df_upload (dataframe): The pandas dataframe to be uploaded to MySQL database.
+
+    Returns:
+        affected_rows (int): Number of affected rows in the target table, counted the same as INSERT ... ON DUPLICATE KEY UPDATE.
+    """
+    staging_table_name = f"{table_name}_staging"
+    file_descriptor, file_path = tempfile.mkstemp(suffix=".tsv")
+    os.close(file_descriptor)
+    try:
+        start = time.perf_counter()
+        row_count = write_upload_tsv(df_upload, file_path)
+        logging.info(f'-- {row_count} rows written to the temporary TSV in {time.perf_counter() - start:.3f}s.')
+        cur.execute(QUERY_DROP_TABLE_ENTITIES_STAGING.replace('<STAGING_TABLE_NAME>', staging_table_name))
+        cur.execute(QUERY_CREATE_TABLE_ENTITIES_STAGING.replace('<STAGING_TABLE_NAME>', staging_table_name).replace('<TABLE_NAME>', table_name))
+        start = time.perf_counter()
+        cur.execute(QUERY_LOAD_DATA_ENTITY_STAGING.replace('<STAGING_TABLE_NAME>', staging_table_name), (file_path,))
+        logging.info(f'-- {cur.rowcount} rows loaded into staging table "{staging_table_name}" in {time.perf_counter() - start:.3f}s.')
+        # Rows skipped by LOAD DATA LOCAL are only warnings, so the count is checked, and raised as a MySQL error to be handled as the other load errors
+        if cur.rowcount != row_count:
+            raise mysql.connector.Error(msg=f"{row_count} rows are written but {cur.rowcount} rows are loaded into the staging table")
+        start = time.perf_counter()
+        cur.execute(QUERY_INSERT_UPDATE_ENTITY_FROM_STAGING.replace('<STAGING_TABLE_NAME>', staging_table_name).replace('<TABLE_NAME>', table_name))
+        affected_rows = cur.rowcount
+        cnx.commit()
+        logging.info(f'-- Staging table upserted into table "{table_name}" in {time.perf_counter() - start:.3f}s.')
+    finally:
+        os.remove(file_path)
+        # The connection can be broken by the error being raised, which must not be masked by a failed clean-up
+        try:
+            cur.execute(QUERY_DROP_TABLE_ENTITIES_STAGING.replace('<STAGING_TABLE_NAME>', staging_table_name))
+        except mysql.connector.Error as err:
+            logging.warning(f'-- Staging table "{staging_table_name}" is not dropped: {err}')
+    return affected_rows
+
+def executemany_in_batches(cnx, cur, query, df_upload, batch_rows, batch_bytes, commit_batches):
+    """Execute the query for the rows of the dataframe batch by batch, with a commit every few batches.
+
+    Args:
+        cnx (connection): MySQL connection.
+        cur (cursor): Cursor of the connection.
+        query (str): The query with placeholders for the values of one row.
+        df_upload (dataframe): The pandas dataframe to be uploaded to MySQL database.
+        batch_rows (int): Maximum number of rows per executemany.
+        batch_bytes (int): Maximum estimated size of the values per executemany in bytes.
+        commit_batches (int): Number of batches per commit.
+
+    Returns:
+        affected_rows (int): Number of affected rows.
+    """
+    affected_rows = 0
+    uploaded_rows = 0
+    batch_count = 0
+    list_batch_seconds = []
+    start = time.perf_counter()
+    for list_row, size in generate_upload_batches(df_upload, batch_rows, batch_bytes):
+        batch_start = time.perf_counter()
+        cur.executemany(query, list_row)
+        affected_rows += cur.rowcount
+        uploaded_rows += len(list_row)
+        batch_count += 1
+        list_batch_seconds.append(time.perf_counter() - batch_start)
+        logging.debug(f'-- Batch {batch_count}: {len(list_row)} rows, about {size} bytes, {list_batch_seconds[-1]:.3f}s.')
+        # MySQL transactions are managed using the connection's commit() in mysql-connector-python
+        # Commit every few batches to keep transactions and lock holds short
+        if batch_count % commit_batches == 0:
+            cnx.commit()
+            elapsed = time.perf_counter() - start
+            logging.info(f'-- {uploaded_rows}/{len(df_upload)} rows uploaded in {batch_count} batches, {uploaded_rows / elapsed:.0f} rows/s.')
+
+    # Commit the changes of the remaining batches to the database
+    cnx.commit()
+
+    elapsed = time.perf_counter() - start
+    if batch_count > 0:
+        logging.info(f'- {uploaded_rows} rows uploaded in {batch_count} batches in {elapsed:.3f}s, {uploaded_rows / elapsed:.0f} rows/s, batch latency average {sum(list_batch_seconds) / batch_count:.3f}s, maximum {max(list_batch_seconds):.3f}s.')
+    return affected_rows
+
+def load_to_MySQL(dict_connection_credential, df_upload, batch_rows=MYSQL_LOAD_BATCH_ROWS, batch_bytes=MYSQL_LOAD_BATCH_BYTES, commit_batches=MYSQL_LOAD_COMMIT_BATCHES, mode=MYSQL_LOAD_MODE):
     """Load data to MySQL database.
 
     Args:
         dict_connection_credential (dict): contain credential to connect MySQL database
         df_upload (dataframe): The pandas dataframe to be uploaded to MySQL database.
+        batch_rows (int): Maximum number of rows per executemany.
+        batch_bytes (int): Maximum estimated size of the values per executemany in bytes.
+        commit_batches (int): Number of batches per commit.
+        mode (str): "insert" for batched INSERT ... ON DUPLICATE KEY UPDATE, "load_data" for LOAD DATA LOCAL INFILE through a staging table.
 
     Returns:
         affected_rows (int): Number of affected rows.
@@ -498,7 +1606,8 @@ def load_to_MySQL(dict_connection_credential, df_upload):
             port=int(dict_connection_credential["PORT"]),
             user=dict_connection_credential["USER"],
             password=dict_connection_credential["PASSWORD"],
-            database=dict_connection_credential["SCHEMA"]
+            database=dict_connection_credential["SCHEMA"],
+            allow_local_infile=mode == "load_data"
         )
         cur = cnx.cursor()
         logging.info('- MySQL connection is created.')
@@ -510,13 +1619,10 @@ def load_to_MySQL(dict_connection_credential, df_upload):
         affected_rows = None
 
         # Insert or update the data
-        cur.executemany(QUERY_INSERT_UPDATE_ENTITY.replace('<TABLE_NAME>', dict_connection_credential["TABLE_ENTITIES"]), list(df_upload.itertuples(index=False, name=None)))
-
-        # MySQL transactions are managed using the connection's commit() in mysql-connector-python
-        # Commit the changes to the database
-        cnx.commit()
-
-        affected_rows = cur.rowcount
+        if mode == "load_data":
+            affected_rows = load_data_infile(cnx, cur, dict_connection_credential["TABLE_ENTITIES"], df_upload)
+        else:
+            affected_rows = executemany_in_batches(cnx, cur, QUERY_INSERT_UPDATE_ENTITY.replace('<TABLE_NAME>', dict_connection_credential["TABLE_ENTITIES"]), df_upload, batch_rows, batch_bytes, commit_batches)
         logging.info(f'- {affected_rows} rows affected (inserted or updated) in table "{dict_connection_credential["TABLE_ENTITIES"]}".')
     except mysql.connector.Error as err:
         if err.errno == errorcode.ER_ACCESS_DENIED_ERROR:
@@ -533,82 +1639,609 @@ def load_to_MySQL(dict_connection_credential, df_upload):
             logging.info('- MySQL connection is closed.')
     return affected_rows
 
-def quarantine_records(file_path, separator, df_processing, list_df_problematic_case):
-    """Quarantine rejected/problematic records into CSV for manual review.
+def split_upload_partitions(df_upload, partitions):
+    """Split the dataframe into disjoint entity_id ranges of about the same number of rows.
+
+    Args:
+        df_upload (dataframe): The pandas dataframe to be uploaded to MySQL database.
+        partitions (int): Number of partitions.
+
+    Returns:
+        list_df_partition (list): List of pandas dataframe, records with the same entity_id are always in the same partition.
+    """
+    df_sorted = df_upload.sort_values("entity_id", kind="stable")
+    array_entity_id = df_sorted["entity_id"].to_numpy()
+    partition_rows = max([1, -(-len(df_sorted) // partitions)])
+    # Move every cut to the first record of its entity_id, so that no entity_id spans two partitions
+    set_cut = {int(np.searchsorted(array_entity_id, array_entity_id[x], side="left")) for x in range(0, len(df_sorted), partition_rows)}
+    list_cut = sorted(set_cut | {len(df_sorted)})
+    return [df_sorted.iloc[x:y] for x, y in zip(list_cut[:-1], list_cut[1:])]
+
+def load_partition(connection_pool, query, df_partition, batch_rows, batch_bytes, commit_batches):
+    """Load one partition with its own connection from the pool.
+
+    Args:
+        connection_pool (MySQLConnectionPool): The MySQL connection pool.
+        query (str): The query with placeholders for the values of one row.
+        df_partition (dataframe): The pandas dataframe of the partition.
+        batch_rows (int): Maximum number of rows per executemany.
+        batch_bytes (int): Maximum estimated size of the values per executemany in bytes.
+        commit_batches (int): Number of batches per commit.
+
+    Returns:
+        (dict): Affected rows and timing of the partition.
+    """
+    start = time.perf_counter()
+    cnx = connection_pool.get_connection()
+    try:
+        cur = cnx.cursor()
+        affected_rows = executemany_in_batches(cnx, cur, query, df_partition, batch_rows, batch_bytes, commit_batches)
+        cur.close()
+    finally:
+        # Return the connection to the pool
+        cnx.close()
+    return {
+        "entity_id_min": int(df_partition["entity_id"].min()),
+        "entity_id_max": int(df_partition["entity_id"].max()),
+        "rows": len(df_partition),
+        "affected_rows": affected_rows,
+        "seconds": time.perf_counter() - start
+    }
+
+def load_to_MySQL_parallel(dict_connection_credential, df_upload, workers=MYSQL_LOAD_WORKERS, pool_size=MYSQL_POOL_SIZE, batch_rows=MYSQL_LOAD_BATCH_ROWS, batch_bytes=MYSQL_LOAD_BATCH_BYTES, commit_batches=MYSQL_LOAD_COMMIT_BATCHES):
+    """Load data to MySQL database by several threads, each upserts a disjoint entity_id range with its own pooled connection.
+
+    Args:
+        dict_connection_credential (dict): contain credential to connect MySQL database
+        df_upload (dataframe): The pandas dataframe to be uploaded to MySQL database.
+        workers (int): Number of threads.
+        pool_size (int): Number of connections in the pool, not less than workers.
+        batch_rows (int): Maximum number of rows per executemany.
+        batch_bytes (int): Maximum estimated size of the values per executemany in bytes.
+        commit_batches (int): Number of batches per commit.
+
+    Returns:
+        affected_rows (int): Number of affected rows in total, None if loading failed.
+        list_worker_timing (list): Affected rows and timing of each partition.
+    """
+    affected_rows = None
+    list_worker_timing = []
+    try:
+        connection_pool = pooling.MySQLConnectionPool(
+            pool_name="pipeline",
+            pool_size=pool_size,
+            host=dict_connection_credential["HOST"],
+            port=int(dict_connection_credential["PORT"]),
+            user=dict_connection_credential["USER"],
+            password=dict_connection_credential["PASSWORD"],
+            database=dict_connection_credential["SCHEMA"]
+        )
+        logging.info(f'- MySQL connection pool of {pool_size} connections is created.')
+
+        # Create table if not exist.
+        cnx = connection_pool.get_connection()
+        try:
+            cur = cnx.cursor()
+            cur.execute(QUERY_CREATE_TABLE_ENTITIES.replace('<TABLE_NAME>', dict_connection_credential["TABLE_ENTITIES"]))
+            cur.close()
+        finally:
+            cnx.close()
+        logging.info(f'- Table "{dict_connection_credential["TABLE_ENTITIES"]}" ensured to exist (created if not present)')
+
+        # Insert or update the partitions concurrently
+        query = QUERY_INSERT_UPDATE_ENTITY.replace('<TABLE_NAME>', dict_connection_credential["TABLE_ENTITIES"])
+        list_df_partition = split_upload_partitions(df_upload, workers)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list_future = [executor.submit(load_partition, connection_pool, query, x, batch_rows, batch_bytes, commit_batches) for x in list_df_partition]
+            list_worker_timing = [x.result() for x in list_future]
+        for i, timing in enumerate(list_worker_timing):
+            logging.info(f'-- Worker {i}: entity_id {timing["entity_id_min"]}-{timing["entity_id_max"]}, {timing["rows"]} rows, {timing["affected_rows"]} rows affected in {timing["seconds"]:.3f}s.')
+        affected_rows = sum([x["affected_rows"] for x in list_worker_timing])
+        logging.info(f'- {affected_rows} rows affected (inserted or updated) in table "{dict_connection_credential["TABLE_ENTITIES"]}" by {len(list_worker_timing)} workers.')
+    except mysql.connector.Error as err:
+        if err.errno == errorcode.ER_ACCESS_DENIED_ERROR:
+            logging.error('- Something is wrong with user name or password!')
+        elif err.errno == errorcode.ER_BAD_DB_ERROR:
+            logging.error(f'- Database {dict_connection_credential["SCHEMA"]} does not exist!')
+        else:
+            logging.error(f'- unknown error: {err}')
+    return affected_rows, list_worker_timing
+
+def load_to_MySQL_by_mode(dict_connection_credential, df_upload):
+    """Load data to MySQL database by the load mode and the number of load workers from config.
+
+    Args:
+        dict_connection_credential (dict): contain credential to connect MySQL database
+        df_upload (dataframe): The pandas dataframe to be uploaded to MySQL database.
+
+    Returns:
+        affected_rows (int): Number of affected rows.
+    """
+    # LOAD DATA goes through one staging table, thus it is not partitioned
+    if MYSQL_LOAD_WORKERS > 1 and MYSQL_LOAD_MODE == "insert":
+        affected_rows, _ = load_to_MySQL_parallel(dict_connection_credential, df_upload)
+        return affected_rows
+    return load_to_MySQL(dict_connection_credential, df_upload)
+
+def hash_entity_content(df_upload):
+    """Hash the content of every record over the columns of LIST_SCHEMA_MAPPING except entity_id, the hash is stable across runs.
+
+    Args:
+        df_upload (dataframe): The pandas dataframe from transform_fields.
+
+    Returns:
+        (series): The pandas series of content hashes (int64), sharing the index of df_upload.
+    """
+    list_column = [x[1] for x in LIST_SCHEMA_MAPPING if x[1] != "entity_id"]
+    array_hash = pd.util.hash_pandas_object(df_upload[list_column].astype("string"), index=False).to_numpy()
+    return pd.Series(array_hash.view("int64"), index=df_upload.index, name="content_hash")
+
+def select_changed_records(df_upload, state_store):
+    """Select the records which are new or changed since the previous runs by content hash.
+
+    A repeated entity_id is decided on its last record, which is the record the table ends with when every record is loaded,
+    the earlier records of the entity_id are superseded and never loaded.
+
+    Args:
+        df_upload (dataframe): The pandas dataframe from transform_fields.
+        state_store (StateStore): The state store keeping the content hashes of loaded entities.
+
+    Returns:
+        df_changed (dataframe): The pandas dataframe of new or changed records.
+        series_content_hash (series): The pandas series of content hashes of df_changed.
+        dict_delta_count (dict): Number of records to be inserted, updated, skipped as unchanged and superseded by a later record of the same entity_id.
+    """
+    series_content_hash = hash_entity_content(df_upload)
+    series_stored = state_store.get_entity_hashes()
+    position = series_stored.index.get_indexer(df_upload["entity_id"].astype("int64"))
+    known = position >= 0
+    array_stored_hash = np.zeros(len(position), dtype="int64")
+    array_stored_hash[known] = series_stored.to_numpy()[position[known]]
+    unchanged = known & (array_stored_hash == series_content_hash.to_numpy())
+    last = ~df_upload["entity_id"].duplicated(keep="last").to_numpy()
+    changed = last & ~unchanged
+    dict_delta_count = {
+        "inserted": int((last & ~known).sum()),
+        "updated": int((last & known & ~unchanged).sum()),
+        "skipped": int((last & unchanged).sum()),
+        "superseded": int((~last).sum())
+    }
+    return df_upload[changed], series_content_hash[changed], dict_delta_count
+
+def load_changed_records(dict_connection_credential, df_upload, state_store):
+    """Load only the new or changed records to MySQL database, then save their content hashes if loading succeeded.
+
+    Args:
+        dict_connection_credential (dict): contain credential to connect MySQL database
+        df_upload (dataframe): The pandas dataframe from transform_fields.
+        state_store (StateStore): The state store keeping the content hashes of loaded entities.
+
+    Returns:
+        affected_rows (int): Number of affected rows.
+    """
+    df_changed, series_content_hash, dict_delta_count = select_changed_records(df_upload, state_store)
+    logging.info(f'- Delta load: {dict_delta_count["inserted"]} records to be inserted, {dict_delta_count["updated"]} to be updated, {dict_delta_count["skipped"]} unchanged records skipped, {dict_delta_count["superseded"]} records superseded by a later record of the same entity_id.')
+    if len(df_changed) == 0:
+        return 0
+    affected_rows = load_to_MySQL_by_mode(dict_connection_credential, df_changed)
+    if affected_rows is not None:
+        state_store.put_entity_hashes(df_changed["entity_id"], series_content_hash)
+    return affected_rows
+
+def write_parquet_output(file_path, df_output, append=False):
+    """Write a dataframe to Parquet.
+
+    Args:
+        file_path (str): The path of the Parquet file.
+        df_output (dataframe): The pandas dataframe to be written.
+        append (bool): Treat file_path as a directory as it is and add the dataframe as the next part file, instead of creating a new timestamped file. It is used to write chunk by chunk.
+
+    Returns:
+        file_path (str): The path of the Parquet file, or the directory of part files when appending.
+    """
+    if append:
+        os.makedirs(file_path, exist_ok=True)
+        # Empty parts are skipped, as their columns have no type to be merged with the other parts
+        if len(df_output) > 0:
+            df_output.to_parquet(os.path.join(file_path, f"part-{len(os.listdir(file_path)):05d}.parquet"), index=False)
+    else:
+        file_path = generate_quarantine_file_path(file_path)
+        df_output.to_parquet(file_path, index=False)
+    return file_path
+
+def quarantine_records(file_path, separator, df_processing, list_df_problematic_case, append=False, output_format="csv"):
+    """Quarantine rejected/problematic records into CSV or Parquet for manual review.
 
     Args:
         file_path (str): The path of the quarantine CSV file.
         separator (str): The separator in the quarantine CSV file.
         df_processing (dataframe): The pandas dataframe of the original source data.
         list_df_problematic_case (list): List of pandas dataframe of cases due to cleansing, duplication and business rule.
+        append (bool): Append to file_path as it is instead of creating a new timestamped file. The header is only written when the file does not exist yet. It is used to quarantine chunk by chunk.
+        output_format (str): "csv" or "parquet". Parquet files can not be appended, so file_path is a directory of part files when appending.
 
     Returns:
         file_path (str): file path of quarantine CSV.
     """
     pd.set_option('display.max_columns', None)
-    for df_problematic_case in list_df_problematic_case:
-        df_processing = fill_reject_reason(df_processing, df_problematic_case)
+    df_processing = merge_reject_reason(df_processing, list_df_problematic_case)
 
     df_output = df_processing[df_processing[[
         "cleanse_reject",
         "duplicate_reject",
         "business_rules_reject"
-        ]].any(axis=1)].copy(deep=True)
+        ]].any(axis=1)]
 
-    # For convenience to manual review by group
+    # For convenience to manual review by group, records are only sorted within the chunk when appending
     df_output = df_output.sort_values(["EntityName", "EntityType"])
 
+    if output_format == "parquet":
+        file_path = write_parquet_output(file_path, df_output, append)
+    elif append:
+        df_output.to_csv(file_path, sep=separator, header=not os.path.exists(file_path), index=False, mode='a', encoding="utf-8")
+    else:
+        file_path = generate_quarantine_file_path(file_path)
+        df_output.to_csv(file_path, sep=separator, header=True, index=False, mode='w', encoding="utf-8")
+    logging.info(f'- {len(df_output)} records are written in the quarantine {output_format.upper()}.')
+    return file_path
+
+def generate_quarantine_file_path(file_path):
+    """Generate the quarantine CSV path with the current datetime as suffix.
+
+    Args:
+        file_path (str): The path of the quarantine CSV file from config.
+
+    Returns:
+        file_path (str): The path of the quarantine CSV file with datetime suffix.
+    """
     now = datetime.now()
     formatted_datetime = now.strftime("%Y%m%d%H%M%S")
     file_path_split = file_path.split(".")
     file_path = '.'.join(file_path_split[0:-1]) + f"_{formatted_datetime}." + file_path_split[-1]
-    df_output.to_csv(file_path, sep=separator, header=True, index=False, mode='w', encoding="utf-8")
-    logging.info(f'- {len(df_output)} records are written in the quarantine CSV.')
     return file_path
 
-def fill_reject_reason(df_processing, df_problematic_case):
-    """Fill reject reason to data source dataframe.
+def merge_reject_reason(df_processing, list_df_problematic_case):
+    """Merge reject reasons of all problematic cases to data source dataframe with one join on EntityID.
+
+    A reject flag is True if any problematic case flags the record, so a later case never overwrites the flags from an earlier one.
 
     Args:
         df_processing (dataframe): The pandas dataframe of the original source data.
-        df_problematic_case (dataframe): The pandas dataframe of the problematic cases.
+        list_df_problematic_case (list): List of pandas dataframe of the problematic cases.
 
     Returns:
         df_processing (dataframe): The pandas dataframe of the original source data with reject reason.
     """
-    for column in [x for x in df_problematic_case.columns if re.fullmatch(r".*(reject)$", x) is not None]:
-        logging.info(f'- Copy reject reason "{column}" to the original source data.')
-        list_problematic_id_temp = df_problematic_case.loc[df_problematic_case[column] == True]["EntityID"].to_list()
-        df_processing[column] = False
-        df_processing.loc[df_processing["EntityID"].isin(list_problematic_id_temp), column] = True
+    list_df_reject = []
+    for df_problematic_case in list_df_problematic_case:
+        list_column = [x for x in df_problematic_case.columns if re.fullmatch(r".*(reject)$", x) is not None]
+        list_df_reject.append(df_problematic_case[["EntityID"] + list_column])
+    df_reject = pd.concat(list_df_reject, ignore_index=True)
+    list_column = [x for x in df_reject.columns if x != "EntityID"]
+    logging.info(f'- Copy reject reasons {list_column} to the original source data.')
+    df_reject[list_column] = df_reject[list_column].astype("boolean").fillna(False).astype("bool")
+    df_reject = df_reject.groupby("EntityID", sort=False, dropna=False).any()
+    df_processing = df_processing.drop([x for x in list_column if x in df_processing.columns], axis=1).join(df_reject, on="EntityID")
+    df_processing[list_column] = df_processing[list_column].astype("boolean").fillna(False).astype("bool")
     return df_processing
 
-if __name__ == "__main__":
-    logging.info('Pipeline Start!')
+def run_pipeline():
+    """Run the pipeline on the whole source CSV at once.
+    """
+    metrics = RunMetrics("full", profile_memory=PROFILE_MEMORY)
     # Ingest CSV data
     logging.info('Ingest CSV data.')
-    df_source = ingest_csv(SOURCE_CSV_PATH, SOURCE_CSV_DATA_SEPARATOR)
+    with metrics.measure("ingest_source", 0) as record:
+        df_source = ingest_source(SOURCE_CSV_PATH, SOURCE_CSV_DATA_SEPARATOR)
+        record["rows_in"] = len(df_source)
+    metrics.record_dataframes("ingest_source", locals())
     processed_rows = len(df_source)
+    if INCREMENTAL_INGESTION:
+        logging.info('Filter by LastUpdate watermark.')
+        with metrics.measure("filter_by_watermark", len(df_source)) as record:
+            df_source = filter_by_watermark(df_source, STATE_STORE.get_watermark(INCREMENTAL_SOURCE_NAME))
+            record["rows_out"] = len(df_source)
+        metrics.record_dataframes("filter_by_watermark", locals())
+        if len(df_source) == 0:
+            logging.info('- No records are newer than the watermark.')
+            return
     # Cleanse data
     logging.info('Cleanse data.')
-    df_cleanse = cleanse_data(df_source)
-    df_cleanse_accept = df_cleanse[df_cleanse["cleanse_reject"]  == False]
-    df_cleanse_reject = df_cleanse[df_cleanse["cleanse_reject"]  == True]
+    list_step_metric = []
+    with metrics.measure("cleanse_data", len(df_source)) as record:
+        with create_cleanse_executor(CLEANSE_WORKERS) as executor:
+            df_cleanse = cleanse_data_parallel(df_source, executor, list_step_metric=list_step_metric)
+        df_cleanse_accept = df_cleanse[df_cleanse["cleanse_reject"]  == False]
+        df_cleanse_reject = df_cleanse[df_cleanse["cleanse_reject"]  == True]
+        record.update(rows_out=len(df_cleanse_accept), reject_rows=len(df_cleanse_reject))
+    metrics.add_steps(list_step_metric)
+    # Intermediate dataframes are released as soon as only their rejected records are needed by quarantine
+    del df_cleanse
+    metrics.record_dataframes("cleanse_data", locals())
     # Deduplicate records
     logging.info('Deduplicate records.')
-    df_deduplicate, df_duplicate_reject = deduplicate_records(df_cleanse_accept)
+    with metrics.measure("deduplicate_records", len(df_cleanse_accept)) as record:
+        df_deduplicate, df_duplicate_reject = deduplicate_records(df_cleanse_accept)
+        record.update(rows_out=len(df_deduplicate), reject_rows=len(df_duplicate_reject))
+    del df_cleanse_accept
+    metrics.record_dataframes("deduplicate_records", locals())
     # Validate data against business rules
     logging.info('Validate against business rules.')
-    df_business_rules = validate_business_rules(df_deduplicate)
-    df_business_rules_accept = df_business_rules[df_business_rules["business_rules_reject"] == False]
-    df_business_rules_reject = df_business_rules[df_business_rules["business_rules_reject"] == True]
+    with metrics.measure("validate_business_rules", len(df_deduplicate)) as record:
+        df_business_rules = validate_business_rules(df_deduplicate)
+        df_business_rules_accept = df_business_rules[df_business_rules["business_rules_reject"] == False]
+        df_business_rules_reject = df_business_rules[df_business_rules["business_rules_reject"] == True]
+        record.update(rows_out=len(df_business_rules_accept), reject_rows=len(df_business_rules_reject))
+    del df_deduplicate, df_business_rules
+    metrics.record_dataframes("validate_business_rules", locals())
     # Transform fields to fit MySQL schema
     logging.info('Transform to fit MySQL schema.')
-    df_fit_schema = transform_fields(df_business_rules_accept)
+    with metrics.measure("transform_fields", len(df_business_rules_accept)):
+        df_fit_schema = transform_fields(df_business_rules_accept)
+    del df_business_rules_accept
+    metrics.record_dataframes("transform_fields", locals())
+    if CLEAN_OUTPUT_PARQUET_PATH:
+        logging.info('Write clean data to Parquet.')
+        with metrics.measure("write_parquet_output", len(df_fit_schema)):
+            _ = write_parquet_output(CLEAN_OUTPUT_PARQUET_PATH, df_fit_schema)
     # Load clean data into MySQL tables
     logging.info('Load to MySQL tables.')
-    uploaded_rows = load_to_MySQL(MYSQL_CONNECTION_CREDENTIAL, df_fit_schema)
+    with metrics.measure("load_to_MySQL", len(df_fit_schema)) as record:
+        if LOAD_DELTA:
+            uploaded_rows = load_changed_records(MYSQL_CONNECTION_CREDENTIAL, df_fit_schema, STATE_STORE)
+        else:
+            uploaded_rows = load_to_MySQL_by_mode(MYSQL_CONNECTION_CREDENTIAL, df_fit_schema)
+        record["rows_out"] = len(df_fit_schema) if uploaded_rows is not None else 0
+    if INCREMENTAL_INGESTION and uploaded_rows is not None:
+        update_watermark(STATE_STORE, INCREMENTAL_SOURCE_NAME, get_last_update_max(df_fit_schema))
     # Quarantine rejected/problematic records for manual review
     logging.info('Quarantine rejected/problematic records.')
-    _ = quarantine_records(QUARANTINE_CSV_PATH, QUARANTINE_CSV_DATA_SEPARATOR, df_source, [df_cleanse_reject, df_duplicate_reject, df_business_rules_reject])
-    logging.info('Pipeline End!')
\ No newline at end of file
+    list_df_problematic_case = [df_cleanse_reject, df_duplicate_reject, df_business_rules_reject]
+    with metrics.measure("quarantine_records", sum([len(x) for x in list_df_problematic_case])):
+        quarantine_file_path = quarantine_records(QUARANTINE_CSV_PATH, QUARANTINE_CSV_DATA_SEPARATOR, df_source, list_df_problematic_case, output_format=QUARANTINE_FORMAT)
+    logging.info('Write run report.')
+    _ = metrics.write_report(generate_report_file_path(quarantine_file_path), {"source_path": SOURCE_CSV_PATH, "quarantine_path": quarantine_file_path, "processed_rows": processed_rows, "affected_rows": uploaded_rows})
+
+def ingest_source_chunks_after_watermark(watermark_state, chunk_rows, metrics):
+    """Ingest the source file chunk by chunk, and skip the records at or below the watermark if incremental ingestion is enabled.
+
+    Args:
+        watermark_state (dict): The watermark of the source and the latest LastUpdate of the records loaded so far.
+        chunk_rows (int): The maximum number of records in each chunk.
+        metrics (RunMetrics): The metrics of the run.
+
+    Yields:
+        (tuple): The chunk number and the pandas dataframe of original data, chunks without new records are skipped.
+    """
+    for chunk_number, df_source in enumerate(metrics.measure_iterator("ingest_source", ingest_source_chunks(SOURCE_CSV_PATH, SOURCE_CSV_DATA_SEPARATOR, chunk_rows))):
+        if INCREMENTAL_INGESTION:
+            logging.info(f'Filter by LastUpdate watermark of chunk {chunk_number}.')
+            with metrics.measure("filter_by_watermark", len(df_source)) as record:
+                df_source = filter_by_watermark(df_source, watermark_state["watermark"])
+                record["rows_out"] = len(df_source)
+            if len(df_source) == 0:
+                continue
+        yield chunk_number, df_source
+
+def cleanse_chunk(chunk_number, df_source, executor, spill_directory, metrics):
+    """Cleanse a chunk and spill it to the temporary directory, for the first pass of streaming mode.
+
+    Args:
+        chunk_number (int): The chunk number.
+        df_source (dataframe): The pandas dataframe of original data of the chunk.
+        executor (ProcessPoolExecutor): Worker processes of cleansing, or None to cleanse in this process.
+        spill_directory (str): The temporary directory.
+        metrics (RunMetrics): The metrics of the run.
+
+    Returns:
+        spill_path (str): File path of the spilled chunk.
+        df_duplicate_summary (dataframe): The hashes of the duplicate groups of the chunk.
+    """
+    logging.info(f'Cleanse data of chunk {chunk_number}.')
+    list_step_metric = []
+    with metrics.measure("cleanse_data", len(df_source)) as record:
+        df_cleanse = cleanse_data_parallel(df_source, executor, list_step_metric=list_step_metric)
+        df_cleanse_accept = df_cleanse[df_cleanse["cleanse_reject"] == False]
+        record.update(rows_out=len(df_cleanse_accept), reject_rows=len(df_cleanse) - len(df_cleanse_accept))
+    metrics.add_steps(list_step_metric)
+    metrics.record_dataframes("cleanse_data", locals())
+    with metrics.measure("fingerprint_duplicate_records", len(df_cleanse_accept)):
+        df_duplicate_summary = summarize_duplicate_fingerprint(fingerprint_duplicate_records(df_cleanse_accept))
+        spill_path = os.path.join(spill_directory, f"chunk_{chunk_number}.pkl")
+        pd.to_pickle((df_source, df_cleanse), spill_path)
+    return spill_path, df_duplicate_summary
+
+def transform_chunk(chunk_number, spill_path, df_duplicate_verdict, metrics):
+    """Read a spilled chunk, deduplicate it with the verdict of the whole data, validate and transform it, for the second pass of streaming mode.
+
+    Args:
+        chunk_number (int): The chunk number.
+        spill_path (str): File path of the spilled chunk, removed after reading.
+        df_duplicate_verdict (dataframe): The verdict of the duplicate groups of all chunks.
+        metrics (RunMetrics): The metrics of the run.
+
+    Returns:
+        df_source (dataframe): The pandas dataframe of original data of the chunk.
+        df_fit_schema (dataframe): The pandas dataframe ready to be loaded.
+        list_df_problematic_case (list): The rejected records of cleansing, deduplication and business rules.
+    """
+    df_source, df_cleanse = pd.read_pickle(spill_path)
+    os.remove(spill_path)
+    df_cleanse_accept = df_cleanse[df_cleanse["cleanse_reject"] == False]
+    df_cleanse_reject = df_cleanse[df_cleanse["cleanse_reject"] == True]
+    # Deduplicate records
+    logging.info(f'Deduplicate records of chunk {chunk_number}.')
+    with metrics.measure("deduplicate_records", len(df_cleanse_accept)) as record:
+        df_deduplicate, df_duplicate_reject = deduplicate_records_by_verdict(df_cleanse_accept, df_duplicate_verdict)
+        record.update(rows_out=len(df_deduplicate), reject_rows=len(df_duplicate_reject))
+    # Validate data against business rules
+    logging.info(f'Validate against business rules of chunk {chunk_number}.')
+    with metrics.measure("validate_business_rules", len(df_deduplicate)) as record:
+        df_business_rules = validate_business_rules(df_deduplicate)
+        df_business_rules_accept = df_business_rules[df_business_rules["business_rules_reject"] == False]
+        df_business_rules_reject = df_business_rules[df_business_rules["business_rules_reject"] == True]
+        record.update(rows_out=len(df_business_rules_accept), reject_rows=len(df_business_rules_reject))
+    # Transform fields to fit MySQL schema
+    logging.info(f'Transform to fit MySQL schema of chunk {chunk_number}.')
+    with metrics.measure("transform_fields", len(df_business_rules_accept)):
+        df_fit_schema = transform_fields(df_business_rules_accept)
+    metrics.record_dataframes("transform_fields", locals())
+    return df_source, df_fit_schema, [df_cleanse_reject, df_duplicate_reject, df_business_rules_reject]
+
+def load_chunk(chunk_number, df_fit_schema, clean_output_path, watermark_state, metrics):
+    """Load a chunk into MySQL tables.
+
+    Args:
+        chunk_number (int): The chunk number.
+        df_fit_schema (dataframe): The pandas dataframe ready to be loaded.
+        clean_output_path (str): The directory of Parquet part files where a copy of the chunk is written, empty means no copy.
+        watermark_state (dict): The watermark of the source and the latest LastUpdate of the records loaded so far, updated in place if loading succeeded.
+        metrics (RunMetrics): The metrics of the run.
+
+    Returns:
+        (int): Number of affected rows, or None if loading failed.
+    """
+    if clean_output_path:
+        with metrics.measure("write_parquet_output", len(df_fit_schema)):
+            _ = write_parquet_output(clean_output_path, df_fit_schema, append=True)
+    if len(df_fit_schema) == 0:
+        return 0
+    logging.info(f'Load to MySQL tables of chunk {chunk_number}.')
+    with metrics.measure("load_to_MySQL", len(df_fit_schema)) as record:
+        if LOAD_DELTA:
+            affected_rows = load_changed_records(MYSQL_CONNECTION_CREDENTIAL, df_fit_schema, STATE_STORE)
+        else:
+            affected_rows = load_to_MySQL_by_mode(MYSQL_CONNECTION_CREDENTIAL, df_fit_schema)
+        record["rows_out"] = len(df_fit_schema) if affected_rows is not None else 0
+    if affected_rows is not None:
+        watermark_state["last_update_max"] = max([x for x in [watermark_state["last_update_max"], get_last_update_max(df_fit_schema)] if pd.notna(x)], default=pd.NaT)
+    return affected_rows
+
+def quarantine_chunk(chunk_number, quarantine_file_path, df_source, list_df_problematic_case, metrics):
+    """Quarantine rejected/problematic records of a chunk for manual review.
+
+    Args:
+        chunk_number (int): The chunk number.
+        quarantine_file_path (str): The path of the quarantine output, appended chunk by chunk.
+        df_source (dataframe): The pandas dataframe of original data of the chunk.
+        list_df_problematic_case (list): The rejected records of cleansing, deduplication and business rules.
+        metrics (RunMetrics): The metrics of the run.
+    """
+    logging.info(f'Quarantine rejected/problematic records of chunk {chunk_number}.')
+    with metrics.measure("quarantine_records", sum([len(x) for x in list_df_problematic_case])):
+        _ = quarantine_records(quarantine_file_path, QUARANTINE_CSV_DATA_SEPARATOR, df_source, list_df_problematic_case, append=True, output_format=QUARANTINE_FORMAT)
+
+def run_pipeline_streaming(chunk_rows):
+    """Run the pipeline on the source CSV chunk by chunk, so that memory usage is bounded by the chunk size.
+
+    Deduplication needs to know every record of a duplicate group, which can span chunks. Thus the pipeline makes two passes:
+    the first pass cleanses each chunk, spills it to a temporary directory and keeps only the hashes of duplicate groups,
+    the second pass deduplicates each spilled chunk with the verdict of the whole data, then validates, transforms, loads and quarantines it.
+
+    Args:
+        chunk_rows (int): The maximum number of records in each chunk.
+    """
+    metrics = RunMetrics("streaming", profile_memory=PROFILE_MEMORY)
+    with tempfile.TemporaryDirectory() as spill_directory:
+        list_spill_path = []
+        list_df_duplicate_summary = []
+        watermark_state = {"watermark": STATE_STORE.get_watermark(INCREMENTAL_SOURCE_NAME) if INCREMENTAL_INGESTION else None, "last_update_max": pd.NaT}
+        with create_cleanse_executor(CLEANSE_WORKERS) as executor:
+            for chunk_number, df_source in ingest_source_chunks_after_watermark(watermark_state, chunk_rows, metrics):
+                spill_path, df_duplicate_summary = cleanse_chunk(chunk_number, df_source, executor, spill_directory, metrics)
+                list_spill_path.append(spill_path)
+                list_df_duplicate_summary.append(df_duplicate_summary)
+        if not list_spill_path:
+            logging.info('- No records are read from the CSV.')
+            return
+
+        logging.info('Merge duplicate groups of all chunks.')
+        with metrics.measure("merge_duplicate_summary", sum([len(x) for x in list_df_duplicate_summary])):
+            df_duplicate_verdict = merge_duplicate_summary(list_df_duplicate_summary)
+        quarantine_file_path = generate_quarantine_file_path(QUARANTINE_CSV_PATH)
+        clean_output_path = generate_quarantine_file_path(CLEAN_OUTPUT_PARQUET_PATH) if CLEAN_OUTPUT_PARQUET_PATH else ""
+        uploaded_rows = 0
+        load_failed = False
+        for chunk_number, spill_path in enumerate(list_spill_path):
+            df_source, df_fit_schema, list_df_problematic_case = transform_chunk(chunk_number, spill_path, df_duplicate_verdict, metrics)
+            # Load clean data into MySQL tables
+            affected_rows = load_chunk(chunk_number, df_fit_schema, clean_output_path, watermark_state, metrics)
+            if affected_rows is not None:
+                uploaded_rows += affected_rows
+            else:
+                load_failed = True
+            # Quarantine rejected/problematic records for manual review
+            quarantine_chunk(chunk_number, quarantine_file_path, df_source, list_df_problematic_case, metrics)
+        logging.info(f'- {uploaded_rows} rows affected in total.')
+        # The watermark moves only if every chunk is loaded, otherwise the records of the failed chunks would be skipped in the next run
+        if INCREMENTAL_INGESTION and not load_failed:
+            update_watermark(STATE_STORE, INCREMENTAL_SOURCE_NAME, watermark_state["last_update_max"])
+    logging.info('Write run report.')
+    _ = metrics.write_report(generate_report_file_path(quarantine_file_path), {"source_path": SOURCE_CSV_PATH, "quarantine_path": quarantine_file_path, "chunk_rows": chunk_rows, "affected_rows": uploaded_rows})
+
+def run_pipeline_pipelined(chunk_rows, queue_depth):
+    """Run the pipeline chunk by chunk as streaming mode, with the stages of each pass running concurrently and connected by bounded queues.
+
+    In the first pass, the next chunk is parsed while the current chunk is cleansed.
+    In the second pass, the next chunk is deduplicated, validated and transformed while the current chunk is loaded to MySQL,
+    and quarantined records are written on their own thread. The second pass starts after the first pass, because the verdict of deduplication needs every chunk.
+
+    Args:
+        chunk_rows (int): The maximum number of records in each chunk.
+        queue_depth (int): The maximum number of chunks waiting between two stages.
+    """
+    metrics = RunMetrics("pipelined", profile_memory=PROFILE_MEMORY)
+    with tempfile.TemporaryDirectory() as spill_directory:
+        list_spill_path = []
+        list_df_duplicate_summary = []
+        watermark_state = {"watermark": STATE_STORE.get_watermark(INCREMENTAL_SOURCE_NAME) if INCREMENTAL_INGESTION else None, "last_update_max": pd.NaT}
+        with create_cleanse_executor(CLEANSE_WORKERS) as executor:
+            def cleanse_stage(item):
+                chunk_number, df_source = item
+                spill_path, df_duplicate_summary = cleanse_chunk(chunk_number, df_source, executor, spill_directory, metrics)
+                list_spill_path.append(spill_path)
+                list_df_duplicate_summary.append(df_duplicate_summary)
+            logging.info('Ingest and cleanse chunks.')
+            list_stage_statistic = run_stage_pipeline("ingest", ingest_source_chunks_after_watermark(watermark_state, chunk_rows, metrics), [("cleanse", cleanse_stage)], queue_depth)
+        if not list_spill_path:
+            logging.info('- No records are read from the CSV.')
+            return
+
+        logging.info('Merge duplicate groups of all chunks.')
+        with metrics.measure("merge_duplicate_summary", sum([len(x) for x in list_df_duplicate_summary])):
+            df_duplicate_verdict = merge_duplicate_summary(list_df_duplicate_summary)
+        quarantine_file_path = generate_quarantine_file_path(QUARANTINE_CSV_PATH)
+        clean_output_path = generate_quarantine_file_path(CLEAN_OUTPUT_PARQUET_PATH) if CLEAN_OUTPUT_PARQUET_PATH else ""
+        load_state = {"uploaded_rows": 0, "load_failed": False}
+        def transform_stage(item):
+            chunk_number, spill_path = item
+            return (chunk_number,) + transform_chunk(chunk_number, spill_path, df_duplicate_verdict, metrics)
+        def load_stage(item):
+            chunk_number, df_source, df_fit_schema, list_df_problematic_case = item
+            affected_rows = load_chunk(chunk_number, df_fit_schema, clean_output_path, watermark_state, metrics)
+            if affected_rows is not None:
+                load_state["uploaded_rows"] += affected_rows
+            else:
+                load_state["load_failed"] = True
+            return chunk_number, df_source, list_df_problematic_case
+        def quarantine_stage(item):
+            chunk_number, df_source, list_df_problematic_case = item
+            quarantine_chunk(chunk_number, quarantine_file_path, df_source, list_df_problematic_case, metrics)
+        logging.info('Deduplicate, validate, transform, load and quarantine chunks.')
+        list_stage_statistic += run_stage_pipeline("spill", enumerate(list_spill_path), [("transform", transform_stage), ("load", load_stage), ("quarantine", quarantine_stage)], queue_depth)
+        logging.info(f'- {load_state["uploaded_rows"]} rows affected in total.')
+        # The watermark moves only if every chunk is loaded, otherwise the records of the failed chunks would be skipped in the next run
+        if INCREMENTAL_INGESTION and not load_state["load_failed"]:
+            update_watermark(STATE_STORE, INCREMENTAL_SOURCE_NAME, watermark_state["last_update_max"])
+    logging.info('Write run report.')
+    _ = metrics.write_report(generate_report_file_path(quarantine_file_path), {"source_path": SOURCE_CSV_PATH, "quarantine_path": quarantine_file_path, "chunk_rows": chunk_rows, "queue_depth": queue_depth, "affected_rows": load_state["uploaded_rows"], "queue_statistics": list_stage_statistic})
+
+if __name__ == "__main__":
+    logging.info('Pipeline Start!')
+    if SOURCE_CSV_CHUNK_ROWS > 0 and PIPELINE_QUEUE_DEPTH > 0:
+        run_pipeline_pipelined(SOURCE_CSV_CHUNK_ROWS, PIPELINE_QUEUE_DEPTH)
+    elif SOURCE_CSV_CHUNK_ROWS > 0:
+        run_pipeline_streaming(SOURCE_CSV_CHUNK_ROWS)
+    else:
+        run_pipeline()
+    logging.info('Pipeline End!')
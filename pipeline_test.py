@@ -1,10 +1,43 @@
 import unittest
 import pandas as pd
+import numpy as np
 import re
-from pandas.testing import assert_frame_equal
+import os
+import tempfile
+import mysql.connector
+from pandas.testing import assert_frame_equal, assert_series_equal
 from datetime import date
 
-from pipeline import ingest_csv, cleanse_data, process_entityName, process_entityType, process_registrationNumber, process_incorporationDate, process_countryCode, process_stateCode, process_status, process_industry, process_contactEmail, process_lastUpdate, deduplicate_records, validate_business_rules, transform_fields, load_to_MySQL, MYSQL_CONNECTION_CREDENTIAL, quarantine_records
+from pipeline import ingest_csv, ingest_csv_chunks, ingest_source, ingest_source_chunks, write_parquet_output, convert_to_categorical, materialize_categorical, filter_by_watermark, get_last_update_max, update_watermark, cleanse_data, build_cleanse_step_dependency, summarize_critical_path, create_cleanse_executor, cleanse_data_parallel, compile_column_rule, process_column_rule, process_column_rule_vectorized, DICT_COMPILED_COLUMN_RULE, process_incorporationDate, revise_date_format, revise_date_format_column, process_countryCode, process_stateCode, process_lastUpdate, deduplicate_records, fingerprint_duplicate_records, summarize_duplicate_fingerprint, merge_duplicate_summary, deduplicate_records_by_verdict, validate_business_rules, transform_fields, generate_upload_batches, write_upload_tsv, load_data_infile, split_upload_partitions, hash_entity_content, select_changed_records, load_to_MySQL, MYSQL_CONNECTION_CREDENTIAL, merge_reject_reason, quarantine_records
+from reference_value import LIST_SCHEMA_MAPPING
+from state_store import StateStore
+
+class StubCursor:
+    """MySQL cursor which records the queries, and gives the next result for the first keyword found in the query, either a row count or an error to be raised.
+    """
+    def __init__(self, dict_result):
+        self.dict_result = {x: list(y) for x, y in dict_result.items()}
+        self.list_query = []
+        self.list_params = []
+        self.rowcount = -1
+
+    def execute(self, query, params=None):
+        self.list_query.append(query.strip())
+        self.list_params.append(params)
+        list_result = next((y for x, y in self.dict_result.items() if x in query), [])
+        result = list_result.pop(0) if list_result else 0
+        if isinstance(result, Exception):
+            raise result
+        self.rowcount = result
+
+class StubConnection:
+    """MySQL connection which counts the commits.
+    """
+    def __init__(self):
+        self.commit_count = 0
+
+    def commit(self):
+        self.commit_count += 1
 
 class TestPipeLine(unittest.TestCase):
     def test_ingest_csv(self):
@@ -15,6 +48,103 @@ class TestPipeLine(unittest.TestCase):
         df_testing = ingest_csv(csv_path, csv_data_separator)
         self.assertEqual(df_testing.shape, (100, 13), "100 records with 13 columns should be read")
 
+    def test_ingest_csv_chunks(self):
+        """Test that it can ingest csv chunk by chunk with continuous index.
+        """
+        csv_path = "sample_data/sample-legacy-data.csv"
+        csv_data_separator = ","
+        list_df_testing = list(ingest_csv_chunks(csv_path, csv_data_separator, 30))
+        self.assertEqual([len(x) for x in list_df_testing], [30, 30, 30, 10], "100 records should be read in 4 chunks")
+        assert_frame_equal(pd.concat(list_df_testing), ingest_csv(csv_path, csv_data_separator))
+
+    def test_ingest_csv_pyarrow(self):
+        """Test that it can ingest csv by pyarrow into Arrow-backed strings with the same values, and cleanse them the same.
+        """
+        csv_path = "sample_data/sample-legacy-data.csv"
+        csv_data_separator = ","
+        df_expected = ingest_csv(csv_path, csv_data_separator, "c")
+        df_testing = ingest_csv(csv_path, csv_data_separator, "pyarrow")
+        self.assertTrue(all(x.storage == "pyarrow" for x in df_testing.dtypes))
+        assert_frame_equal(df_testing.astype("string"), df_expected)
+        list_df_testing = list(ingest_csv_chunks(csv_path, csv_data_separator, 30, "pyarrow"))
+        self.assertEqual([len(x) for x in list_df_testing], [30, 30, 30, 10], "100 records should be read in 4 chunks")
+        assert_frame_equal(pd.concat(list_df_testing).astype("string"), df_expected)
+        df_cleanse_expected = cleanse_data(df_expected, "vectorized")
+        df_cleanse_testing = cleanse_data(df_testing, "vectorized")
+        assert_frame_equal(df_cleanse_testing.astype(df_cleanse_expected.dtypes.to_dict()), df_cleanse_expected)
+
+    def test_cleanse_data_categorical(self):
+        """Test that it can cleanse categorical columns on their categories with the same result as strings, and keep them categorical until transform.
+        """
+        df_testing = ingest_csv("sample_data/sample-legacy-data.csv", ",")
+        df_categorical = convert_to_categorical(df_testing.copy())
+        self.assertTrue(all(isinstance(df_categorical[x].dtype, pd.CategoricalDtype) for x in ["EntityType", "Status", "Country", "CountryCode", "State", "StateCode", "Industry"]))
+        df_cleanse_expected = cleanse_data(df_testing, "vectorized")
+        df_cleanse_testing = cleanse_data(df_categorical, "vectorized")
+        self.assertTrue(all(isinstance(df_cleanse_testing[x].dtype, pd.CategoricalDtype) for x in ["EntityType", "CountryCode_revised", "StateCode_revised"]))
+        assert_frame_equal(materialize_categorical(df_cleanse_testing.copy()), df_cleanse_expected)
+        df_deduplicate_expected, _ = deduplicate_records(df_cleanse_expected[df_cleanse_expected["cleanse_reject"] == False])
+        df_deduplicate_testing, _ = deduplicate_records(df_cleanse_testing[df_cleanse_testing["cleanse_reject"] == False])
+        assert_frame_equal(transform_fields(df_deduplicate_testing), transform_fields(df_deduplicate_expected))
+
+    def test_copy_on_write(self):
+        """Test that it can run the stages with Copy-on-Write with the same result as deep copies, and keep the input of each stage unchanged.
+        """
+        df_testing = ingest_csv("sample_data/sample-legacy-data.csv", ",")
+        df_cleanse_expected = cleanse_data(df_testing, "vectorized")
+        df_deduplicate_expected, df_duplicate_reject_expected = deduplicate_records(df_cleanse_expected[df_cleanse_expected["cleanse_reject"] == False])
+        df_fit_schema_expected = transform_fields(validate_business_rules(df_deduplicate_expected))
+        with pd.option_context("mode.copy_on_write", True):
+            df_source = df_testing.copy()
+            df_watermark_testing = filter_by_watermark(df_source, pd.Timestamp("2022-01-01"), "vectorized")
+            df_cleanse_testing = cleanse_data(df_source, "vectorized")
+            df_cleanse_accept = df_cleanse_testing[df_cleanse_testing["cleanse_reject"] == False]
+            df_deduplicate_testing, df_duplicate_reject_testing = deduplicate_records(df_cleanse_accept)
+            df_business_rules = validate_business_rules(df_deduplicate_testing)
+            df_fit_schema_testing = transform_fields(df_business_rules)
+        assert_frame_equal(df_source, df_testing)
+        assert_frame_equal(df_watermark_testing, filter_by_watermark(df_testing, pd.Timestamp("2022-01-01"), "vectorized"))
+        assert_frame_equal(df_cleanse_testing, df_cleanse_expected)
+        assert_frame_equal(df_duplicate_reject_testing, df_duplicate_reject_expected)
+        self.assertNotIn("duplicate_candidate", df_cleanse_accept.columns)
+        self.assertNotIn("business_rules_reject", df_deduplicate_testing.columns)
+        self.assertIn("EntityID", df_business_rules.columns)
+        assert_frame_equal(df_fit_schema_testing, df_fit_schema_expected)
+
+    def test_ingest_source(self):
+        """Test that it can ingest Parquet and Arrow IPC files as strings with only the source columns used by the pipeline.
+        """
+        csv_path = "sample_data/sample-legacy-data.csv"
+        csv_data_separator = ","
+        df_expected = ingest_csv(csv_path, csv_data_separator)
+        df_typed = df_expected.copy()
+        df_typed["EntityID"] = df_typed["EntityID"].astype("int64")
+        df_typed["Unused"] = 1
+        with tempfile.TemporaryDirectory() as directory:
+            for file_name in ["source.parquet", "source.feather"]:
+                file_path = os.path.join(directory, file_name)
+                if file_name.endswith(".parquet"):
+                    df_typed.to_parquet(file_path, index=False)
+                else:
+                    df_typed.to_feather(file_path)
+                assert_frame_equal(ingest_source(file_path, csv_data_separator), df_expected)
+                list_df_testing = list(ingest_source_chunks(file_path, csv_data_separator, 30))
+                self.assertEqual([len(x) for x in list_df_testing], [30, 30, 30, 10], "100 records should be read in 4 chunks")
+                assert_frame_equal(pd.concat(list_df_testing), df_expected)
+
+    def test_write_parquet_output(self):
+        """Test that it can write Parquet, chunk by chunk as part files when appending.
+        """
+        df_testing = pd.DataFrame({"entity_id": [1001, 1002, 1003], "entity_name": ["Acme Manufacturing", "Vivo Trading", None]})
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = write_parquet_output(os.path.join(directory, "clean.parquet"), df_testing)
+            assert_frame_equal(pd.read_parquet(file_path), df_testing)
+            file_path = os.path.join(directory, "clean_chunk.parquet")
+            for df_chunk in [df_testing.iloc[0:2], df_testing.iloc[0:0], df_testing.iloc[2:3]]:
+                write_parquet_output(file_path, df_chunk, append=True)
+            self.assertEqual(len(os.listdir(file_path)), 2, "Empty chunks should be skipped.")
+            assert_frame_equal(pd.read_parquet(file_path), df_testing)
+
     def test_cleanse_data(self):
         """Test that some columns with "reject" or "revised" in names are inserted.
         """
@@ -66,6 +196,99 @@ class TestPipeLine(unittest.TestCase):
         check_column_name_reject = [True if re.fullmatch(r".*(reject|revised)$", x) is not None else False for x in column_difference]
         self.assertEqual(all(check_column_name_reject), True, 'All new columns should contain "reject" or "revised" wordings.')
 
+    def test_cleanse_data_vectorized(self):
+        """Test that the vectorized engine gives the same result as the apply engine.
+        """
+        csv_path = "sample_data/sample-legacy-data.csv"
+        csv_data_separator = ","
+        df_testing = ingest_csv(csv_path, csv_data_separator)
+        # These state names can only be resolved by online translation
+        df_testing = df_testing[~df_testing["State"].isin(["Bavaria", "Mumbai", "W.Bengal"])]
+        df_expected = cleanse_data(df_testing, engine="apply")
+        df_testing = cleanse_data(df_testing, engine="vectorized")
+        assert_frame_equal(df_testing, df_expected)
+
+    def test_cleanse_data_vectorized_edge_case(self):
+        """Test that the vectorized engine gives the same result as the apply engine on randomized edge cases of the sample data.
+        """
+        csv_path = "sample_data/sample-legacy-data.csv"
+        csv_data_separator = ","
+        df_sample = ingest_csv(csv_path, csv_data_separator)
+        rng = np.random.default_rng(0)
+        list_edge_case = [
+            lambda x: x,
+            lambda x: x.upper(),
+            lambda x: x.lower(),
+            lambda x: f"  {x} ",
+            lambda x: x.replace(" ", "  "),
+            lambda x: "",
+            lambda x: "NULL",
+            lambda x: pd.NA
+        ]
+        dict_testing = {"EntityID": df_sample["EntityID"].to_list() * 5}
+        # State and StateCode are kept as they are, because unresolved state names are sent to online translation
+        for column in df_sample.columns:
+            if column not in dict_testing:
+                list_value = df_sample[column].to_list() * 5 if column in ["State", "StateCode"] else rng.permutation(df_sample[column].fillna("").to_numpy()).tolist() * 5
+                if column not in ["State", "StateCode"]:
+                    list_value = [list_edge_case[rng.integers(0, len(list_edge_case))](x) for x in list_value]
+                dict_testing[column] = list_value
+        df_testing = pd.DataFrame(dict_testing, dtype=pd.StringDtype())
+        df_testing = df_testing[~df_testing["State"].isin(["Bavaria", "Mumbai", "W.Bengal"])]
+        df_expected = cleanse_data(df_testing, engine="apply", dictionary_encoding=False)
+        assert_frame_equal(cleanse_data(df_testing, engine="vectorized", dictionary_encoding=False), df_expected)
+
+    def test_cleanse_data_dictionary_encoding(self):
+        """Test that processing unique values only gives the same result as processing every record.
+        """
+        csv_path = "sample_data/sample-legacy-data.csv"
+        csv_data_separator = ","
+        df_testing = ingest_csv(csv_path, csv_data_separator)
+        # These state names can only be resolved by online translation
+        df_testing = df_testing[~df_testing["State"].isin(["Bavaria", "Mumbai", "W.Bengal"])]
+        df_expected = cleanse_data(df_testing, engine="apply", dictionary_encoding=False)
+        for engine in ["apply", "vectorized"]:
+            assert_frame_equal(cleanse_data(df_testing, engine=engine, dictionary_encoding=True), df_expected)
+
+    def test_cleanse_data_parallel(self):
+        """Test that cleansing in row shards by worker processes gives the same result in the original order.
+        """
+        csv_path = "sample_data/sample-legacy-data.csv"
+        csv_data_separator = ","
+        df_testing = ingest_csv(csv_path, csv_data_separator)
+        # These state names can only be resolved by online translation
+        df_testing = df_testing[~df_testing["State"].isin(["Bavaria", "Mumbai", "W.Bengal"])]
+        df_expected = cleanse_data(df_testing)
+        with create_cleanse_executor(2) as executor:
+            df_testing = cleanse_data_parallel(df_testing, executor, shard_rows=30)
+        assert_frame_equal(df_testing, df_expected)
+
+    def test_cleanse_data_threads(self):
+        """Test that running independent cleanse steps concurrently gives the same result as running them one by one.
+        """
+        csv_path = "sample_data/sample-legacy-data.csv"
+        csv_data_separator = ","
+        df_testing = ingest_csv(csv_path, csv_data_separator)
+        # These state names can only be resolved by online translation
+        df_testing = df_testing[~df_testing["State"].isin(["Bavaria", "Mumbai", "W.Bengal"])]
+        df_expected = cleanse_data(df_testing, threads=1)
+        for engine in ["apply", "vectorized"]:
+            assert_frame_equal(cleanse_data(df_testing, engine=engine, threads=4), df_expected)
+
+    def test_summarize_critical_path(self):
+        """Test that it can find the dependencies of cleanse steps and the critical path.
+        """
+        list_step = [
+            {"column": "CountryCode", "read": ["CountryCode", "Country"], "write": ["CountryCode_revised", "CountryCode_reject"]},
+            {"column": "Status", "read": ["Status"], "write": ["Status", "Status_reject"]},
+            {"column": "StateCode", "read": ["StateCode", "CountryCode_revised"], "write": ["StateCode_revised", "StateCode_reject"]}
+        ]
+        list_dependency = build_cleanse_step_dependency(list_step)
+        self.assertEqual(list_dependency, [[], [], [0]])
+        list_timing = summarize_critical_path(list_step, list_dependency, [1.0, 2.5, 2.0])
+        self.assertEqual([x["finish"] for x in list_timing], [1.0, 2.5, 3.0])
+        self.assertEqual([x["critical"] for x in list_timing], [True, False, True])
+
     def test_process_entityName(self):
         """Test that it can process EntityName.
         """
@@ -97,7 +320,7 @@ class TestPipeLine(unittest.TestCase):
         }
         df_testing = pd.DataFrame(data_testing, dtype=pd.StringDtype())
         df_expected = pd.DataFrame(data_expected).astype(dtype_mapping)
-        df_testing = process_entityName(df_testing)
+        df_testing = process_column_rule(df_testing, DICT_COMPILED_COLUMN_RULE["EntityName"])
         assert_frame_equal(df_testing, df_expected)
 
     def test_process_entityType(self):
@@ -146,7 +369,7 @@ class TestPipeLine(unittest.TestCase):
         }
         df_testing = pd.DataFrame(data_testing, dtype=pd.StringDtype())
         df_expected = pd.DataFrame(data_expected).astype(dtype_mapping)
-        df_testing = process_entityType(df_testing)
+        df_testing = process_column_rule(df_testing, DICT_COMPILED_COLUMN_RULE["EntityType"])
         assert_frame_equal(df_testing, df_expected)
 
     def test_process_registrationNumber(self):
@@ -186,7 +409,7 @@ class TestPipeLine(unittest.TestCase):
         }
         df_testing = pd.DataFrame(data_testing, dtype=pd.StringDtype())
         df_expected = pd.DataFrame(data_expected).astype(dtype_mapping)
-        df_testing = process_registrationNumber(df_testing)
+        df_testing = process_column_rule(df_testing, DICT_COMPILED_COLUMN_RULE["RegistrationNumber"])
         assert_frame_equal(df_testing, df_expected)
 
     def test_process_incorporationDate(self):
@@ -241,6 +464,45 @@ class TestPipeLine(unittest.TestCase):
         df_testing = process_incorporationDate(df_testing)
         assert_frame_equal(df_testing, df_expected)
 
+    def test_revise_date_format_column(self):
+        """Test that it can revise date format of a column with the same priority as revise_date_format.
+        """
+        data_testing = {
+            "IncorporationDate": [
+                "2017-11-26",
+                "2017-11-27",
+                "2017-11-28",
+                "3/10/15",
+                "18/6/18",
+                "2-Nov-20",
+                "1/13/1500",
+                "asdf",
+                None
+            ]
+        }
+        data_expected = {
+            "IncorporationDate": [
+                "2017-11-26",
+                "2017-11-27",
+                "2017-11-28",
+                "2015-03-10",
+                "2018-06-18",
+                "2020-11-02",
+                "1500-01-13",
+                "asdf",
+                None
+            ]
+        }
+        df_testing = pd.DataFrame(data_testing, dtype=pd.StringDtype())
+        df_expected = pd.DataFrame(data_expected, dtype=pd.StringDtype())
+        series_result, dict_format_hit = revise_date_format_column(df_testing["IncorporationDate"])
+        assert_frame_equal(series_result.to_frame(), df_expected)
+        assert_frame_equal(df_testing["IncorporationDate"].map(revise_date_format, na_action="ignore").astype("string").to_frame(), df_expected)
+        self.assertEqual(dict_format_hit["YYYY-MM-DD"], 3, "3 records should be in YYYY-MM-DD format.")
+        self.assertEqual(dict_format_hit["MM/DD/YY"], 1, "Ambiguous 3/10/15 should be in MM/DD/YY format.")
+        self.assertEqual(dict_format_hit["fallback"], 1, "Year 1500 should be revised by the fallback.")
+        self.assertEqual(dict_format_hit["unparsed"], 1, "1 record should be unparsed.")
+
     def test_process_countryCode(self):
         """Test that it can process CountryCode.
         """
@@ -430,7 +692,7 @@ class TestPipeLine(unittest.TestCase):
         }
         df_testing = pd.DataFrame(data_testing, dtype=pd.StringDtype())
         df_expected = pd.DataFrame(data_expected).astype(dtype_mapping)
-        df_testing = process_status(df_testing)
+        df_testing = process_column_rule(df_testing, DICT_COMPILED_COLUMN_RULE["Status"])
         assert_frame_equal(df_testing, df_expected)
 
     def test_process_industry(self):
@@ -467,7 +729,7 @@ class TestPipeLine(unittest.TestCase):
         }
         df_testing = pd.DataFrame(data_testing, dtype=pd.StringDtype())
         df_expected = pd.DataFrame(data_expected).astype(dtype_mapping)
-        df_testing = process_industry(df_testing)
+        df_testing = process_column_rule(df_testing, DICT_COMPILED_COLUMN_RULE["Industry"])
         assert_frame_equal(df_testing, df_expected)
 
     def test_process_contactEmail(self):
@@ -498,9 +760,91 @@ class TestPipeLine(unittest.TestCase):
         }
         df_testing = pd.DataFrame(data_testing, dtype=pd.StringDtype())
         df_expected = pd.DataFrame(data_expected).astype(dtype_mapping)
-        df_testing = process_contactEmail(df_testing)
+        df_testing = process_column_rule(df_testing, DICT_COMPILED_COLUMN_RULE["ContactEmail"])
         assert_frame_equal(df_testing, df_expected)
 
+    def test_compile_column_rule(self):
+        """Test that it can process a new column by a declarative rule only, the same with both engines.
+        """
+        rule = compile_column_rule("Currency", {"trim": True, "mapping": {"N/A": None}, "case": "upper", "format": r"[A-Z]{3}", "allowed": ["USD", "EUR"], "required": True})
+        data_testing = {
+            "Currency": [
+                " usd ",
+                "Eur",
+                "GBP",
+                "US",
+                "N/A",
+                " ",
+                None
+            ]
+        }
+        data_expected = {
+            "Currency": [
+                "USD",
+                "EUR",
+                "GBP",
+                "US",
+                None,
+                "",
+                None
+            ],
+            "Currency_reject": [
+                False,
+                False,
+                True,
+                True,
+                True,
+                True,
+                True
+            ]
+        }
+        dtype_mapping = {
+            "Currency": "string",
+            "Currency_reject": "bool"
+        }
+        df_expected = pd.DataFrame(data_expected).astype(dtype_mapping)
+        assert_frame_equal(process_column_rule(pd.DataFrame(data_testing, dtype=pd.StringDtype()), rule), df_expected)
+        assert_frame_equal(process_column_rule_vectorized(pd.DataFrame(data_testing, dtype=pd.StringDtype()), rule), df_expected)
+        with self.assertRaises(Exception):
+            compile_column_rule("Currency", {"case": "lower"})
+
+    def test_filter_by_watermark(self):
+        """Test that it can skip records at or below the watermark and keep records with missing or invalid LastUpdate.
+        """
+        data_testing = {
+            "EntityID": [
+                "1",
+                "2",
+                "3",
+                "4",
+                "5"
+            ],
+            "LastUpdate": [
+                "9/17/21",
+                "2018-06-18",
+                "2018-06-19",
+                "asdf",
+                None
+            ]
+        }
+        df_testing = pd.DataFrame(data_testing, dtype=pd.StringDtype())
+        for engine in ["apply", "vectorized"]:
+            df_filter = filter_by_watermark(df_testing, pd.Timestamp("2018-06-18"), engine)
+            self.assertEqual(df_filter["EntityID"].to_list(), ["1", "3", "4", "5"])
+            self.assertEqual(df_filter["LastUpdate"].to_list(), ["9/17/21", "2018-06-19", "asdf", pd.NA], "Original data should be kept for cleansing.")
+            df_filter = filter_by_watermark(df_testing, None, engine)
+            self.assertEqual(len(df_filter), 5)
+        df_fit_schema_testing = pd.DataFrame({"entity_id": [3, 1], "last_update": pd.to_datetime(["2018-06-19", "2021-09-17"])})
+        self.assertEqual(get_last_update_max(df_fit_schema_testing), pd.Timestamp("2021-09-17"))
+        self.assertTrue(pd.isna(get_last_update_max(df_fit_schema_testing[:0])), "No loaded records should not move the watermark.")
+        with tempfile.TemporaryDirectory() as directory:
+            state_store = StateStore(os.path.join(directory, "pipeline-state.sqlite"))
+            update_watermark(state_store, "source.csv", pd.Timestamp("2021-09-17"))
+            update_watermark(state_store, "source.csv", pd.Timestamp("2020-01-01"))
+            update_watermark(state_store, "source.csv", pd.NaT)
+            self.assertEqual(state_store.get_watermark("source.csv"), pd.Timestamp("2021-09-17"), "Watermark should never move backward.")
+            state_store.close()
+
     def test_process_lastUpdate(self):
         """Test that it can process LastUpdate.
         """
@@ -813,6 +1157,225 @@ class TestPipeLine(unittest.TestCase):
         assert_frame_equal(df_testing_deduplicate.sort_values(by=["EntityID"], ignore_index=True), df_expected_deduplicate.sort_values(by=["EntityID"], ignore_index=True))
         assert_frame_equal(df_testing_duplicate_reject.sort_values(by=["EntityID"], ignore_index=True), df_expected_duplicate_reject.sort_values(by=["EntityID"], ignore_index=True))
 
+    def test_deduplicate_records_repeated_content(self):
+        """Test that it can keep the first record of each content when every content of a group is repeated, and reject a group with a content in one record only.
+        """
+        data_testing = {
+            "EntityID": [
+                "1001",
+                "1002",
+                "1003",
+                "1004",
+                "1005",
+                "1006",
+                "1007"
+            ],
+            "EntityName": [
+                "Acme Manufacturing",
+                "Acme Manufacturing",
+                "Acme Manufacturing",
+                "Acme Manufacturing",
+                "Vivo Trading",
+                "Vivo Trading",
+                "Vivo Trading"
+            ],
+            "EntityType": [
+                "Company",
+                "Company",
+                "Company",
+                "Company",
+                "Company",
+                "Company",
+                "Company"
+            ],
+            "RegistrationNumber": [
+                "REG10234",
+                "REG10234",
+                "REG10234",
+                "REG10234",
+                "REG20451",
+                "REG20451",
+                "REG20451"
+            ],
+            "IncorporationDate": [
+                "5/12/10",
+                "5/12/10",
+                "5/12/10",
+                "5/12/10",
+                "4/17/20",
+                "4/17/20",
+                "4/17/20"
+            ],
+            "CountryCode_revised": [
+                "US",
+                "US",
+                "US",
+                "US",
+                "US",
+                "US",
+                "US"
+            ],
+            "StateCode_revised": [
+                "CA",
+                "CA",
+                "CA",
+                "CA",
+                "TX",
+                "TX",
+                "TX"
+            ],
+            "Status": [
+                "Active",
+                "Active",
+                "Inactive",
+                "Inactive",
+                "Active",
+                "Active",
+                "Inactive"
+            ],
+            "Industry": [
+                "Manufacturing",
+                "Manufacturing",
+                "Manufacturing",
+                "Manufacturing",
+                "Trading",
+                "Trading",
+                "Trading"
+            ],
+            "ContactEmail": [
+                "info@acmemfg.com",
+                "info@acmemfg.com",
+                "info@acmemfg.com",
+                "info@acmemfg.com",
+                None,
+                None,
+                None
+            ],
+            "LastUpdate": [
+                "6/15/22",
+                "6/15/22",
+                "6/15/22",
+                "6/15/22",
+                "3/9/22",
+                "3/9/22",
+                "3/9/22"
+            ]
+        }
+        df_testing = pd.DataFrame(data_testing, dtype=pd.StringDtype())
+        df_testing_deduplicate, df_testing_duplicate_reject = deduplicate_records(df_testing)
+        self.assertEqual(df_testing_deduplicate["EntityID"].to_list(), ["1001", "1003"], "The first record of each repeated content should be kept.")
+        self.assertEqual(df_testing_duplicate_reject["EntityID"].to_list(), ["1005", "1006", "1007"], "A group with a content in one record only should be rejected as a whole.")
+        # Same verdict when the groups span chunks
+        list_df_chunk = [df_testing.iloc[0:3], df_testing.iloc[3:7]]
+        df_duplicate_verdict = merge_duplicate_summary([summarize_duplicate_fingerprint(fingerprint_duplicate_records(x)) for x in list_df_chunk])
+        list_result = [deduplicate_records_by_verdict(x, df_duplicate_verdict) for x in list_df_chunk]
+        self.assertEqual(pd.concat([x[0] for x in list_result])["EntityID"].to_list(), ["1001", "1003"])
+        self.assertEqual(pd.concat([x[1] for x in list_result])["EntityID"].to_list(), ["1005", "1006", "1007"])
+
+    def test_deduplicate_records_by_verdict(self):
+        """Test that it can deduplicate records chunk by chunk with the same result as the whole data.
+        """
+        data_testing = {
+            "EntityID": [
+                "1001",
+                "1096",
+                "1004",
+                "2000",
+                "1008",
+                "1030"
+            ],
+            "EntityName": [
+                "Acme Manufacturing",
+                "Bluebell Trust",
+                "Acme Manufacturing",
+                "Bluebell Trust",
+                "Vivo Trading",
+                "Vivo Trading"
+            ],
+            "EntityType": [
+                "Company",
+                "Trust",
+                "Company",
+                "Trust",
+                "Company",
+                "Company"
+            ],
+            "RegistrationNumber": [
+                "REG10234",
+                "REG33817",
+                "REG10234",
+                "REG33817",
+                None,
+                None
+            ],
+            "IncorporationDate": [
+                "5/12/10",
+                "10/8/10",
+                "12/5/10",
+                "10/8/10",
+                "4/17/20",
+                "4/17/20"
+            ],
+            "CountryCode_revised": [
+                "US",
+                "AU",
+                "US",
+                "AU",
+                "US",
+                "US"
+            ],
+            "StateCode_revised": [
+                "CA",
+                "SYD",
+                "CA",
+                "SYD",
+                "TX",
+                None
+            ],
+            "Status": [
+                "Active",
+                "Active",
+                "Active",
+                "Active",
+                "Active",
+                "Active"
+            ],
+            "Industry": [
+                "Manufacturing",
+                "Trust",
+                "Manufacturing",
+                "Trust",
+                "Trading",
+                "Trading"
+            ],
+            "ContactEmail": [
+                "info@acmemfg.com",
+                "info@bluebelltrust.au",
+                "info@acmemfg.com",
+                "info@bluebelltrust.au",
+                None,
+                None
+            ],
+            "LastUpdate": [
+                "6/15/22",
+                "5/30/22",
+                None,
+                "5/30/22",
+                "3/9/22",
+                "3/9/22"
+            ]
+        }
+        df_testing = pd.DataFrame(data_testing, dtype=pd.StringDtype())
+        list_df_chunk = [df_testing.iloc[0:2], df_testing.iloc[2:4], df_testing.iloc[4:6]]
+        df_duplicate_verdict = merge_duplicate_summary([summarize_duplicate_fingerprint(fingerprint_duplicate_records(x)) for x in list_df_chunk])
+        list_result = [deduplicate_records_by_verdict(x, df_duplicate_verdict) for x in list_df_chunk]
+        df_testing_deduplicate = pd.concat([x[0] for x in list_result], ignore_index=True)
+        df_testing_duplicate_reject = pd.concat([x[1] for x in list_result], ignore_index=True)
+        df_expected_deduplicate, df_expected_duplicate_reject = deduplicate_records(df_testing)
+        self.assertEqual(df_testing_deduplicate["EntityID"].to_list(), ["1096"], "Only the first record of the identical group should be kept.")
+        assert_frame_equal(df_testing_deduplicate.sort_values(by=["EntityID"], ignore_index=True), df_expected_deduplicate.sort_values(by=["EntityID"], ignore_index=True))
+        assert_frame_equal(df_testing_duplicate_reject.sort_values(by=["EntityID"], ignore_index=True), df_expected_duplicate_reject.sort_values(by=["EntityID"], ignore_index=True))
+
     def test_validate_business_rules(self):
         """Test that it can process LastUpdate.
         """
@@ -932,6 +1495,191 @@ class TestPipeLine(unittest.TestCase):
         df_testing = transform_fields(df_testing)
         assert_frame_equal(df_testing, df_expected)
 
+    def test_generate_upload_batches(self):
+        """Test that it can split rows into batches by row count and by estimated size.
+        """
+        data_testing = {
+            "entity_id": [
+                1001,
+                1002,
+                1003,
+                1004,
+                1005
+            ],
+            "entity_name": [
+                "Acme Manufacturing",
+                "Vivo Trading",
+                "Bluebell Trust",
+                None,
+                "Sunflower Trading"
+            ]
+        }
+        df_testing = pd.DataFrame(data_testing)
+        list_batch = list(generate_upload_batches(df_testing, batch_rows=2, batch_bytes=1000))
+        self.assertEqual([len(x[0]) for x in list_batch], [2, 2, 1])
+        self.assertEqual(list_batch[0][0], [(1001, "Acme Manufacturing"), (1002, "Vivo Trading")])
+        # A batch is closed before its estimated size exceeds batch_bytes
+        list_batch = list(generate_upload_batches(df_testing, batch_rows=10, batch_bytes=40))
+        self.assertEqual([len(x[0]) for x in list_batch], [1, 1, 2, 1])
+        self.assertTrue(all(x[1] <= 40 or len(x[0]) == 1 for x in list_batch))
+        self.assertEqual(sum([len(x[0]) for x in list_batch]), 5)
+
+    def test_write_upload_tsv(self):
+        """Test that it can write the TSV file for LOAD DATA LOCAL INFILE with NULL and special characters escaped.
+        """
+        data_testing = {
+            "entity_id": [
+                1096,
+                1097
+            ],
+            "entity_name": [
+                "Bluebell\tTrust",
+                "C:\\Acme\nLtd"
+            ],
+            "registration_number": [
+                None,
+                "REG33817"
+            ],
+            "incorporation_date": [
+                pd.Timestamp("2010-10-08"),
+                None
+            ]
+        }
+        text_expected = "1096\tBluebell\\tTrust\t\\N\t2010-10-08\n1097\tC:\\\\Acme\\nLtd\tREG33817\t\\N\n"
+        df_testing = pd.DataFrame(data_testing).astype({"incorporation_date": "object"})
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = os.path.join(directory, "upload.tsv")
+            self.assertEqual(write_upload_tsv(df_testing, file_path), 2)
+            with open(file_path, encoding="utf-8") as f:
+                self.assertEqual(f.read(), text_expected)
+
+    def test_load_data_infile(self):
+        """Test that it can load through a temporary staging table, raise when LOAD DATA skips rows, and always remove the TSV and drop the staging table.
+        """
+        data_testing = {
+            "entity_id": [
+                1005,
+                1005
+            ],
+            "status": [
+                "Inactive",
+                "Active"
+            ]
+        }
+        df_testing = pd.DataFrame(data_testing)
+        cnx = StubConnection()
+        cur = StubCursor({"LOAD DATA": [2], "INSERT INTO": [3]})
+        self.assertEqual(load_data_infile(cnx, cur, "entities", df_testing), 3)
+        self.assertEqual([x.split()[0:3] for x in cur.list_query], [["DROP", "TEMPORARY", "TABLE"], ["CREATE", "TEMPORARY", "TABLE"], ["LOAD", "DATA", "LOCAL"], ["INSERT", "INTO", "entities"], ["DROP", "TEMPORARY", "TABLE"]])
+        self.assertIn("ORDER BY staging.staging_row", cur.list_query[3], "A repeated entity_id should end with its last record.")
+        self.assertEqual(cnx.commit_count, 1)
+        self.assertFalse(os.path.exists(cur.list_params[2][0]), "The TSV should be removed.")
+        # Rows skipped by LOAD DATA LOCAL are only warnings
+        cnx = StubConnection()
+        cur = StubCursor({"LOAD DATA": [1]})
+        with self.assertRaises(mysql.connector.Error):
+            load_data_infile(cnx, cur, "entities", df_testing)
+        self.assertFalse(any(x.startswith("INSERT") for x in cur.list_query))
+        self.assertTrue(cur.list_query[-1].startswith("DROP TEMPORARY TABLE"))
+        self.assertEqual(cnx.commit_count, 0)
+        self.assertFalse(os.path.exists(cur.list_params[2][0]), "The TSV should be removed.")
+        # A failed clean-up is only logged, the load error is raised
+        cur = StubCursor({"LOAD DATA": [1], "DROP": [0, mysql.connector.Error(msg="Lost connection")]})
+        with self.assertLogs(level="WARNING"):
+            with self.assertRaisesRegex(mysql.connector.Error, "rows are loaded into the staging table"):
+                load_data_infile(StubConnection(), cur, "entities", df_testing)
+
+    def test_split_upload_partitions(self):
+        """Test that it can split records into disjoint entity_id ranges.
+        """
+        data_testing = {
+            "entity_id": [
+                1005,
+                1001,
+                1003,
+                1003,
+                1002,
+                1003,
+                1004
+            ]
+        }
+        df_testing = pd.DataFrame(data_testing)
+        list_df_partition = split_upload_partitions(df_testing, 3)
+        self.assertEqual([x["entity_id"].to_list() for x in list_df_partition], [[1001, 1002], [1003, 1003, 1003, 1004], [1005]])
+        self.assertEqual(split_upload_partitions(df_testing.iloc[0:0], 3), [])
+
+    def test_select_changed_records(self):
+        """Test that it can select new or changed records by content hash.
+        """
+        data_testing = {
+            "entity_id": [
+                1001,
+                1002,
+                1003
+            ],
+            "entity_name": [
+                "Acme Manufacturing",
+                "Vivo Trading",
+                "Bluebell Trust"
+            ],
+            "status": [
+                "Active",
+                "Active",
+                None
+            ]
+        }
+        df_testing = pd.DataFrame(data_testing)
+        for column in [x[1] for x in LIST_SCHEMA_MAPPING if x[1] not in df_testing.columns]:
+            df_testing[column] = None
+        with tempfile.TemporaryDirectory() as directory:
+            state_store = StateStore(os.path.join(directory, "pipeline-state.sqlite"))
+            series_content_hash = hash_entity_content(df_testing)
+            state_store.put_entity_hashes(df_testing["entity_id"].iloc[0:2], series_content_hash.iloc[0:2])
+            df_testing.loc[1, "status"] = "Inactive"
+            df_changed, series_content_hash, dict_delta_count = select_changed_records(df_testing, state_store)
+            state_store.close()
+        self.assertEqual(df_changed["entity_id"].to_list(), [1002, 1003])
+        self.assertEqual(dict_delta_count, {"inserted": 1, "updated": 1, "skipped": 1, "superseded": 0})
+        assert_series_equal(series_content_hash, hash_entity_content(df_testing).iloc[1:3])
+
+    def test_select_changed_records_repeated_entity_id(self):
+        """Test that it can decide a repeated entity_id on its last record, which the table ends with in a full load.
+        """
+        data_testing = {
+            "entity_id": [
+                1005,
+                1005,
+                1006,
+                1006
+            ],
+            "entity_name": [
+                "Emerald Partners",
+                "Emerald Partners",
+                "Vivo Trading",
+                "Vivo Trading"
+            ],
+            "status": [
+                "Inactive",
+                "Active",
+                "Active",
+                "Inactive"
+            ]
+        }
+        df_testing = pd.DataFrame(data_testing)
+        for column in [x[1] for x in LIST_SCHEMA_MAPPING if x[1] not in df_testing.columns]:
+            df_testing[column] = None
+        with tempfile.TemporaryDirectory() as directory:
+            state_store = StateStore(os.path.join(directory, "pipeline-state.sqlite"))
+            # Both entities are stored as "Active"
+            df_stored = df_testing.iloc[[1, 2]]
+            state_store.put_entity_hashes(df_stored["entity_id"], hash_entity_content(df_stored))
+            df_changed, series_content_hash, dict_delta_count = select_changed_records(df_testing, state_store)
+            state_store.close()
+        self.assertEqual(df_changed.index.to_list(), [3], "Only the last record of 1006 is changed, 1005 ends as stored.")
+        self.assertEqual(df_changed["status"].to_list(), ["Inactive"])
+        self.assertEqual(dict_delta_count, {"inserted": 0, "updated": 1, "skipped": 1, "superseded": 2})
+        assert_series_equal(series_content_hash, hash_entity_content(df_testing).iloc[[3]])
+
     def test_load_to_MySQL(self):
         """Test that it can load data to MySQL database.
         """
@@ -987,6 +1735,81 @@ class TestPipeLine(unittest.TestCase):
         result = load_to_MySQL(MYSQL_CONNECTION_CREDENTIAL, df_testing)
         self.assertIsNotNone(result, msg=None)
 
+    def test_merge_reject_reason(self):
+        """Test that it can merge reject reasons of all problematic cases without overwriting earlier flags.
+        """
+        data_testing_source = {
+            "EntityID": [
+                "1096",
+                "1097",
+                "1098",
+                "1099"
+            ]
+        }
+        data_testing_cleanse_reject = {
+            "EntityID": [
+                "1097",
+                "1098"
+            ],
+            "EntityName_reject": [
+                True,
+                False
+            ],
+            "cleanse_reject": [
+                True,
+                True
+            ]
+        }
+        data_testing_other_reject = {
+            "EntityID": [
+                "1099"
+            ],
+            "cleanse_reject": [
+                True
+            ],
+            "duplicate_reject": [
+                True
+            ]
+        }
+        data_expected = {
+            "EntityID": [
+                "1096",
+                "1097",
+                "1098",
+                "1099"
+            ],
+            "EntityName_reject": [
+                False,
+                True,
+                False,
+                False
+            ],
+            "cleanse_reject": [
+                False,
+                True,
+                True,
+                True
+            ],
+            "duplicate_reject": [
+                False,
+                False,
+                False,
+                True
+            ]
+        }
+        dtype_mapping = {
+            "EntityID": "string",
+            "EntityName_reject": "bool",
+            "cleanse_reject": "bool",
+            "duplicate_reject": "bool"
+        }
+        df_testing_source = pd.DataFrame(data_testing_source).astype({"EntityID": "string"})
+        df_testing_cleanse_reject = pd.DataFrame(data_testing_cleanse_reject).astype({x: dtype_mapping[x] for x in data_testing_cleanse_reject.keys()})
+        df_testing_other_reject = pd.DataFrame(data_testing_other_reject).astype({x: dtype_mapping[x] for x in data_testing_other_reject.keys()})
+        df_expected = pd.DataFrame(data_expected).astype(dtype_mapping)
+        df_result = merge_reject_reason(df_testing_source, [df_testing_cleanse_reject, df_testing_other_reject])
+        assert_frame_equal(df_result, df_expected)
+
     def test_quarantine_records(self):
         """Test that it can quarantine records to CSV.
         """
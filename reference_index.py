@@ -0,0 +1,283 @@
+import pandas as pd
+import pycountry
+from pycountry import remove_accents
+
+class CountryResolver:
+    """Resolve country codes and country names to ISO 3166 alpha-2 codes with indexes built once from pycountry.
+
+    The results are the same as pycountry.countries.get(alpha_2=...) and the first result of pycountry.countries.search_fuzzy(...),
+    but the normalization of names is done once when the indexes are built rather than on every search, and every searched name is memorized.
+    """
+    def __init__(self, include_historic=False):
+        """Build the indexes.
+
+        Args:
+            include_historic (bool): Resolve the names of historic countries (ISO 3166-3) if a name is not found by fuzzy search.
+        """
+        self.include_historic = include_historic
+        # Same as the indexes in pycountry: one dictionary per field, keyed by lowercase value, the last country wins if a value is duplicated
+        dict_index = {}
+        for country in pycountry.countries:
+            for key, value in country._fields.items():
+                dict_index.setdefault(key, {})[value.lower()] = country.alpha_2
+        self.dict_alpha_2 = dict_index["alpha_2"]
+        self.dict_alpha_3 = dict_index["alpha_3"]
+        # Exact lookup of pycountry.countries.lookup: the first field in index order wins
+        self.dict_lookup = {}
+        for index in dict_index.values():
+            for value, alpha_2 in index.items():
+                self.dict_lookup.setdefault(value, alpha_2)
+        # Names for partial matching, in the priority order of search_fuzzy
+        self.list_country_name = []
+        for country in pycountry.countries:
+            list_name = [country._fields.get(x) for x in ["name", "official_name", "comment"]]
+            self.list_country_name.append((country.alpha_2, [remove_accents(x.lower()) for x in list_name if x is not None]))
+        # Exact matches on any field of subdivisions, a subdivision counts once per matching field
+        self.dict_subdivision_token = {}
+        self.list_subdivision_name = []
+        for subdivision in pycountry.subdivisions:
+            country_alpha_2 = self.dict_alpha_2[subdivision.country_code.lower()]
+            for value in subdivision._fields.values():
+                if value is not None:
+                    for token in set(remove_accents(value.lower()).split(";")):
+                        self.dict_subdivision_token.setdefault(token, []).append(country_alpha_2)
+            self.list_subdivision_name.append((country_alpha_2, remove_accents(subdivision._fields.get("name").lower())))
+        self.dict_historic_name = {}
+        if include_historic:
+            for country in pycountry.historic_countries:
+                if "alpha_2" in country._fields:
+                    for key in ["name", "official_name", "common_name"]:
+                        if key in country._fields:
+                            self.dict_historic_name.setdefault(remove_accents(country._fields[key].lower()), country.alpha_2)
+        self.dict_fuzzy_memo = {}
+        self.counter = {
+            "code_hit": 0,
+            "code_miss": 0,
+            "name_hit": 0,
+            "name_miss": 0,
+            "name_memo_hit": 0
+        }
+
+    def get_alpha_2(self, code, default=None):
+        """Get the alpha-2 code of a country by alpha-2 code, case-insensitive.
+
+        Args:
+            code (str): Input string expected as alpha-2 code.
+            default: Value returned if the code is not found.
+
+        Returns:
+            (str): The alpha-2 code, or default if the code is not found.
+        """
+        alpha_2 = self.dict_alpha_2.get(code.lower())
+        if alpha_2 is None:
+            self.counter["code_miss"] += 1
+            return default
+        self.counter["code_hit"] += 1
+        return alpha_2
+
+    def map_alpha_2(self, series_code):
+        """Get the alpha-2 codes of a pandas series of alpha-2 codes, case-insensitive.
+
+        Args:
+            series_code (series): The pandas series of strings expected as alpha-2 code.
+
+        Returns:
+            (series): The pandas series of alpha-2 codes, missing if the code is not found.
+        """
+        series_alpha_2 = series_code.str.lower().map(self.dict_alpha_2).astype(series_code.dtype)
+        count_hit = int(series_alpha_2.notna().sum())
+        self.counter["code_hit"] += count_hit
+        self.counter["code_miss"] += int(series_code.notna().sum()) - count_hit
+        return series_alpha_2
+
+    def search_fuzzy_alpha_2(self, name):
+        """Search a country by name, same as the first result of pycountry.countries.search_fuzzy.
+
+        Args:
+            name (str): Input string expected as country name.
+
+        Returns:
+            (str): The alpha-2 code of the best match, or None if nothing is found.
+        """
+        query = remove_accents(name.strip().lower())
+        if query in self.dict_fuzzy_memo:
+            self.counter["name_memo_hit"] += 1
+            return self.dict_fuzzy_memo[query]
+        alpha_2 = self._search_fuzzy(query)
+        if alpha_2 is None and self.include_historic:
+            alpha_2 = self.dict_historic_name.get(query)
+        self.counter["name_miss" if alpha_2 is None else "name_hit"] += 1
+        self.dict_fuzzy_memo[query] = alpha_2
+        return alpha_2
+
+    def _search_fuzzy(self, query):
+        """Score countries with the same rules as pycountry.countries.search_fuzzy.
+
+        Args:
+            query (str): Normalized query.
+
+        Returns:
+            (str): The alpha-2 code of the best match, or None if nothing is found.
+        """
+        dict_result = {}
+        # Prio 1: exact matches on country names
+        if query in self.dict_lookup:
+            dict_result[self.dict_lookup[query]] = 50
+        # Prio 2: exact matches on subdivision names
+        for alpha_2 in self.dict_subdivision_token.get(query, []):
+            dict_result[alpha_2] = dict_result.get(alpha_2, 0) + 49
+        # Prio 3: partial matches on country names
+        for alpha_2, list_name in self.list_country_name:
+            for name in list_name:
+                if query in name:
+                    dict_result[alpha_2] = dict_result.get(alpha_2, 0) + max([5, 30 - (2 * name.find(query))])
+                    break
+        # Prio 4: partial matches on subdivision names
+        for alpha_2, name in self.list_subdivision_name:
+            if query in name:
+                dict_result[alpha_2] = dict_result.get(alpha_2, 0) + max([1, 5 - name.find(query)])
+        if not dict_result:
+            return None
+        return min(dict_result.items(), key=lambda x: (-x[1], x[0]))[0]
+
+class SubdivisionIndex:
+    """Resolve ISO 3166-2 subdivision codes and names with indexes built once from pycountry.
+
+    Subdivision codes are looked up by country code and subdivision code, same as pycountry.subdivisions.get(code=...).
+    Subdivision names are looked up by country code and exact name first, then by a global search with the same first result as pycountry.subdivisions.search_fuzzy(...).
+    """
+    def __init__(self):
+        """Build the indexes.
+        """
+        # Same as the code index in pycountry: keyed by lowercase full code, e.g. "au-vic", the last subdivision wins if a code is duplicated
+        self.dict_code = {}
+        # Exact matches on any field, a subdivision counts once per matching field
+        self.dict_token = {}
+        self.list_name = []
+        # Exact names within a country, keyed by (country code, normalized name), the subdivision type (e.g. "province") is not a name
+        dict_country_name_score = {}
+        for subdivision in pycountry.subdivisions:
+            country_code = subdivision.code.split("-")[0]
+            self.dict_code[subdivision.code.lower()] = subdivision.code.split("-")[1]
+            for key, value in subdivision._fields.items():
+                if value is not None:
+                    for token in set(remove_accents(value.lower()).split(";")):
+                        self.dict_token.setdefault(token, []).append(subdivision.code)
+                        if key != "type":
+                            dict_score = dict_country_name_score.setdefault((country_code, token), {})
+                            dict_score[subdivision.code] = dict_score.get(subdivision.code, 0) + 50
+            self.list_name.append((subdivision.code, remove_accents(subdivision._fields.get("name").lower())))
+        # Scored as search_fuzzy among the subdivisions of the country
+        dict_name = dict(self.list_name)
+        self.dict_country_name = {}
+        for (country_code, token), dict_score in dict_country_name_score.items():
+            for code in dict_score:
+                if token in dict_name[code]:
+                    dict_score[code] += max([1, 5 - dict_name[code].find(token)])
+            self.dict_country_name[(country_code, token)] = min(dict_score.items(), key=lambda x: (-x[1], x[0]))[0].split("-")[1]
+        self.dict_fuzzy_memo = {}
+        self.counter = {
+            "code_hit": 0,
+            "code_miss": 0,
+            "country_name_hit": 0,
+            "global_name_hit": 0,
+            "name_miss": 0,
+            "name_memo_hit": 0
+        }
+
+    def get_code(self, country_code, subdivision_code, default=None):
+        """Get the subdivision code (without country code) by country code and subdivision code, case-insensitive.
+
+        Args:
+            country_code (str): Country code.
+            subdivision_code (str): Subdivision code without country code.
+            default: Value returned if the subdivision is not found.
+
+        Returns:
+            (str): The subdivision code without country code, or default if the subdivision is not found.
+        """
+        code = self.dict_code.get(f"{country_code}-{subdivision_code}".lower())
+        if code is None:
+            self.counter["code_miss"] += 1
+            return default
+        self.counter["code_hit"] += 1
+        return code
+
+    def map_code(self, series_country_code, series_subdivision_code):
+        """Get the subdivision codes (without country code) of pandas series of country codes and subdivision codes, case-insensitive.
+
+        Args:
+            series_country_code (series): The pandas series of country codes.
+            series_subdivision_code (series): The pandas series of subdivision codes without country code.
+
+        Returns:
+            (series): The pandas series of subdivision codes without country code, missing if the subdivision is not found.
+        """
+        series_key = series_country_code + "-" + series_subdivision_code
+        series_code = series_key.str.lower().map(self.dict_code).astype(series_subdivision_code.dtype)
+        count_hit = int(series_code.notna().sum())
+        self.counter["code_hit"] += count_hit
+        self.counter["code_miss"] += int(series_key.notna().sum()) - count_hit
+        return series_code
+
+    def resolve_name(self, name, country_code=None):
+        """Resolve a subdivision name, by the exact name within the country first, then by global search.
+
+        Args:
+            name (str): Input string expected as subdivision name.
+            country_code (str): Country code of the subdivision, or None if unknown.
+
+        Returns:
+            (str): The subdivision code without country code, or None if nothing is found.
+        """
+        query = remove_accents(name.strip().lower())
+        if isinstance(country_code, str):
+            code = self.dict_country_name.get((country_code.upper(), query))
+            if code is not None:
+                self.counter["country_name_hit"] += 1
+                return code
+        return self.search_fuzzy_code(name)
+
+    def map_name(self, series_name, series_country_code):
+        """Resolve the subdivision names of pandas series, each distinct pair of name and country code is resolved once.
+
+        Args:
+            series_name (series): The pandas series of strings expected as subdivision name.
+            series_country_code (series): The pandas series of country codes of the subdivisions.
+
+        Returns:
+            (series): The pandas series of subdivision codes without country code, missing if nothing is found.
+        """
+        df_pair = pd.DataFrame({"name": series_name, "country_code": series_country_code})
+        df_unique = df_pair.dropna(subset=["name"]).drop_duplicates().copy()
+        df_unique["code"] = pd.array([self.resolve_name(x, y if y is not pd.NA else None) for x, y in zip(df_unique["name"], df_unique["country_code"])], dtype=series_name.dtype)
+        df_pair = df_pair.merge(df_unique, how="left", on=["name", "country_code"])
+        return df_pair["code"].set_axis(series_name.index)
+
+    def search_fuzzy_code(self, name):
+        """Search a subdivision by name globally, same as the first result of pycountry.subdivisions.search_fuzzy.
+
+        Args:
+            name (str): Input string expected as subdivision name.
+
+        Returns:
+            (str): The subdivision code without country code of the best match, or None if nothing is found.
+        """
+        query = remove_accents(name.strip().lower())
+        if query in self.dict_fuzzy_memo:
+            self.counter["name_memo_hit"] += 1
+            return self.dict_fuzzy_memo[query]
+        dict_result = {}
+        # Prio 1: exact matches on subdivision names
+        for code in self.dict_token.get(query, []):
+            dict_result[code] = dict_result.get(code, 0) + 50
+        # Prio 2: partial matches on subdivision names
+        for code, subdivision_name in self.list_name:
+            if query in subdivision_name:
+                dict_result[code] = dict_result.get(code, 0) + max([1, 5 - subdivision_name.find(query)])
+        code = None
+        if dict_result:
+            code = min(dict_result.items(), key=lambda x: (-x[1], x[0]))[0].split("-")[1]
+        self.counter["name_miss" if code is None else "global_name_hit"] += 1
+        self.dict_fuzzy_memo[query] = code
+        return code
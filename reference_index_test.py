@@ -0,0 +1,112 @@
+import unittest
+import pandas as pd
+import pycountry
+
+from reference_index import CountryResolver, SubdivisionIndex
+
+class TestReferenceIndex(unittest.TestCase):
+    def test_country_resolver_get_alpha_2(self):
+        """Test that it can get alpha-2 code as pycountry.countries.get.
+        """
+        resolver = CountryResolver()
+        list_testing = [
+            "US",
+            "us",
+            "GB",
+            "USA",
+            "U",
+            ""
+        ]
+        list_expected = [
+            "US",
+            "US",
+            "GB",
+            None,
+            None,
+            None
+        ]
+        self.assertEqual([resolver.get_alpha_2(x) for x in list_testing], list_expected)
+        self.assertEqual(resolver.counter["code_hit"], 3, "3 codes should be found.")
+        self.assertEqual(resolver.counter["code_miss"], 3, "3 codes should not be found.")
+
+    def test_country_resolver_search_fuzzy_alpha_2(self):
+        """Test that it can search country name with the same first result as pycountry.countries.search_fuzzy.
+        """
+        resolver = CountryResolver()
+        list_testing = [
+            "United States",
+            "USA",
+            "  united kingdom ",
+            "Korea",
+            "Congo",
+            "Georgia",
+            "Côte d'Ivoire",
+            "cote",
+            "Virgin",
+            "New",
+            "Bavaria",
+            "asdf"
+        ]
+        for country in pycountry.countries:
+            list_testing.append(country.name)
+        for x in list_testing:
+            try:
+                expected = pycountry.countries.search_fuzzy(x)[0].alpha_2
+            except LookupError:
+                expected = None
+            self.assertEqual(resolver.search_fuzzy_alpha_2(x), expected, f'Country name "{x}" should be resolved as pycountry.')
+        self.assertEqual(resolver.search_fuzzy_alpha_2("United States"), "US")
+        self.assertGreater(resolver.counter["name_memo_hit"], 0, "Searched names should be memorized.")
+        self.assertGreater(resolver.counter["name_miss"], 0, "Unknown names should be counted.")
+
+    def test_subdivision_index_get_code(self):
+        """Test that it can get subdivision code as pycountry.subdivisions.get.
+        """
+        index = SubdivisionIndex()
+        for subdivision in list(pycountry.subdivisions)[::50]:
+            country_code, subdivision_code = subdivision.code.split("-")
+            self.assertEqual(index.get_code(country_code.lower(), subdivision_code.lower()), subdivision_code)
+        self.assertIsNone(index.get_code("AU", "XYZ"))
+        self.assertIs(index.get_code("AU", "AU", pd.NA), pd.NA)
+        series_output = index.map_code(pd.Series(["AU", "au", "US", pd.NA], dtype="string"), pd.Series(["VIC", "nsw", "VIC", "CA"], dtype="string"))
+        pd.testing.assert_series_equal(series_output, pd.Series(["VIC", "NSW", pd.NA, pd.NA], dtype="string"))
+
+    def test_subdivision_index_search_fuzzy_code(self):
+        """Test that it can search subdivision name with the same first result as pycountry.subdivisions.search_fuzzy.
+        """
+        index = SubdivisionIndex()
+        list_testing = [
+            "Victoria",
+            "  new south wales ",
+            "Bayern",
+            "Bavaria",
+            "São Paulo",
+            "New",
+            "Saint",
+            "asdf"
+        ]
+        for subdivision in list(pycountry.subdivisions)[::100]:
+            list_testing.append(subdivision.name)
+        for x in list_testing:
+            try:
+                expected = pycountry.subdivisions.search_fuzzy(x)[0].code.split("-")[1]
+            except LookupError:
+                expected = None
+            self.assertEqual(index.search_fuzzy_code(x), expected, f'Subdivision name "{x}" should be resolved as pycountry.')
+        self.assertGreater(index.counter["name_miss"], 0, "Unknown names should be counted.")
+
+    def test_subdivision_index_resolve_name(self):
+        """Test that it can resolve subdivision name within the country first.
+        """
+        index = SubdivisionIndex()
+        self.assertEqual(index.resolve_name("Santa Cruz", "BO"), "S")
+        self.assertEqual(index.resolve_name("Santa Cruz", "AR"), "Z")
+        self.assertEqual(index.resolve_name("Santa Cruz", None), index.search_fuzzy_code("Santa Cruz"))
+        self.assertEqual(index.resolve_name("Victoria", "US"), "VIC")
+        index = SubdivisionIndex()
+        series_output = index.map_name(pd.Series(["Santa Cruz", "Santa Cruz", "Santa Cruz", "asdf", pd.NA], index=[3, 4, 5, 6, 7], dtype="string"), pd.Series(["BO", "AR", "BO", "AU", "AU"], index=[3, 4, 5, 6, 7], dtype="string"))
+        pd.testing.assert_series_equal(series_output, pd.Series(["S", "Z", "S", pd.NA, pd.NA], index=[3, 4, 5, 6, 7], dtype="string", name="code"))
+        self.assertEqual(index.counter["country_name_hit"], 2, "Each distinct pair of name and country code should be resolved once.")
+
+if __name__ == "__main__":
+    unittest.main()
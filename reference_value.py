@@ -11,6 +11,42 @@ REGEX_PATTERN_DATE_FORMAT = r'\d{4}-\d{2}-\d{2}'
 
 DATE_FORMAT_CODE_OUTPUT = "%Y-%m-%d"
 
+# Input date formats in priority order, MM/DD/YY is the highest priority due to largest usage in sample data
+LIST_DATE_FORMAT = [
+    {
+        "code": "%m/%d/%y",
+        "debug_message": "MM/DD/YY"
+    },
+    {
+        "code": "%m/%d/%Y",
+        "debug_message": "MM/DD/YYYY"
+    },
+    {
+        "code": "%d/%m/%y",
+        "debug_message": "DD/MM/YY"
+    },
+    {
+        "code": "%d/%m/%Y",
+        "debug_message": "DD/MM/YYYY"
+    },
+    {
+        "code": "%m-%d-%y",
+        "debug_message": "MM-DD-YY"
+    },
+    {
+        "code": "%m-%d-%Y",
+        "debug_message": "MM-DD-YYYY"
+    },
+    {
+        "code": "%Y-%m-%d",
+        "debug_message": "YYYY-MM-DD"
+    },
+    {
+        "code": "%d-%b-%y",
+        "debug_message": "DD-MMM-YY"
+    }
+]
+
 REGEX_PATTERN_COUNTRY_CODE_OUTPUT = r'[A-Z]{2}'
 
 LIST_STATUS = [
@@ -24,6 +60,111 @@ DICT_STATUS_MAPPING = {
     "N": "Inactive"
 }
 
+REGEX_PATTERN_CONTACT_EMAIL = r'.+@.+'
+
+# Cleanse rules of the columns which are only trimmed, normalized, mapped and validated, compiled once when the pipeline starts.
+# The rules are applied in this order: "trim" removes whitespace, "mapping" replaces whole values (None for missing),
+# "case" is "upper", "capitalize" (first letter) or "capitalize_words" (first letter of each word),
+# "standardize" cuts a value starting with one of the wordings to that wording, then the value is validated:
+# "format" is the regex the value has to match in full, "allowed" is the list of expected values and "required" rejects missing and empty values.
+# Missing values are never checked against "format" and "allowed", a column without any of them is never rejected.
+DICT_COLUMN_RULE = {
+    "EntityName": {
+        "trim": True,
+        "required": True
+    },
+    "EntityType": {
+        "trim": True,
+        "case": "capitalize",
+        "allowed": LIST_ENTITY_TYPE,
+        "required": True
+    },
+    "RegistrationNumber": {
+        "trim": True,
+        "case": "upper",
+        "format": REGEX_PATTERN_REGISTRATION_NUMBER
+    },
+    "Status": {
+        "trim": True,
+        "mapping": DICT_STATUS_MAPPING,
+        "standardize": LIST_STATUS,
+        "allowed": LIST_STATUS,
+        "required": True
+    },
+    "Industry": {
+        "trim": True,
+        "mapping": {
+            "NULL": None
+        },
+        "case": "capitalize_words"
+    },
+    "ContactEmail": {
+        "trim": True,
+        "format": REGEX_PATTERN_CONTACT_EMAIL
+    }
+}
+
+# Columns of the source data used by the pipeline, columnar sources (Parquet, Arrow IPC) are read with only these columns
+LIST_SOURCE_COLUMN = [
+    "EntityID",
+    "EntityName",
+    "EntityType",
+    "RegistrationNumber",
+    "IncorporationDate",
+    "Country",
+    "CountryCode",
+    "State",
+    "StateCode",
+    "Status",
+    "Industry",
+    "ContactEmail",
+    "LastUpdate"
+]
+
+# Low-cardinality source columns kept as pandas categoricals from ingest to load when categorical encoding is enabled
+LIST_CATEGORICAL_COLUMN = [
+    "EntityType",
+    "Status",
+    "Country",
+    "CountryCode",
+    "State",
+    "StateCode",
+    "Industry"
+]
+
+# Values read as missing from CSV, same as the default of pandas.read_csv, so that the pyarrow CSV reader gives the same result as the C parser
+LIST_CSV_NA_VALUE = [
+    "",
+    "#N/A",
+    "#N/A N/A",
+    "#NA",
+    "-1.#IND",
+    "-1.#QNAN",
+    "-NaN",
+    "-nan",
+    "1.#IND",
+    "1.#QNAN",
+    "<NA>",
+    "N/A",
+    "NA",
+    "NULL",
+    "NaN",
+    "None",
+    "n/a",
+    "nan",
+    "null"
+]
+
+# Source file extensions and their formats, the format is detected by the extension unless it is set in config
+DICT_SOURCE_FORMAT_EXTENSION = {
+    ".csv": "csv",
+    ".parquet": "parquet",
+    ".pq": "parquet",
+    ".arrow": "arrow",
+    ".feather": "arrow",
+    ".ipc": "arrow"
+}
+
 # For each tuple, the first value is CSV column, the second value is MySQL schema, the third value is data type
 LIST_SCHEMA_MAPPING = [
     ("EntityID", "entity_id", "int"),
@@ -94,4 +235,91 @@ ON DUPLICATE KEY UPDATE
     industry = VALUES(industry),
     contact_email = VALUES(contact_email),
     last_update = VALUES(last_update);
-"""
\ No newline at end of file
+"""
+# Staging table for LOAD DATA LOCAL INFILE, same columns as the entities table.
+# It is a temporary table, only seen by the session loading it, so concurrent loads into the same schema never share it,
+# entity_id is not a key, so that LOAD DATA LOCAL keeps repeated entity_id rather than skipping them with a warning,
+# staging_row keeps the order of the file, so that a later record of the same entity_id is upserted last as in "insert" mode
+QUERY_CREATE_TABLE_ENTITIES_STAGING = """
+CREATE TEMPORARY TABLE <STAGING_TABLE_NAME> (
+    staging_row BIGINT PRIMARY KEY AUTO_INCREMENT,
+    entity_id INT NOT NULL,
+    entity_name VARCHAR(150) NOT NULL,
+    entity_type VARCHAR(30),
+    registration_number VARCHAR(50),
+    incorporation_date DATE,
+    country_code VARCHAR(3),
+    state_code VARCHAR(50),
+    status VARCHAR(30),
+    industry VARCHAR(100),
+    contact_email VARCHAR(100),
+    last_update DATE
+);
+"""
+
+QUERY_DROP_TABLE_ENTITIES_STAGING = """
+DROP TEMPORARY TABLE IF EXISTS <STAGING_TABLE_NAME>;
+"""
+
+# The file path is given as parameter, the file is a TSV without header, \N for NULL and backslash escapes
+QUERY_LOAD_DATA_ENTITY_STAGING = """
+LOAD DATA LOCAL INFILE %s
+INTO TABLE <STAGING_TABLE_NAME>
+CHARACTER SET utf8mb4
+FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\'
+LINES TERMINATED BY '\\n'
+(
+    entity_id,
+    entity_name,
+    entity_type,
+    registration_number,
+    incorporation_date,
+    country_code,
+    state_code,
+    status,
+    industry,
+    contact_email,
+    last_update
+);
+"""
+
+QUERY_INSERT_UPDATE_ENTITY_FROM_STAGING = """
+INSERT INTO <TABLE_NAME> (
+    entity_id,
+    entity_name,
+    entity_type,
+    registration_number,
+    incorporation_date,
+    country_code,
+    state_code,
+    status,
+    industry,
+    contact_email,
+    last_update
+)
+SELECT
+    staging.entity_id,
+    staging.entity_name,
+    staging.entity_type,
+    staging.registration_number,
+    staging.incorporation_date,
+    staging.country_code,
+    staging.state_code,
+    staging.status,
+    staging.industry,
+    staging.contact_email,
+    staging.last_update
+FROM <STAGING_TABLE_NAME> AS staging
+ORDER BY staging.staging_row
+ON DUPLICATE KEY UPDATE
+    entity_name = staging.entity_name,
+    entity_type = staging.entity_type,
+    registration_number = staging.registration_number,
+    incorporation_date = staging.incorporation_date,
+    country_code = staging.country_code,
+    state_code = staging.state_code,
+    status = staging.status,
+    industry = staging.industry,
+    contact_email = staging.contact_email,
+    last_update = staging.last_update;
+"""
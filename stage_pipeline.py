@@ -0,0 +1,117 @@
+import logging
+import queue
+import threading
+import time
+
+# Marks the end of the items in a queue
+QUEUE_END = object()
+
+def run_stage(stage_number, stage, queue_in, queue_out, list_error):
+    """Run a stage in its own thread: take items from queue_in, process them and put the results to queue_out.
+
+    After an error in this stage or a later stage, the remaining items are drained without processing, so that the earlier stages are not blocked by a full queue.
+    The items processed before an error in an earlier stage are still passed on.
+
+    Args:
+        stage_number (int): The position of the stage, the source is 0.
+        stage (dict): The stage, with name, function and the statistics of the stage.
+        queue_in (queue): Queue of the input items, ended by QUEUE_END.
+        queue_out (queue): Queue of the output items, or None for the last stage.
+        list_error (list): Errors raised by the stages, as tuples of stage number and error.
+    """
+    while True:
+        start = time.perf_counter()
+        item = queue_in.get()
+        stage["get_wait_seconds"] += time.perf_counter() - start
+        if item is QUEUE_END:
+            break
+        if any(x[0] >= stage_number for x in list_error):
+            continue
+        start = time.perf_counter()
+        try:
+            output = stage["function"](item)
+        except Exception as err:
+            logging.error(f'-- Stage "{stage["name"]}" failed: {err}')
+            list_error.append((stage_number, err))
+            continue
+        stage["busy_seconds"] += time.perf_counter() - start
+        stage["items"] += 1
+        if queue_out is not None and output is not None:
+            start = time.perf_counter()
+            queue_out.put(output)
+            stage["put_wait_seconds"] += time.perf_counter() - start
+    if queue_out is not None:
+        queue_out.put(QUEUE_END)
+
+def run_source(stage, iterable_source, queue_out, list_error):
+    """Run the source stage in its own thread: put the items of the iterable to queue_out.
+
+    Args:
+        stage (dict): The source stage, with name and the statistics of the stage.
+        iterable_source (iterable): The items, e.g. the chunks of a CSV.
+        queue_out (queue): Queue of the output items.
+        list_error (list): Errors raised by the stages, as tuples of stage number and error.
+    """
+    iterator = iter(iterable_source)
+    while not list_error:
+        start = time.perf_counter()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            break
+        except Exception as err:
+            logging.error(f'-- Stage "{stage["name"]}" failed: {err}')
+            list_error.append((0, err))
+            break
+        stage["busy_seconds"] += time.perf_counter() - start
+        stage["items"] += 1
+        start = time.perf_counter()
+        queue_out.put(item)
+        stage["put_wait_seconds"] += time.perf_counter() - start
+    queue_out.put(QUEUE_END)
+
+def run_stage_pipeline(source_name, iterable_source, list_stage, queue_depth):
+    """Run stages concurrently, one thread per stage, connected by bounded queues.
+
+    Each stage processes its items in order, so items leave the last stage in the order of the source.
+    A stage which spends time waiting to get items is starved by the stage before it,
+    a stage which spends time waiting to put items is blocked by the stage after it, thus the stage with the most busy time and the least waiting is the bottleneck.
+
+    Args:
+        source_name (str): Name of the source stage.
+        iterable_source (iterable): The items, e.g. the chunks of a CSV, iterated in the thread of the source stage.
+        list_stage (list): The stages as tuples of name and function, the function takes the item of the previous stage and returns the item of the next stage, or None to drop the item.
+        queue_depth (int): The maximum number of items waiting in each queue.
+
+    Returns:
+        list_stage_statistic (list): The statistics of each stage: name, items, busy_seconds, get_wait_seconds and put_wait_seconds.
+    """
+    list_stage_statistic = [{"name": source_name, "function": None, "items": 0, "busy_seconds": 0.0, "get_wait_seconds": 0.0, "put_wait_seconds": 0.0}]
+    for name, function in list_stage:
+        list_stage_statistic.append({"name": name, "function": function, "items": 0, "busy_seconds": 0.0, "get_wait_seconds": 0.0, "put_wait_seconds": 0.0})
+    list_queue = [queue.Queue(maxsize=queue_depth) for _ in list_stage]
+    list_error = []
+    list_thread = [threading.Thread(target=run_source, args=(list_stage_statistic[0], iterable_source, list_queue[0], list_error), name=source_name)]
+    for i, stage in enumerate(list_stage_statistic[1:]):
+        queue_out = list_queue[i + 1] if i + 1 < len(list_queue) else None
+        list_thread.append(threading.Thread(target=run_stage, args=(i + 1, stage, list_queue[i], queue_out, list_error), name=stage["name"]))
+    for thread in list_thread:
+        thread.start()
+    for thread in list_thread:
+        thread.join()
+    for stage in list_stage_statistic:
+        del stage["function"]
+    log_stage_statistic(list_stage_statistic)
+    if list_error:
+        raise list_error[0][1]
+    return list_stage_statistic
+
+def log_stage_statistic(list_stage_statistic):
+    """Log the busy and queue wait time of each stage.
+
+    Args:
+        list_stage_statistic (list): The statistics of each stage.
+    """
+    logging.info('-- Stage statistics (items, busy, waiting for input, waiting for output):')
+    for stage in list_stage_statistic:
+        logging.info(f'--- {stage["name"]}: {stage["items"]} items, {stage["busy_seconds"]:.3f}s busy, {stage["get_wait_seconds"]:.3f}s waiting for input, {stage["put_wait_seconds"]:.3f}s waiting for output.')
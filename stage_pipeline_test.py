@@ -0,0 +1,33 @@
+import unittest
+import time
+
+from stage_pipeline import run_stage_pipeline
+
+class TestStagePipeline(unittest.TestCase):
+    def test_run_stage_pipeline(self):
+        """Test that it can run stages concurrently, keep the order of items and report queue wait time.
+        """
+        list_output = []
+        def slow_stage(item):
+            time.sleep(0.01)
+            return item * 10
+        list_stage_statistic = run_stage_pipeline("source", range(5), [("slow", slow_stage), ("drop_odd", lambda x: x if x % 20 == 0 else None), ("sink", list_output.append)], 1)
+        self.assertEqual(list_output, [0, 20, 40])
+        self.assertEqual([x["name"] for x in list_stage_statistic], ["source", "slow", "drop_odd", "sink"])
+        self.assertEqual([x["items"] for x in list_stage_statistic], [5, 5, 5, 3])
+        self.assertGreater(list_stage_statistic[2]["get_wait_seconds"], 0, "The stage after the slow stage should wait for input.")
+
+    def test_run_stage_pipeline_error(self):
+        """Test that it can stop every stage and raise the error of a failed stage.
+        """
+        def failed_stage(item):
+            if item == 2:
+                raise ValueError("asdf")
+            return item
+        list_output = []
+        with self.assertRaises(ValueError):
+            run_stage_pipeline("source", range(100), [("failed", failed_stage), ("sink", list_output.append)], 1)
+        self.assertEqual(list_output, [0, 1])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import sqlite3
+import numpy as np
+import pandas as pd
+
+class StateStore:
+    """Keep the state of previous runs in SQLite, i.e. the content hash of every loaded entity and the LastUpdate watermark of every source.
+    """
+    def __init__(self, file_path):
+        """Open the state store.
+
+        Args:
+            file_path (str): File path of the SQLite database.
+        """
+        self.file_path = file_path
+        self.connection = None
+        self.series_entity_hash = None
+
+    def _connect(self):
+        """Connect to the SQLite database on first use.
+
+        Returns:
+            (connection): The SQLite connection.
+        """
+        if self.connection is None:
+            self.connection = sqlite3.connect(self.file_path, timeout=30, check_same_thread=False)
+            self.connection.execute("CREATE TABLE IF NOT EXISTS entity_hash (entity_id INTEGER PRIMARY KEY, content_hash INTEGER NOT NULL)")
+            self.connection.execute("CREATE TABLE IF NOT EXISTS watermark (source TEXT PRIMARY KEY, last_update TEXT NOT NULL)")
+            self.connection.commit()
+        return self.connection
+
+    def get_entity_hashes(self):
+        """Get the content hashes of all loaded entities, read from the database once.
+
+        Returns:
+            (series): The pandas series of content hashes (int64) indexed by entity_id.
+        """
+        if self.series_entity_hash is None:
+            list_row = self._connect().execute("SELECT entity_id, content_hash FROM entity_hash").fetchall()
+            array_row = np.array(list_row, dtype="int64").reshape(-1, 2)
+            self.series_entity_hash = pd.Series(array_row[:, 1], index=pd.Index(array_row[:, 0], name="entity_id"), name="content_hash")
+        return self.series_entity_hash
+
+    def put_entity_hashes(self, series_entity_id, series_content_hash):
+        """Save the content hashes of loaded entities.
+
+        Args:
+            series_entity_id (series): The pandas series of entity_id.
+            series_content_hash (series): The pandas series of content hashes (int64).
+        """
+        connection = self._connect()
+        list_row = list(zip(series_entity_id.astype("int64").tolist(), series_content_hash.astype("int64").tolist()))
+        connection.executemany("INSERT OR REPLACE INTO entity_hash (entity_id, content_hash) VALUES (?, ?)", list_row)
+        connection.commit()
+        series_update = pd.Series([x[1] for x in list_row], index=pd.Index([x[0] for x in list_row], name="entity_id"), name="content_hash", dtype="int64")
+        series_stored = self.get_entity_hashes()
+        self.series_entity_hash = pd.concat([series_stored[~series_stored.index.isin(series_update.index)], series_update[~series_update.index.duplicated(keep="last")]])
+
+    def get_watermark(self, source):
+        """Get the LastUpdate watermark of a source.
+
+        Args:
+            source (str): Name of the source.
+
+        Returns:
+            (timestamp): The latest LastUpdate loaded from the source, or None if the source has not been loaded.
+        """
+        row = self._connect().execute("SELECT last_update FROM watermark WHERE source = ?", (source,)).fetchone()
+        return pd.Timestamp(row[0]) if row is not None else None
+
+    def put_watermark(self, source, last_update):
+        """Save the LastUpdate watermark of a source.
+
+        Args:
+            source (str): Name of the source.
+            last_update (timestamp): The latest LastUpdate loaded from the source.
+        """
+        connection = self._connect()
+        connection.execute("INSERT OR REPLACE INTO watermark (source, last_update) VALUES (?, ?)", (source, pd.Timestamp(last_update).strftime("%Y-%m-%d")))
+        connection.commit()
+
+    def close(self):
+        """Close the connection.
+        """
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
@@ -0,0 +1,40 @@
+import unittest
+import os
+import tempfile
+import pandas as pd
+
+from state_store import StateStore
+
+class TestStateStore(unittest.TestCase):
+    def test_entity_hashes(self):
+        """Test that it can save content hashes and read them in the next run.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = os.path.join(directory, "pipeline-state.sqlite")
+            state_store = StateStore(file_path)
+            self.assertEqual(len(state_store.get_entity_hashes()), 0)
+            state_store.put_entity_hashes(pd.Series([1001, 1002]), pd.Series([-5, 2**62]))
+            state_store.put_entity_hashes(pd.Series([1002, 1003]), pd.Series([7, 8]))
+            self.assertEqual(state_store.get_entity_hashes().sort_index().to_dict(), {1001: -5, 1002: 7, 1003: 8})
+            state_store.close()
+            state_store = StateStore(file_path)
+            self.assertEqual(state_store.get_entity_hashes().sort_index().to_dict(), {1001: -5, 1002: 7, 1003: 8})
+            state_store.close()
+
+    def test_watermark(self):
+        """Test that it can save the watermark per source and read it in the next run.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = os.path.join(directory, "pipeline-state.sqlite")
+            state_store = StateStore(file_path)
+            self.assertIsNone(state_store.get_watermark("source.csv"))
+            state_store.put_watermark("source.csv", pd.Timestamp("2021-09-17"))
+            state_store.put_watermark("other.csv", pd.Timestamp("2020-01-01"))
+            state_store.close()
+            state_store = StateStore(file_path)
+            self.assertEqual(state_store.get_watermark("source.csv"), pd.Timestamp("2021-09-17"))
+            self.assertEqual(state_store.get_watermark("other.csv"), pd.Timestamp("2020-01-01"))
+            state_store.close()
+
+if __name__ == "__main__":
+    unittest.main()
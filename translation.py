@@ -0,0 +1,222 @@
+import logging
+import sqlite3
+import pandas as pd
+import pycountry
+from translate import Translator
+
+# Languages which can be used as translation target, built once rather than on every translation
+SET_LANGUAGE_ALPHA_2 = {x.alpha_2 for x in pycountry.languages if hasattr(x, "alpha_2")}
+
+class OnlineTranslationBackend:
+    """Translate texts by the online service of translate.Translator, one translator per language.
+    """
+    def translate_batch(self, lang, list_text):
+        """Translate texts to a language.
+
+        Args:
+            lang (str): Language code of the translation.
+            list_text (list): Texts to be translated.
+
+        Returns:
+            (dict): Translation keyed by text, texts which are not translated are not included.
+        """
+        translator = Translator(to_lang=lang)
+        dict_translation = {}
+        for text in list_text:
+            try:
+                dict_translation[text] = translator.translate(text)
+            except Exception as err:
+                logging.warning(f'-- Failed to translate "{text}" to {lang}: {err}')
+        return dict_translation
+
+class DictionaryTranslationBackend:
+    """Translate texts by a local dictionary file, so that translation is deterministic and needs no network.
+
+    The dictionary file is a CSV file with columns Language, Text and Translation, text is matched case-insensitive.
+    """
+    def __init__(self, file_path, separator=","):
+        """Load the dictionary file.
+
+        Args:
+            file_path (str): File path of the dictionary file.
+            separator (str): Separator of the dictionary file.
+        """
+        df_dictionary = pd.read_csv(file_path, sep=separator, dtype="string", keep_default_na=False)
+        self.dict_translation = {(x.lower(), y.strip().lower()): z for x, y, z in zip(df_dictionary["Language"], df_dictionary["Text"], df_dictionary["Translation"])}
+        logging.info(f'-- Loaded {len(self.dict_translation)} translations from dictionary file {file_path}.')
+
+    def translate_batch(self, lang, list_text):
+        """Translate texts to a language.
+
+        Args:
+            lang (str): Language code of the translation.
+            list_text (list): Texts to be translated.
+
+        Returns:
+            (dict): Translation keyed by text, texts which are not in the dictionary are not included.
+        """
+        dict_translation = {}
+        for text in list_text:
+            translation = self.dict_translation.get((lang.lower(), text.strip().lower()))
+            if translation is not None:
+                dict_translation[text] = translation
+        return dict_translation
+
+class NoTranslationBackend:
+    """Translate nothing, for runs where state names are resolved without translation.
+    """
+    def translate_batch(self, lang, list_text):
+        """Translate nothing.
+
+        Args:
+            lang (str): Language code of the translation.
+            list_text (list): Texts to be translated.
+
+        Returns:
+            (dict): Empty dictionary.
+        """
+        return {}
+
+class TranslationCache:
+    """Cache translations keyed by (lang, text) in SQLite, persisted on disk if a file path is given.
+    """
+    def __init__(self, file_path=""):
+        """Open the cache.
+
+        Args:
+            file_path (str): File path of the SQLite database, the cache is kept in memory only if it is empty.
+        """
+        self.file_path = file_path if file_path != "" else ":memory:"
+        self.connection = None
+        self.dict_memo = {}
+
+    def _connect(self):
+        """Connect to the SQLite database on first use, so that each process opens its own connection.
+
+        Returns:
+            (connection): The SQLite connection.
+        """
+        if self.connection is None:
+            # Worker processes may write to the same file, wait for the lock rather than failing. Cleanse steps may run in different threads, one at a time
+            self.connection = sqlite3.connect(self.file_path, timeout=30, check_same_thread=False)
+            self.connection.execute("CREATE TABLE IF NOT EXISTS translation (lang TEXT NOT NULL, text TEXT NOT NULL, translation TEXT NOT NULL, PRIMARY KEY (lang, text))")
+            self.connection.commit()
+        return self.connection
+
+    def __getstate__(self):
+        """Pickle the cache without the SQLite connection.
+        """
+        state = self.__dict__.copy()
+        state["connection"] = None
+        return state
+
+    def get_many(self, lang, list_text):
+        """Get cached translations.
+
+        Args:
+            lang (str): Language code of the translation.
+            list_text (list): Texts to be translated.
+
+        Returns:
+            (dict): Translation keyed by text, texts which are not cached are not included.
+        """
+        dict_translation = {x: self.dict_memo[(lang, x)] for x in list_text if (lang, x) in self.dict_memo}
+        list_query = [x for x in list_text if x not in dict_translation]
+        connection = self._connect()
+        # Keep the number of parameters below the SQLite limit
+        for i in range(0, len(list_query), 500):
+            list_batch = list_query[i:i + 500]
+            cursor = connection.execute(f"SELECT text, translation FROM translation WHERE lang = ? AND text IN ({', '.join(['?'] * len(list_batch))})", [lang] + list_batch)
+            for text, translation in cursor.fetchall():
+                dict_translation[text] = translation
+                self.dict_memo[(lang, text)] = translation
+        return dict_translation
+
+    def put_many(self, lang, dict_translation):
+        """Cache translations.
+
+        Args:
+            lang (str): Language code of the translation.
+            dict_translation (dict): Translation keyed by text.
+        """
+        if not dict_translation:
+            return
+        connection = self._connect()
+        connection.executemany("INSERT OR REPLACE INTO translation (lang, text, translation) VALUES (?, ?, ?)", [(lang, x, y) for x, y in dict_translation.items()])
+        connection.commit()
+        for text, translation in dict_translation.items():
+            self.dict_memo[(lang, text)] = translation
+
+class StateNameTranslator:
+    """Translate state names with a cache in front of a translation backend, the texts not cached are sent to the backend in one batch per language.
+    """
+    def __init__(self, backend, cache):
+        """Initialize the translator.
+
+        Args:
+            backend: Translation backend with method translate_batch(lang, list_text).
+            cache (TranslationCache): Cache of translations.
+        """
+        self.backend = backend
+        self.cache = cache
+        self.counter = {
+            "cache_hit": 0,
+            "backend_hit": 0,
+            "backend_miss": 0,
+            "backend_batch": 0
+        }
+
+    def translate_batch(self, lang, list_text):
+        """Translate texts to a language.
+
+        Args:
+            lang (str): Language code of the translation.
+            list_text (list): Texts to be translated.
+
+        Returns:
+            (dict): Translation keyed by text, texts which are not translated are not included.
+        """
+        lang = lang.lower()
+        list_text = list(dict.fromkeys(list_text))
+        dict_translation = self.cache.get_many(lang, list_text)
+        self.counter["cache_hit"] += len(dict_translation)
+        list_miss = [x for x in list_text if x not in dict_translation]
+        if list_miss:
+            dict_backend = self.backend.translate_batch(lang, list_miss)
+            self.counter["backend_batch"] += 1
+            self.counter["backend_hit"] += len(dict_backend)
+            self.counter["backend_miss"] += len(list_miss) - len(dict_backend)
+            self.cache.put_many(lang, dict_backend)
+            dict_translation.update(dict_backend)
+        return dict_translation
+
+    def translate(self, lang, text):
+        """Translate a text to a language.
+
+        Args:
+            lang (str): Language code of the translation.
+            text (str): Text to be translated.
+
+        Returns:
+            (str): The translation, or None if the text is not translated.
+        """
+        return self.translate_batch(lang, [text]).get(text)
+
+def create_translation_backend(backend_name, dictionary_path=""):
+    """Create the translation backend by name.
+
+    Args:
+        backend_name (str): Name of the backend, "online", "dictionary" or "none".
+        dictionary_path (str): File path of the dictionary file for the "dictionary" backend.
+
+    Returns:
+        The translation backend.
+    """
+    if backend_name == "online":
+        return OnlineTranslationBackend()
+    if backend_name == "dictionary":
+        return DictionaryTranslationBackend(dictionary_path)
+    if backend_name == "none":
+        return NoTranslationBackend()
+    logging.error(f'-- Translation backend "{backend_name}" is not supported.')
+    raise Exception("Translation backend is not supported")
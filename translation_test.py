@@ -0,0 +1,42 @@
+import unittest
+import os
+import tempfile
+
+from translation import DictionaryTranslationBackend, NoTranslationBackend, TranslationCache, StateNameTranslator, create_translation_backend
+
+class TestTranslation(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.dictionary_path = os.path.join(self.temp_dir.name, "translation-dictionary.csv")
+        with open(self.dictionary_path, "w") as f:
+            f.write("Language,Text,Translation\nde,Bavaria,Bayern\nde,Saxony,Sachsen\nfr,Brittany,Bretagne\n")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_dictionary_translation_backend(self):
+        """Test that it can translate by dictionary file, case-insensitive.
+        """
+        backend = DictionaryTranslationBackend(self.dictionary_path)
+        self.assertEqual(backend.translate_batch("DE", ["bavaria ", "Saxony", "Brittany", "asdf"]), {"bavaria ": "Bayern", "Saxony": "Sachsen"})
+        self.assertEqual(NoTranslationBackend().translate_batch("de", ["Bavaria"]), {})
+        with self.assertRaises(Exception):
+            create_translation_backend("asdf")
+
+    def test_state_name_translator(self):
+        """Test that it can translate in one batch per language and cache the translations on disk.
+        """
+        cache_path = os.path.join(self.temp_dir.name, "translation-cache.sqlite")
+        translator = StateNameTranslator(DictionaryTranslationBackend(self.dictionary_path), TranslationCache(cache_path))
+        self.assertEqual(translator.translate_batch("DE", ["Bavaria", "Saxony", "Bavaria", "asdf"]), {"Bavaria": "Bayern", "Saxony": "Sachsen"})
+        self.assertEqual(translator.translate("de", "Bavaria"), "Bayern")
+        self.assertIsNone(translator.translate("de", "asdf"))
+        self.assertEqual(translator.counter["backend_batch"], 2, "Only the texts not cached should be sent to backend.")
+        self.assertEqual(translator.counter["cache_hit"], 1)
+        # Translations are kept in the cache file for the next run, even without backend
+        translator = StateNameTranslator(NoTranslationBackend(), TranslationCache(cache_path))
+        self.assertEqual(translator.translate_batch("de", ["Bavaria", "Saxony", "asdf"]), {"Bavaria": "Bayern", "Saxony": "Sachsen"})
+        self.assertEqual(translator.counter["cache_hit"], 2)
+
+if __name__ == "__main__":
+    unittest.main()